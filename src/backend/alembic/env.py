@@ -13,7 +13,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 # Import all models here for Alembic to detect
 from models.database import Base
-from models.models import User, AIModel, AITool, Tutorial, Newsletter, Subscription
+from models.models import User, AIModel, AITool, Tutorial, Newsletter, Subscription, SyncState, HttpValidator, ModelLineage
 
 # Load environment variables
 load_dotenv()
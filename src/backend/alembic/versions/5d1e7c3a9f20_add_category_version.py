@@ -0,0 +1,28 @@
+"""Add category_version to ai_models
+
+Revision ID: 5d1e7c3a9f20
+Revises: 28f2a0b2cabe
+Create Date: 2026-10-18 11:12:40.218305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d1e7c3a9f20'
+down_revision: Union[str, None] = '28f2a0b2cabe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('ai_models', sa.Column('category_version', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_ai_models_category_version'), 'ai_models', ['category_version'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_ai_models_category_version'), table_name='ai_models')
+    op.drop_column('ai_models', 'category_version')
@@ -0,0 +1,26 @@
+"""Add last_scraped_at to ai_models
+
+Revision ID: 9b4f2e6a1c07
+Revises: 5d1e7c3a9f20
+Create Date: 2026-10-18 12:03:17.552910
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4f2e6a1c07'
+down_revision: Union[str, None] = '5d1e7c3a9f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('ai_models', sa.Column('last_scraped_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('ai_models', 'last_scraped_at')
@@ -0,0 +1,34 @@
+"""Add model_lineage edge table
+
+Revision ID: a6c3e8f05d14
+Revises: f1b9d4e6a372
+Create Date: 2026-10-18 18:11:52.730446
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c3e8f05d14'
+down_revision: Union[str, None] = 'f1b9d4e6a372'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('model_lineage',
+    sa.Column('parent_id', sa.String(), nullable=False),
+    sa.Column('child_id', sa.String(), nullable=False),
+    sa.Column('relation', sa.String(), nullable=False),
+    sa.Column('origin', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('parent_id', 'child_id', 'relation', 'origin')
+    )
+    op.create_index('ix_model_lineage_child', 'model_lineage', ['child_id', 'parent_id', 'relation'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_model_lineage_child', table_name='model_lineage')
+    op.drop_table('model_lineage')
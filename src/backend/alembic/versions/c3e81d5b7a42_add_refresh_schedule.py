@@ -0,0 +1,30 @@
+"""Add refresh schedule columns to ai_models
+
+Revision ID: c3e81d5b7a42
+Revises: 9b4f2e6a1c07
+Create Date: 2026-10-18 13:26:41.904117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e81d5b7a42'
+down_revision: Union[str, None] = '9b4f2e6a1c07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('ai_models', sa.Column('next_refresh_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('ai_models', sa.Column('unchanged_refreshes', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_ai_models_next_refresh_at'), 'ai_models', ['next_refresh_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_ai_models_next_refresh_at'), table_name='ai_models')
+    op.drop_column('ai_models', 'unchanged_refreshes')
+    op.drop_column('ai_models', 'next_refresh_at')
@@ -0,0 +1,26 @@
+"""Add content_hash to ai_models
+
+Revision ID: e4a7c2d91b35
+Revises: c3e81d5b7a42
+Create Date: 2026-10-18 15:02:17.338561
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7c2d91b35'
+down_revision: Union[str, None] = 'c3e81d5b7a42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('ai_models', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('ai_models', 'content_hash')
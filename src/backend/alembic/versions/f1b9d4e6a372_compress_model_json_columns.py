@@ -0,0 +1,92 @@
+"""Compress the large JSON columns of ai_models
+
+Revision ID: f1b9d4e6a372
+Revises: e4a7c2d91b35
+Create Date: 2026-10-18 16:47:09.512804
+
+"""
+import json
+import logging
+from typing import Callable, List, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from models.types import COMPRESSED_JSON_COLUMNS, compression_stats, decode_json, encode_json
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b9d4e6a372'
+down_revision: Union[str, None] = 'e4a7c2d91b35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+COLUMNS = ('spaces', 'widget_data', 'config', 'card_data', 'siblings', 'files')
+
+# Rows rewritten per batch, so the conversion never holds the whole catalog in memory
+CHUNK_SIZE = 1000
+
+
+def _present_columns() -> List[str]:
+    # Only the columns compression is enabled for; none unless COMPRESSED_JSON_COLUMNS lists them.
+    # Databases created with create_all have these columns, older migrated ones may not
+    existing = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('ai_models')}
+    return [name for name in COLUMNS if name in existing and name in COMPRESSED_JSON_COLUMNS]
+
+
+def _rewrite(columns: List[str], convert: Callable) -> int:
+    """Apply ``convert`` to every value of ``columns``, walking ai_models by id in chunks."""
+    if not columns:
+        return 0
+    bind = op.get_bind()
+    table = sa.table('ai_models', sa.column('id', sa.String), *(sa.column(name) for name in columns))
+    statement = (
+        table.update()
+        .where(table.c.id == sa.bindparam('_id'))
+        .values({name: sa.bindparam(name) for name in columns})
+    )
+    last_id, rows_done = '', 0
+    while True:
+        rows = bind.execute(
+            sa.select(table).where(table.c.id > last_id).order_by(table.c.id).limit(CHUNK_SIZE)
+        ).all()
+        if not rows:
+            return rows_done
+        bind.execute(statement, [
+            {'_id': row.id, **{name: convert(getattr(row, name)) for name in columns}}
+            for row in rows
+        ])
+        last_id = rows[-1].id
+        rows_done += len(rows)
+
+
+def upgrade() -> None:
+    columns = _present_columns()
+    if not columns:
+        logger.info("No ai_models JSON columns to compress (see COMPRESSED_JSON_COLUMNS)")
+        return
+    if op.get_bind().dialect.name == 'postgresql':
+        for name in columns:
+            op.execute(f"ALTER TABLE ai_models ALTER COLUMN {name} TYPE bytea USING convert_to({name}::text, 'UTF8')")
+
+    rows = _rewrite(columns, lambda value: encode_json(decode_json(value)))
+    stats = compression_stats.as_dict()
+    logger.info(
+        f"Compressed {rows} ai_models rows: {stats['raw_bytes']} -> {stats['stored_bytes']} bytes "
+        f"(ratio {stats['ratio']}), {stats['decode_us_mean']}us mean decode"
+    )
+
+
+def downgrade() -> None:
+    columns = _present_columns()
+    postgresql = op.get_bind().dialect.name == 'postgresql'
+    # Plain JSON again: bytes for the bytea columns until they are converted back, text on SQLite
+    _rewrite(columns, lambda value: None if value is None else (
+        json.dumps(decode_json(value)).encode() if postgresql else json.dumps(decode_json(value))
+    ))
+
+    if postgresql:
+        for name in columns:
+            op.execute(f"ALTER TABLE ai_models ALTER COLUMN {name} TYPE json USING convert_from({name}, 'UTF8')::json")
@@ -0,0 +1,215 @@
+"""
+Parse-throughput benchmark for Replicate model pages.
+
+Runs the saved pages in benchmarks/fixtures/replicate through the original
+multi-pass BeautifulSoup extraction and through services.html_extract with
+every available backend, checks the outputs are identical and reports
+pages per second.
+
+    python -m benchmarks.bench_parse [--iterations N]
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from services.html_extract import extract_replicate_page, resolve_backend
+
+logger = logging.getLogger(__name__)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "replicate")
+
+def load_pages() -> List[Tuple[str, str]]:
+    """Return (url, html) for every saved page; file names are ``owner__name.html``."""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.html"))):
+        owner, name = os.path.basename(path)[:-len(".html")].split("__", 1)
+        with open(path, encoding="utf-8") as f:
+            pages.append((f"https://replicate.com/{owner}/{name}", f.read()))
+    return pages
+
+# Extraction as it was before services.html_extract, kept as the baseline
+
+def legacy_parse_model_html(html: str, url: str) -> Optional[Dict[str, Any]]:
+    """Extract detailed model information from a Replicate model page."""
+    soup = BeautifulSoup(html, 'html.parser')
+
+    try:
+        # Extract model information
+        title_elem = soup.find('h1')
+        description_elem = soup.find('div', {'class': 'markdown'})
+        metrics_elem = soup.find('div', {'class': 'stats'})
+        
+        # Find the script tag containing the model data
+        script_tags = soup.find_all('script', {'type': 'application/json'})
+        model_json_data = {}
+        for script in script_tags:
+            try:
+                data = json.loads(script.string)
+                if isinstance(data, dict) and 'props' in data:
+                    model_json_data = data
+                    break
+            except:
+                continue
+
+        # Extract version information
+        versions = []
+        versions_section = soup.find('div', {'id': 'versions'})
+        if versions_section:
+            version_items = versions_section.find_all('div', {'class': 'version'})
+            for item in version_items:
+                version_info = {
+                    'id': item.get('id', '').replace('version-', ''),
+                    'name': item.find('div', {'class': 'version-name'}).text.strip() if item.find('div', {'class': 'version-name'}) else '',
+                    'created_at': item.find('time').get('datetime') if item.find('time') else None
+                }
+                versions.append(version_info)
+
+        # Extract example section
+        examples = []
+        examples_section = soup.find('div', {'id': 'examples'})
+        if examples_section:
+            example_items = examples_section.find_all('div', {'class': 'example'})
+            for item in example_items:
+                example = {
+                    'title': item.find('h3').text.strip() if item.find('h3') else '',
+                    'description': item.find('p').text.strip() if item.find('p') else '',
+                    'input': item.find('pre', {'class': 'input'}).text.strip() if item.find('pre', {'class': 'input'}) else '',
+                    'output': item.find('pre', {'class': 'output'}).text.strip() if item.find('pre', {'class': 'output'}) else ''
+                }
+                examples.append(example)
+
+        # Extract hardware requirements and performance metrics
+        hardware_section = soup.find('div', {'id': 'hardware'})
+        hardware_info = {}
+        if hardware_section:
+            hardware_items = hardware_section.find_all('div', {'class': 'spec'})
+            for item in hardware_items:
+                key = item.find('div', {'class': 'label'}).text.strip() if item.find('div', {'class': 'label'}) else ''
+                value = item.find('div', {'class': 'value'}).text.strip() if item.find('div', {'class': 'value'}) else ''
+                hardware_info[key.lower()] = value
+
+        model_data = {
+            "name": title_elem.text.strip() if title_elem else "Unknown",
+            "creator": url.split('/')[-2] if len(url.split('/')) > 2 else "Unknown",
+            "category": "uncategorized",  # Will be updated based on tags
+            "description": description_elem.text.strip() if description_elem else "",
+            "replicate_url": url,
+            "metrics": {},
+            "created_at": datetime.utcnow(),
+            "is_featured": False,
+            "access_level": "free",
+            "versions": versions,
+            "examples": examples,
+            "hardware_requirements": hardware_info,
+            "last_updated": None,
+            "license": None,
+            "paper_url": None,
+            "github_url": None,
+            "docker_image": None
+        }
+
+        # Extract metrics
+        if metrics_elem:
+            metrics = {}
+            for stat in metrics_elem.find_all('div', {'class': 'stat'}):
+                label = stat.find('div', {'class': 'label'})
+                value = stat.find('div', {'class': 'value'})
+                if label and value:
+                    metrics[label.text.strip().lower()] = value.text.strip()
+            model_data["metrics"] = metrics
+
+        # Extract additional links
+        links_section = soup.find('div', {'class': 'links'})
+        if links_section:
+            for link in links_section.find_all('a'):
+                href = link.get('href', '')
+                if 'github.com' in href:
+                    model_data['github_url'] = href
+                elif 'arxiv.org' in href or '.pdf' in href:
+                    model_data['paper_url'] = href
+
+        # Extract tags/categories
+        tags_elem = soup.find('div', {'class': 'tags'})
+        if tags_elem:
+            tags = [tag.text.strip() for tag in tags_elem.find_all('a')]
+            if tags:
+                model_data["category"] = tags[0]  # Use first tag as primary category
+                model_data["tags"] = tags
+
+        # Extract license information
+        license_elem = soup.find('div', {'class': 'license'})
+        if license_elem:
+            model_data['license'] = license_elem.text.strip()
+
+        # Check if model is featured
+        featured_badge = soup.find('div', {'class': 'featured-badge'})
+        model_data["is_featured"] = bool(featured_badge)
+
+        # Extract last updated date
+        updated_elem = soup.find('time', {'class': 'updated'})
+        if updated_elem:
+            model_data['last_updated'] = updated_elem.get('datetime')
+
+        # Extract Docker image information
+        docker_elem = soup.find('pre', {'class': 'docker'})
+        if docker_elem:
+            model_data['docker_image'] = docker_elem.text.strip()
+
+        return model_data
+    except Exception as e:
+        logger.error(f"Error parsing model page {url}: {e}")
+        return None
+
+def _comparable(data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    # created_at is the parse time, not page content
+    return {key: value for key, value in data.items() if key != "created_at"} if data else data
+
+def _parsers() -> List[str]:
+    parsers = ["html.parser"]
+    if resolve_backend("auto").name != "html.parser":
+        parsers.append(resolve_backend("auto").name)
+    return parsers
+
+def _throughput(fn: Callable[[str, str], Any], pages: List[Tuple[str, str]], iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for url, html in pages:
+            fn(html, url)
+    return len(pages) * iterations / (time.perf_counter() - started)
+
+def run(iterations: int = 20) -> Dict[str, Any]:
+    pages = load_pages()
+    if not pages:
+        raise SystemExit(f"No fixtures found in {FIXTURES_DIR}")
+
+    candidates: Dict[str, Callable[[str, str], Any]] = {"legacy": legacy_parse_model_html}
+    for parser in _parsers():
+        candidates[f"single_pass[{parser}]"] = lambda html, url, parser=parser: extract_replicate_page(html, url, parser)
+
+    for url, html in pages:
+        expected = _comparable(legacy_parse_model_html(html, url))
+        for name, fn in candidates.items():
+            if _comparable(fn(html, url)) != expected:
+                raise SystemExit(f"{name} output differs from the legacy extraction for {url}")
+
+    results = {name: round(_throughput(fn, pages, iterations), 1) for name, fn in candidates.items()}
+    baseline = results["legacy"]
+    return {
+        "pages": len(pages),
+        "iterations": iterations,
+        "pages_per_sec": results,
+        "speedup": {name: round(rate / baseline, 2) for name, rate in results.items()},
+    }
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--iterations", type=int, default=20)
+    args = arg_parser.parse_args()
+    print(json.dumps(run(args.iterations), indent=2))
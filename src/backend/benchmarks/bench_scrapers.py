@@ -0,0 +1,271 @@
+"""
+Offline scraper throughput benchmark.
+
+Runs scrape_specific_model, Replicate discovery (get_model_urls) and page
+parsing (parse_model_page), and the Hugging Face bulk ingestion pipeline
+against the local fixture server in benchmarks.upstream, then reports
+models/sec, p50/p99 latency per stage and peak RSS. The database and
+response store live in a scratch directory, and nothing touches the network.
+
+    python -m benchmarks.bench_scrapers [--catalog-models N] [--latency S] [--error-rate R]
+    python -m benchmarks.bench_scrapers --check            # fail on regressions
+    python -m benchmarks.bench_scrapers --update-baseline  # store this run as the baseline
+"""
+import os
+import tempfile
+
+# Point the database and response store at a scratch directory before the
+# services read their settings
+_SCRATCH_DIR = tempfile.mkdtemp(prefix="bench-scrapers-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_SCRATCH_DIR, 'bench.db')}"
+os.environ["RESPONSE_STORE_DIR"] = os.path.join(_SCRATCH_DIR, "response_store")
+os.environ.pop("HUGGINGFACE_API_KEY", None)
+
+import argparse
+import asyncio
+import json
+import logging
+import resource
+import shutil
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import httpx
+
+from models.database import Base, SessionLocal, engine
+from services import model_scraper, rate_limit, scraper
+from services.bulk_upsert import bulk_upsert_models
+from services.http_client import HTTP_MAX_CONNECTIONS, http_pool
+from services.http_cache import revalidation_cache
+from services.ingestion import run_ingestion
+
+from benchmarks.upstream import StandInTransport, UpstreamConfig, UpstreamStandIn
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "scrapers.json")
+# Allowed drift from the baseline before a result counts as a regression
+DEFAULT_TOLERANCE = 0.25
+
+def percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of ``samples`` (0 when there are none)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered) + 0.5)) - 1))]
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def summarize(samples: List[float], models: int, elapsed: float, errors: int = 0) -> Dict[str, Any]:
+    return {
+        "models": models,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "models_per_sec": round(models / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+@contextmanager
+def timed(owner: Any, name: str, samples: List[float]) -> Iterator[None]:
+    """Record the duration of every call to ``owner.name`` (sync or async) while active."""
+    original = getattr(owner, name)
+
+    if asyncio.iscoroutinefunction(original):
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return await original(*args, **kwargs)
+            finally:
+                samples.append(time.perf_counter() - started)
+    else:
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                samples.append(time.perf_counter() - started)
+
+    setattr(owner, name, wrapper)
+    try:
+        yield
+    finally:
+        setattr(owner, name, original)
+
+async def _bounded(items: List[Any], fn: Callable[[Any], Any], concurrency: int) -> List[Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(item: Any) -> Any:
+        async with semaphore:
+            return await fn(item)
+
+    return await asyncio.gather(*(one(item) for item in items))
+
+async def bench_detail(models: int, concurrency: int) -> Dict[str, Any]:
+    """scrape_specific_model for ``models`` catalog ids, ``concurrency`` at a time."""
+    samples: List[float] = []
+    ids = [UpstreamStandIn.model_id(index) for index in range(models)]
+    started = time.perf_counter()
+    with timed(model_scraper, "scrape_specific_model", samples):
+        results = await _bounded(ids, model_scraper.scrape_specific_model, concurrency)
+    elapsed = time.perf_counter() - started
+    ok = sum(1 for result in results if result["status"] == "success")
+    return summarize(samples, ok, elapsed, errors=len(results) - ok)
+
+async def bench_replicate(concurrency: int) -> Dict[str, Dict[str, Any]]:
+    """Explore-page discovery, then every discovered model page fetched and parsed."""
+    page_samples: List[float] = []
+    started = time.perf_counter()
+    with timed(scraper, "fetch_page", page_samples):
+        urls = await scraper.get_model_urls()
+    discovery = summarize(page_samples, len(urls), time.perf_counter() - started)
+
+    parse_samples: List[float] = []
+    started = time.perf_counter()
+    with timed(scraper, "parse_model_page", parse_samples):
+        pages = await _bounded(urls, scraper.parse_model_page, concurrency)
+    parsed = sum(1 for page in pages if page)
+    parsing = summarize(parse_samples, parsed, time.perf_counter() - started, errors=len(pages) - parsed)
+    return {"replicate_discovery": discovery, "replicate_pages": parsing}
+
+async def bench_ingestion(page_size: int, fetch_concurrency: int) -> Dict[str, Any]:
+    """The full Hugging Face catalog through run_ingestion into the scratch database."""
+    source = model_scraper.HuggingFaceCatalogSource(page_size=page_size)
+    stage_samples: Dict[str, List[float]] = {"fetch": [], "normalize": [], "classify": [], "upsert": []}
+
+    def write_batch(rows: List[Dict[str, Any]]) -> Dict[str, int]:
+        started = time.perf_counter()
+        try:
+            return bulk_upsert_models(rows, session_factory=SessionLocal).as_dict()
+        finally:
+            stage_samples["upsert"].append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with timed(source, "fetch_detail", stage_samples["fetch"]), \
+            timed(source, "normalize", stage_samples["normalize"]), \
+            timed(source, "classify", stage_samples["classify"]):
+        report = await run_ingestion(source, write_batch=write_batch, fetch_concurrency=fetch_concurrency)
+    await revalidation_cache.flush()
+    elapsed = time.perf_counter() - started
+
+    stages = report["stages"]
+    errors = sum(stats["errors"] for stats in stages.values())
+    result = summarize(stage_samples["fetch"], stages["upsert"]["items_out"], elapsed, errors=errors)
+    # Per-item latency for fetch / normalize / classify, per batch for upsert
+    result["stages"] = {
+        name: {
+            "p50_ms": round(percentile(samples, 50) * 1000, 3),
+            "p99_ms": round(percentile(samples, 99) * 1000, 3),
+            "models_per_sec": stages[name]["models_per_sec"],
+        }
+        for name, samples in stage_samples.items()
+    }
+    result["bottleneck"] = report["bottleneck"]
+    result["writes"] = report["writes"]
+    return result
+
+async def _run(config: UpstreamConfig, detail_models: int, concurrency: int, page_size: int) -> Dict[str, Any]:
+    upstream = UpstreamStandIn(config).start()
+    try:
+        # The scrapers pick up the pooled client; hand them one wired to the stand-in
+        limits = httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS)
+        http_pool._client = httpx.AsyncClient(transport=StandInTransport(upstream.port, limits=limits), follow_redirects=True)
+        http_pool._loop = asyncio.get_running_loop()
+        # Measure the scrapers, not the production request budgets
+        rate_limit.upstream_limits = rate_limit.UpstreamLimits(budgets={}, default=(1e6, 1e6))
+        try:
+            stages = {"hf_detail": await bench_detail(detail_models, concurrency)}
+            stages.update(await bench_replicate(concurrency))
+            stages["hf_ingestion"] = await bench_ingestion(page_size, concurrency)
+        finally:
+            await http_pool.shutdown()
+    finally:
+        upstream.stop()
+    return {"stages": stages, "upstream": upstream.snapshot()}
+
+def run(
+    config: Optional[UpstreamConfig] = None,
+    detail_models: int = 200,
+    concurrency: int = 16,
+    page_size: int = 500,
+) -> Dict[str, Any]:
+    config = config or UpstreamConfig()
+    Base.metadata.create_all(bind=engine)
+    try:
+        return asyncio.run(_run(config, detail_models, concurrency, page_size))
+    finally:
+        engine.dispose()
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """Regressions of ``report`` against ``baseline``: throughput down, or p99 / RSS up, by more than ``tolerance``."""
+    if baseline.get("config") != report["upstream"]["config"]:
+        return ["baseline was recorded with different upstream settings; rerun with them or update the baseline"]
+    regressions = []
+    for name, expected in baseline.get("stages", {}).items():
+        actual = report["stages"].get(name)
+        if actual is None:
+            regressions.append(f"{name}: missing from this run")
+            continue
+        if actual["models_per_sec"] < expected["models_per_sec"] * (1 - tolerance):
+            regressions.append(f"{name}: {actual['models_per_sec']} models/s, baseline {expected['models_per_sec']}")
+        for metric in ("p99_ms", "peak_rss_mb"):
+            if actual[metric] > expected[metric] * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {actual[metric]}, baseline {expected[metric]}")
+    return regressions
+
+def _baseline_view(report: Dict[str, Any]) -> Dict[str, Any]:
+    keys = ("models_per_sec", "p50_ms", "p99_ms", "peak_rss_mb")
+    return {
+        "config": report["upstream"]["config"],
+        "stages": {name: {key: stats[key] for key in keys} for name, stats in report["stages"].items()},
+    }
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--catalog-models", type=int, default=2000, help="Hugging Face catalog size for ingestion")
+    arg_parser.add_argument("--replicate-models", type=int, default=200)
+    arg_parser.add_argument("--detail-models", type=int, default=200, help="Models scraped with scrape_specific_model")
+    arg_parser.add_argument("--concurrency", type=int, default=16)
+    arg_parser.add_argument("--page-size", type=int, default=500, help="Catalog listing page size")
+    arg_parser.add_argument("--latency", type=float, default=0.005, help="Seconds added to every upstream response")
+    arg_parser.add_argument("--jitter", type=float, default=0.005)
+    arg_parser.add_argument("--error-rate", type=float, default=0.0, help="Share of responses answered 503")
+    arg_parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of responses answered 429")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--check", action="store_true", help="Exit non-zero on regressions against the baseline")
+    arg_parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    arg_parser.add_argument("--update-baseline", action="store_true")
+    args = arg_parser.parse_args()
+
+    upstream_config = UpstreamConfig(
+        models=args.catalog_models,
+        replicate_models=args.replicate_models,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        seed=args.seed,
+    )
+    try:
+        result = run(upstream_config, args.detail_models, args.concurrency, args.page_size)
+    finally:
+        shutil.rmtree(_SCRATCH_DIR, ignore_errors=True)
+    print(json.dumps(result, indent=2))
+
+    if args.update_baseline:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(_baseline_view(result), f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {BASELINE_PATH}")
+    elif args.check:
+        with open(BASELINE_PATH, encoding="utf-8") as f:
+            found = compare(result, json.load(f), args.tolerance)
+        if found:
+            print("Regressions against the baseline:\n  " + "\n  ".join(found))
+            sys.exit(1)
+        print("No regressions against the baseline")
@@ -0,0 +1,287 @@
+"""
+Local stand-in for huggingface.co and replicate.com used by the benchmarks.
+
+A threaded HTTP server replays the fixtures in benchmarks/fixtures for a
+synthetic catalog of any size, with configurable latency and injected
+429 / 503 responses. It runs in a forked process so serving does not
+compete with the measured scrapers for the GIL. StandInTransport sends
+requests meant for the real hosts to it, so the scrapers run unmodified.
+"""
+import json
+import multiprocessing
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# Request counters of the serving process, fetched before it stops
+STATS_PATH = "/__stand_in_stats"
+
+# Newest lastModified in the synthetic catalog; model i is i minutes older
+_CATALOG_EPOCH = datetime(2024, 6, 1)
+
+# Hugging Face enrichment endpoints: path suffix -> (fixture, content type)
+_HF_ENRICHMENT = {
+    "spaces": ("spaces.json", "application/json"),
+    "tree": ("tree.json", "application/json"),
+    "specs": ("specs.json", "application/json"),
+    "downloads": ("downloads.json", "application/json"),
+}
+
+def _read(*parts: str) -> bytes:
+    with open(os.path.join(FIXTURES_DIR, *parts), "rb") as f:
+        return f.read()
+
+@dataclass
+class UpstreamConfig:
+    models: int = 2000  # Size of the synthetic Hugging Face catalog
+    replicate_models: int = 200  # Models linked from the Replicate explore pages
+    explore_page_size: int = 24
+    latency: float = 0.005  # Seconds added to every response
+    jitter: float = 0.005  # Extra uniformly random latency, seconds
+    error_rate: float = 0.0  # Share of requests answered 503
+    throttle_rate: float = 0.0  # Share of requests answered 429 with Retry-After: 0
+    seed: int = 0
+
+@dataclass
+class UpstreamStats:
+    requests: int = 0
+    injected_errors: int = 0
+    injected_throttles: int = 0
+    not_found: int = 0
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops connection bursts and adds SYN retransmit delays
+    request_queue_size = 256
+
+class UpstreamStandIn:
+    """Fixture server for the benchmark run; use as a context manager."""
+
+    def __init__(self, config: Optional[UpstreamConfig] = None):
+        self.config = config or UpstreamConfig()
+        self.stats = UpstreamStats()
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._model_template = json.loads(_read("huggingface", "model.json"))
+        self._hf_files = {
+            suffix: (_read("huggingface", name), content_type)
+            for suffix, (name, content_type) in _HF_ENRICHMENT.items()
+        }
+        self._papers = _read("huggingface", "papers.html")
+        self._readme = _read("huggingface", "README.md")
+        replicate_dir = os.path.join(FIXTURES_DIR, "replicate")
+        self._replicate_pages = [
+            _read("replicate", name) for name in sorted(os.listdir(replicate_dir)) if name.endswith(".html")
+        ]
+        self._port: Optional[int] = None
+        self._process: Optional[multiprocessing.Process] = None
+
+    # Catalog
+
+    @staticmethod
+    def model_id(index: int) -> str:
+        return f"bench-org-{index % 50}/model-{index}"
+
+    def _model_index(self, model_id: str) -> Optional[int]:
+        owner, _, name = model_id.partition("/")
+        if not owner.startswith("bench-org-") or not name.startswith("model-"):
+            return None
+        try:
+            index = int(name[len("model-"):])
+        except ValueError:
+            return None
+        return index if 0 <= index < self.config.models and self.model_id(index) == model_id else None
+
+    def _model_payload(self, index: int) -> Dict[str, Any]:
+        model_id = self.model_id(index)
+        modified = _CATALOG_EPOCH - timedelta(minutes=index)
+        return {
+            **self._model_template,
+            "id": model_id,
+            "modelId": model_id,
+            "author": model_id.split("/")[0],
+            "lastModified": modified.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "downloads": (self.config.models - index) * 37,
+            "likes": (self.config.models - index) // 3,
+        }
+
+    # Routing
+
+    def _huggingface(self, path: str, query: Dict[str, List[str]]) -> Tuple[int, Dict[str, str], bytes]:
+        if path == "/api/models":
+            limit = int(query.get("limit", ["1000"])[0])
+            cursor = int(query.get("cursor", ["0"])[0])
+            end = min(self.config.models, cursor + limit)
+            listing = [
+                {"id": self.model_id(index), "modelId": self.model_id(index),
+                 "lastModified": self._model_payload(index)["lastModified"]}
+                for index in range(cursor, end)
+            ]
+            headers = {"Content-Type": "application/json"}
+            if end < self.config.models:
+                headers["Link"] = f'<https://huggingface.co/api/models?cursor={end}&limit={limit}>; rel="next"'
+            return 200, headers, json.dumps(listing).encode()
+
+        if path.startswith("/api/models/"):
+            rest = path[len("/api/models/"):]
+            model_id, suffix = rest, None
+            parts = rest.split("/")
+            if len(parts) == 3:
+                model_id, suffix = "/".join(parts[:2]), parts[2]
+            index = self._model_index(model_id)
+            if index is None or (suffix is not None and suffix not in self._hf_files):
+                return 404, {"Content-Type": "application/json"}, b'{"error": "Repository not found"}'
+            if suffix is None:
+                return 200, {"Content-Type": "application/json"}, json.dumps(self._model_payload(index)).encode()
+            body, content_type = self._hf_files[suffix]
+            return 200, {"Content-Type": content_type}, body
+
+        parts = path.strip("/").split("/")
+        if len(parts) >= 3 and self._model_index("/".join(parts[:2])) is not None:
+            if parts[2:] == ["papers"]:
+                return 200, {"Content-Type": "text/html"}, self._papers
+            if parts[2:] == ["raw", "main", "README.md"]:
+                return 200, {"Content-Type": "text/markdown"}, self._readme
+        return 404, {"Content-Type": "text/plain"}, b"Not Found"
+
+    def _replicate(self, path: str, query: Dict[str, List[str]]) -> Tuple[int, Dict[str, str], bytes]:
+        if path == "/explore":
+            page = int(query.get("page", ["1"])[0])
+            start = (page - 1) * self.config.explore_page_size
+            end = min(self.config.replicate_models, start + self.config.explore_page_size)
+            links = "".join(
+                f'<li><a href="/bench-owner-{index % 20}/replicate-model-{index}">model {index}</a></li>'
+                for index in range(start, end)
+            )
+            html = f"<html><body><h1>Explore</h1><ul>{links}</ul></body></html>"
+            return 200, {"Content-Type": "text/html"}, html.encode()
+
+        parts = path.strip("/").split("/")
+        if len(parts) == 2 and parts[1].startswith("replicate-model-"):
+            index = int(parts[1][len("replicate-model-"):])
+            if index < self.config.replicate_models:
+                page = self._replicate_pages[index % len(self._replicate_pages)]
+                return 200, {"Content-Type": "text/html"}, page
+        return 404, {"Content-Type": "text/plain"}, b"Not Found"
+
+    def respond(self, host: str, target: str) -> Tuple[int, Dict[str, str], bytes]:
+        """Status, headers and body for a GET of ``target`` on ``host``."""
+        split = urlsplit(target)
+        query = parse_qs(split.query)
+        with self._lock:
+            self.stats.requests += 1
+            delay = self.config.latency + self._random.uniform(0, self.config.jitter)
+            roll = self._random.random()
+        time.sleep(delay)
+
+        if roll < self.config.error_rate:
+            with self._lock:
+                self.stats.injected_errors += 1
+            return 503, {"Content-Type": "text/plain"}, b"Service Unavailable"
+        if roll < self.config.error_rate + self.config.throttle_rate:
+            with self._lock:
+                self.stats.injected_throttles += 1
+            return 429, {"Content-Type": "text/plain", "Retry-After": "0"}, b"Too Many Requests"
+
+        host = host.split(":")[0]
+        if host == "huggingface.co":
+            status, headers, body = self._huggingface(split.path, query)
+        elif host == "replicate.com":
+            status, headers, body = self._replicate(split.path, query)
+        else:
+            status, headers, body = 404, {"Content-Type": "text/plain"}, b"Unknown host"
+        if status == 404:
+            with self._lock:
+                self.stats.not_found += 1
+        return status, headers, body
+
+    # Server lifecycle
+
+    def _handler(self) -> type:
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, as the real hosts
+            # Headers and body go out as separate writes; Nagle would hold the body for the delayed ACK
+            disable_nagle_algorithm = True
+
+            def do_GET(self) -> None:
+                if self.path == STATS_PATH:
+                    status, headers, body = 200, {"Content-Type": "application/json"}, json.dumps(asdict(stand_in.stats)).encode()
+                else:
+                    status, headers, body = stand_in.respond(self.headers.get("Host", ""), self.path)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
+
+    @property
+    def port(self) -> int:
+        return self._port
+
+    def start(self) -> "UpstreamStandIn":
+        server = _Server(("127.0.0.1", 0), self._handler())
+        self._port = server.server_address[1]
+        self._process = multiprocessing.get_context("fork").Process(target=server.serve_forever, daemon=True)
+        self._process.start()
+        # The child owns the listening socket now
+        server.server_close()
+        return self
+
+    def stop(self) -> None:
+        if self._process is not None:
+            try:
+                self.stats = UpstreamStats(**httpx.get(f"http://127.0.0.1:{self._port}{STATS_PATH}").json())
+            except httpx.HTTPError:
+                pass
+            self._process.terminate()
+            self._process.join()
+            self._process = None
+
+    def __enter__(self) -> "UpstreamStandIn":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"config": asdict(self.config), **asdict(self.stats)}
+
+class StandInTransport(httpx.AsyncBaseTransport):
+    """
+    Sends every request to the stand-in on ``port``. The Host header keeps
+    naming the real upstream, which is how the stand-in routes it.
+    """
+
+    def __init__(self, port: int, **transport_kwargs: Any):
+        self._port = port
+        self._transport = httpx.AsyncHTTPTransport(**transport_kwargs)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        original = request.url
+        request.url = original.copy_with(scheme="http", host="127.0.0.1", port=self._port)
+        try:
+            return await self._transport.handle_async_request(request)
+        finally:
+            # Responses report the URL the scraper asked for
+            request.url = original
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
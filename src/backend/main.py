@@ -1,11 +1,14 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
 import os
 
-from models.database import init_db
-from routers import auth, models, tools, tutorials, newsletters, subscriptions
+from models.database import init_db, dispose_async_engine
+from routers import auth, models, tools, tutorials, newsletters, subscriptions, metrics
+from services.http_client import http_pool
+from services.http_cache import revalidation_cache
 
 # Load environment variables
 load_dotenv()
@@ -13,10 +16,19 @@ load_dotenv()
 # Initialize database
 init_db()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Share one pooled HTTP client across all requests and background scrapes
+    async with http_pool.lifespan():
+        yield
+        await revalidation_cache.flush()
+    await dispose_async_engine()
+
 app = FastAPI(
     title="AI Models Platform API",
     description="API for managing AI models, tools, and user content",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -42,6 +54,7 @@ app.include_router(tools.router, prefix="/api")
 app.include_router(tutorials.router, prefix="/api")
 app.include_router(newsletters.router, prefix="/api")
 app.include_router(subscriptions.router, prefix="/api")
+app.include_router(metrics.router, prefix="/api")
 
 @app.get("/health")
 async def health_check():
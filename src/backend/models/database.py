@@ -1,26 +1,74 @@
+from typing import AsyncIterator, Optional
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 import os
 
+from services.db_pool import engine_options, track_engine
+
 load_dotenv()
 
 # Initialize database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")
 
-# SQLAlchemy setup
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False}
-)
+# Async drivers used by the API for each sync backend
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def async_database_url(url: str) -> str:
+    """``url`` with its driver swapped for the async one (aiosqlite or asyncpg)."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend} databases")
+    return parsed.set(drivername=_ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+# The API runs on the async engine; Alembic, Celery tasks and scripts keep the sync one.
+# Derived from DATABASE_URL unless set.
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+# SQLAlchemy setup, with the pool profile of the database's dialect
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+track_engine("sync", engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
-def get_db():
+# Created on first use, so sync-only processes never import the async drivers
+_async_engine: Optional[AsyncEngine] = None
+_async_sessionmaker: Optional[async_sessionmaker] = None
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine
+    if _async_engine is None:
+        url = ASYNC_DATABASE_URL or async_database_url(DATABASE_URL)
+        _async_engine = create_async_engine(url, **engine_options(url, asynchronous=True))
+        track_engine("async", _async_engine.sync_engine)
+    return _async_engine
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        # Objects stay readable after commit; reloading them would be implicit IO
+        _async_sessionmaker = async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+    return _async_sessionmaker
+
+async def get_db() -> AsyncIterator[AsyncSession]:
+    """
+    Get database connection. Returns an async SQLAlchemy session.
+    """
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+def get_sync_db():
     """
-    Get database connection. Returns SQLAlchemy session.
+    Get a synchronous database connection, for code outside the event loop.
     """
     db = SessionLocal()
     try:
@@ -28,6 +76,15 @@ def get_db():
     finally:
         db.close()
 
+async def dispose_async_engine() -> None:
+    """Close the pooled async connections, at application shutdown."""
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        track_engine("async", None)
+    _async_engine = None
+    _async_sessionmaker = None
+
 def init_db():
     """Initialize database tables"""
-    Base.metadata.create_all(bind=engine) 
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
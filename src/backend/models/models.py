@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, JSON, Float, Table, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, JSON, Float, Index, Table, Text
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 from .database import Base
+from .types import json_type, lazy_json
 import uuid
 from datetime import datetime
 
@@ -22,6 +23,12 @@ class User(Base):
     tutorials = relationship("Tutorial", back_populates="author")
     subscriptions = relationship("Subscription", back_populates="user")
 
+# Deferred group of the heavy AIModel columns; list queries never load them,
+# detail queries pull the whole group in with undefer_group(DETAIL_GROUP).
+# Columns that may be stored compressed are mapped under a private name and
+# read through a lazy_json attribute, which decodes each one on first access.
+DETAIL_GROUP = "detail"
+
 class AIModel(Base):
     __tablename__ = "ai_models"
 
@@ -30,10 +37,11 @@ class AIModel(Base):
     creator = Column(String, index=True)
     source = Column(String)  # 'huggingface' or 'replicate'
     category = Column(String, index=True)
+    category_version = Column(Integer, index=True)  # Classifier version that set category
     description = Column(String)
     huggingface_url = Column(String)
     replicate_url = Column(String)
-    benchmark_metrics = Column(JSON)
+    benchmark_metrics = deferred(Column(JSON), group=DETAIL_GROUP)
     tags = Column(JSON)  # Array of strings
     last_updated = Column(DateTime(timezone=True))
     downloads = Column(Integer, default=0)
@@ -41,34 +49,76 @@ class AIModel(Base):
     model_type = Column(String)  # 'downloadable' or 'api'
     
     # Enhanced metadata
-    papers = Column(JSON)  # Array of paper objects
-    spaces = Column(JSON)  # Array of space objects
-    model_tree = Column(JSON)  # Tree structure object
-    technical_details = Column(JSON)  # Technical specifications
-    citation = Column(String)
+    papers = deferred(Column(JSON), group=DETAIL_GROUP)  # Array of paper objects
+    _spaces = deferred(Column("spaces", json_type("spaces")), group=DETAIL_GROUP)  # Array of space objects
+    spaces = lazy_json("_spaces")
+    model_tree = deferred(Column(JSON), group=DETAIL_GROUP)  # Tree structure object
+    technical_details = deferred(Column(JSON), group=DETAIL_GROUP)  # Technical specifications
+    citation = deferred(Column(String), group=DETAIL_GROUP)
     
     # Additional metadata
     pipeline_tag = Column(String)
     mask_token = Column(String)
-    widget_data = Column(JSON)
-    config = Column(JSON)
-    card_data = Column(JSON)
+    _widget_data = deferred(Column("widget_data", json_type("widget_data")), group=DETAIL_GROUP)
+    widget_data = lazy_json("_widget_data")
+    _config = deferred(Column("config", json_type("config")), group=DETAIL_GROUP)
+    config = lazy_json("_config")
+    _card_data = deferred(Column("card_data", json_type("card_data")), group=DETAIL_GROUP)
+    card_data = lazy_json("_card_data")
     
     # Community metrics
     discussion_count = Column(Integer, default=0)
-    pull_requests = Column(JSON)  # Array of PR objects
+    pull_requests = deferred(Column(JSON), group=DETAIL_GROUP)  # Array of PR objects
     gated = Column(Boolean, default=False)
     private = Column(Boolean, default=False)
-    siblings = Column(JSON)  # Array of sibling models
-    tasks = Column(JSON)  # Array of task objects
+    _siblings = deferred(Column("siblings", json_type("siblings")), group=DETAIL_GROUP)  # Array of sibling models
+    siblings = lazy_json("_siblings")
+    tasks = deferred(Column(JSON), group=DETAIL_GROUP)  # Array of task objects
     
     # Files and assets
-    files = Column(JSON)  # Array of file objects
-    model_index = Column(JSON)
+    _files = deferred(Column("files", json_type("files")), group=DETAIL_GROUP)  # Array of file objects
+    files = lazy_json("_files")
+    model_index = deferred(Column(JSON), group=DETAIL_GROUP)
     available_libraries = Column(JSON)  # Array of library names
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    last_scraped_at = Column(DateTime(timezone=True))  # Last on-demand detail scrape
+    next_refresh_at = Column(DateTime(timezone=True), index=True)  # Set by the refresh scheduler
+    unchanged_refreshes = Column(Integer, default=0)  # Consecutive refreshes that found no upstream change
+    content_hash = Column(String(64))  # SHA-256 of the scraped content, see services.bulk_upsert
+
+class SyncState(Base):
+    __tablename__ = "sync_state"
+
+    source = Column(String, primary_key=True)  # 'huggingface' or 'replicate'
+    watermark = Column(DateTime(timezone=True))  # Newest upstream change already ingested
+    last_full_sync_at = Column(DateTime(timezone=True))
+    last_sync_at = Column(DateTime(timezone=True))
+    cursor = Column(String)  # Upstream pagination cursor of an unfinished run
+    stats = Column(JSON)  # Report of the last successful run
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class ModelLineage(Base):
+    __tablename__ = "model_lineage"
+
+    # Endpoints are plain ids: either side may not be in ai_models yet.
+    # The primary key serves descendant walks, the child index ancestor walks.
+    parent_id = Column(String, primary_key=True)
+    child_id = Column(String, primary_key=True)
+    relation = Column(String, primary_key=True)  # 'adapter', 'finetune', 'merge' or 'quantization'
+    origin = Column(String, primary_key=True)  # 'tree' (parent's model tree) or 'card' (child's base_model)
+
+    __table_args__ = (Index("ix_model_lineage_child", "child_id", "parent_id", "relation"),)
+
+class HttpValidator(Base):
+    __tablename__ = "http_validators"
+
+    url = Column(String, primary_key=True)
+    etag = Column(String)
+    last_modified = Column(String)  # Raw Last-Modified header value
+    content_length = Column(Integer, default=0)  # Size of the last full body
+    checked_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 class AITool(Base):
     __tablename__ = "ai_tools"
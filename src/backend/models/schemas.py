@@ -78,6 +78,32 @@ class AIModelResponse(AIModelBase):
     class Config:
         from_attributes = True
 
+class AIModelSummary(BaseModel):
+    """List card projection: none of the deferred detail columns."""
+    id: str
+    name: str
+    creator: Optional[str] = None
+    source: str
+    category: str
+    description: Optional[str] = None
+    huggingface_url: Optional[str] = None
+    replicate_url: Optional[str] = None
+    tags: Optional[List[str]] = None
+    last_updated: Optional[datetime] = None
+    downloads: Optional[int] = None
+    likes: Optional[int] = None
+    model_type: Optional[str] = None
+    pipeline_tag: Optional[str] = None
+    discussion_count: Optional[int] = None
+    gated: Optional[bool] = None
+    private: Optional[bool] = None
+    available_libraries: Optional[List[str]] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
 # AI Tool schemas
 class AIToolBase(BaseModel):
     name: str
@@ -0,0 +1,201 @@
+import json
+import os
+import time
+import zlib
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy.orm import synonym
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.types import JSON, LargeBinary, TypeDecorator, TypeEngine
+
+from services.metrics import register_stats
+
+load_dotenv()
+
+# AIModel JSON columns stored compressed (comma-separated); none by default.
+# The compress_model_json_columns migration converts exactly these, so set
+# it before upgrading; changing it later takes a downgrade and upgrade.
+COMPRESSED_JSON_COLUMNS = frozenset(
+    name.strip() for name in os.getenv("COMPRESSED_JSON_COLUMNS", "").split(",") if name.strip()
+)
+# Serialized values shorter than this are stored as plain JSON bytes
+COMPRESSED_JSON_MIN_BYTES = int(os.getenv("COMPRESSED_JSON_MIN_BYTES", "256"))
+COMPRESSED_JSON_LEVEL = int(os.getenv("COMPRESSED_JSON_LEVEL", "6"))
+
+# Preset zlib dictionary of substrings common to Hugging Face payloads, most
+# frequent last. Stored values reference it by its Adler-32, so never edit
+# it in place: add a new dictionary and make it the default instead.
+_DICTIONARY_V1 = (
+    b'"sdk":"gradio""sdk":"streamlit""likes":"lastModified":"author":'
+    b'"inference":"widget":"datasets":"metrics":"base_model":"license":"apache-2.0"'
+    b'"language":["en"]"tags":["transformers","pytorch","safetensors","text-generation"'
+    b'"tokenizer_config":{"bos_token":"<s>","eos_token":"</s>","pad_token":null,"unk_token":"<unk>"}'
+    b'"architectures":[""model_type":"torch_dtype":"float16""pipeline_tag":"text-generation"'
+    b'{"text":"'
+    b'"config.json"}"generation_config.json"}"tokenizer.json"}"tokenizer_config.json"}'
+    b'"special_tokens_map.json"}"README.md"}".gitattributes"}"model.safetensors"}'
+    b'"pytorch_model.bin"}".safetensors"}'
+    b'{"rfilename":"'
+)
+_DICTIONARIES = {zlib.adler32(_DICTIONARY_V1): _DICTIONARY_V1}
+_DEFAULT_DICTIONARY = _DICTIONARY_V1
+
+# First byte of a zlib stream; plain JSON never starts with it ("x")
+_ZLIB_HEADER = 0x78
+
+@dataclass
+class CompressionStats:
+    encodes: int = 0
+    compressed: int = 0  # Encodes above the size threshold
+    raw_bytes: int = 0
+    stored_bytes: int = 0
+    encode_seconds: float = 0.0
+    decodes: int = 0
+    decode_seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        stats = asdict(self)
+        stats["ratio"] = round(self.raw_bytes / self.stored_bytes, 2) if self.stored_bytes else 0.0
+        stats["decode_us_mean"] = round(self.decode_seconds / self.decodes * 1e6, 1) if self.decodes else 0.0
+        return stats
+
+compression_stats = CompressionStats()
+register_stats("compressed_json", compression_stats.as_dict)
+
+def encode_json(value: Any) -> Optional[bytes]:
+    """JSON-serialize ``value`` and zlib-compress it with the preset dictionary when large enough."""
+    if value is None:
+        return None
+    started = time.perf_counter()
+    raw = json.dumps(value, separators=(",", ":")).encode()
+    stored = raw
+    if len(raw) >= COMPRESSED_JSON_MIN_BYTES:
+        compressor = zlib.compressobj(COMPRESSED_JSON_LEVEL, zdict=_DEFAULT_DICTIONARY)
+        packed = compressor.compress(raw) + compressor.flush()
+        if len(packed) < len(raw):
+            stored = packed
+            compression_stats.compressed += 1
+    compression_stats.encodes += 1
+    compression_stats.raw_bytes += len(raw)
+    compression_stats.stored_bytes += len(stored)
+    compression_stats.encode_seconds += time.perf_counter() - started
+    return stored
+
+def decode_json(data: Any) -> Any:
+    """
+    Inverse of encode_json. Also reads plain JSON, as bytes or text, which is
+    what rows written before the column was compressed hold.
+    """
+    if data is None:
+        return None
+    started = time.perf_counter()
+    if isinstance(data, str):
+        value = json.loads(data)
+    else:
+        data = bytes(data)
+        if data[0] == _ZLIB_HEADER:
+            # FDICT header: two bytes, then the Adler-32 of the preset dictionary
+            dictionary = _DICTIONARIES[int.from_bytes(data[2:6], "big")]
+            decompressor = zlib.decompressobj(zdict=dictionary)
+            data = decompressor.decompress(data) + decompressor.flush()
+        value = json.loads(data)
+    compression_stats.decodes += 1
+    compression_stats.decode_seconds += time.perf_counter() - started
+    return value
+
+class LazyJSON:
+    """
+    A value loaded from a CompressedJSON column, decoded the first time it
+    is used. Reads through the container protocol decode it, so code that
+    selects the column directly can treat it as the value itself.
+    """
+
+    __slots__ = ("raw", "_value", "_decoded")
+
+    def __init__(self, raw: Any):
+        self.raw = raw
+        self._value = None
+        self._decoded = False
+
+    @property
+    def value(self) -> Any:
+        if not self._decoded:
+            self._value = decode_json(self.raw)
+            self._decoded = True
+        return self._value
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.value, name)
+
+    def __getitem__(self, key: Any) -> Any:
+        return self.value[key]
+
+    def __iter__(self):
+        return iter(self.value)
+
+    def __len__(self) -> int:
+        return len(self.value)
+
+    def __bool__(self) -> bool:
+        return bool(self.value)
+
+    def __contains__(self, item: Any) -> bool:
+        return item in self.value
+
+    def __eq__(self, other: Any) -> bool:
+        return self.value == (other.value if isinstance(other, LazyJSON) else other)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"LazyJSON({self.value!r})"
+
+class CompressedJSON(TypeDecorator):
+    """
+    JSON column stored as zlib-compressed bytes. A drop-in replacement for
+    JSON on columns that are only ever read whole; the values cannot be
+    queried with JSON operators in SQL. Loaded values come back as LazyJSON.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect: Any) -> Optional[bytes]:
+        if isinstance(value, LazyJSON) and isinstance(value.raw, bytes):
+            # Loaded and written back unchanged: no need to compress it again
+            return value.raw
+        return encode_json(value.value if isinstance(value, LazyJSON) else value)
+
+    def process_result_value(self, value: Any, dialect: Any) -> Any:
+        return None if value is None else LazyJSON(value)
+
+def json_type(name: str) -> TypeEngine:
+    """Column type of the AIModel JSON column ``name``: compressed when listed in COMPRESSED_JSON_COLUMNS."""
+    return CompressedJSON() if name in COMPRESSED_JSON_COLUMNS else JSON()
+
+class _LazyJSONAttribute:
+    def __init__(self, attribute: str):
+        self.attribute = attribute
+
+    def __get__(self, instance: Any, owner: Any) -> Any:
+        if instance is None:
+            return self
+        value = getattr(instance, self.attribute)
+        if isinstance(value, LazyJSON):
+            value = value.value
+            # The decoded value becomes the loaded one, without dirtying the row
+            set_committed_value(instance, self.attribute, value)
+        return value
+
+    def __set__(self, instance: Any, value: Any) -> None:
+        setattr(instance, self.attribute, value)
+
+def lazy_json(attribute: str) -> Any:
+    """
+    Public attribute of a JSON column mapped as ``attribute``. A compressed
+    value is decoded on first access, so reading one column of the detail
+    group does not decompress the others.
+    """
+    return synonym(attribute, descriptor=_LazyJSONAttribute(attribute))
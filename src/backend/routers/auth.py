@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from typing import Any
 
 from models.database import get_db
@@ -18,9 +19,9 @@ from utils.auth import (
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 @router.post("/register", response_model=UserResponse)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)) -> Any:
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)) -> Any:
     # Check if user already exists
-    if db.query(User).filter(User.email == user_data.email).first():
+    if await db.scalar(select(User).where(User.email == user_data.email)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
@@ -32,18 +33,18 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)) -> Any:
         hashed_password=get_password_hash(user_data.password)
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     
     return user
 
 @router.post("/login", response_model=TokenResponse)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Any:
     # Authenticate user
-    user = db.query(User).filter(User.email == form_data.username).first()
+    user = await db.scalar(select(User).where(User.email == form_data.username))
     if not user or not verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -61,7 +62,7 @@ async def login(
     }
 
 @router.post("/refresh", response_model=TokenResponse)
-async def refresh_token(refresh_token: str, db: Session = Depends(get_db)) -> Any:
+async def refresh_token(refresh_token: str, db: AsyncSession = Depends(get_db)) -> Any:
     email = verify_refresh_token(refresh_token)
     if not email:
         raise HTTPException(
@@ -70,7 +71,7 @@ async def refresh_token(refresh_token: str, db: Session = Depends(get_db)) -> An
         )
     
     # Check if user still exists
-    user = db.query(User).filter(User.email == email).first()
+    user = await db.scalar(select(User).where(User.email == email))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -90,9 +91,9 @@ async def refresh_token(refresh_token: str, db: Session = Depends(get_db)) -> An
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Any:
-    user = db.query(User).filter(User.email == current_user.email).first()
+    user = await db.scalar(select(User).where(User.email == current_user.email))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
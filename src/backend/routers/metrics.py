@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends
+from typing import Any, Dict
+
+from models.models import User
+from services.metrics import collect_stats
+from services.refresh_scheduler import age_distribution, queue_depth
+from utils.auth import get_current_superuser
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+@router.get("/")
+async def get_metrics() -> Dict[str, Any]:
+    """
+    Snapshot of in-process service statistics (HTTP pool, caches, scrapers).
+    """
+    return collect_stats()
+
+@router.get("/refresh-queue")
+def get_refresh_queue(current_user: User = Depends(get_current_superuser)) -> Dict[str, Any]:
+    """
+    Refresh scheduler backlog: models due now and how long ago models were
+    last refreshed. Only for superusers, as both are catalog-wide queries.
+    The scheduler's own counters live in the Celery workers running it; read
+    them with `celery -A worker inspect scraper_stats`.
+    """
+    return {
+        "queue_depth": queue_depth(),
+        "age_distribution": age_distribution(),
+    }
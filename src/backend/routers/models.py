@@ -1,23 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer_group
 from typing import Any, List, Optional, Dict
-from sqlalchemy import or_
+from sqlalchemy import or_, select
 from urllib.parse import unquote
 import traceback
 
 from models.database import get_db
-from models.models import AIModel, User
-from models.schemas import AIModelCreate, AIModelResponse, AIModelUpdate
+from models.models import AIModel, DETAIL_GROUP, User
+from models.schemas import AIModelCreate, AIModelResponse, AIModelSummary, AIModelUpdate
 from utils.auth import get_current_active_user, get_current_superuser
 from services.scraper import scrape_replicate_models, scrape_huggingface_models
-from services.model_scraper import scrape_specific_model
+from services.sync_state import SYNC_MODES
+from services.reparse import reparse_from_store, REPARSERS
+from services.bulk_upsert import stored_content_hash
+from services.classifier import reclassify_catalog
+from services.model_detail import fetch_model, model_to_dict, force_refresh, serve_stored
+from services.negative_cache import missing_models
+from services.lineage import LINEAGE_MAX_DEPTH, RELATIONS, rebuild_lineage, walk_lineage
 
 router = APIRouter(prefix="/models", tags=["models"])
 
-@router.get("/", response_model=List[AIModelResponse])
+async def _load_detail(db: AsyncSession, model_id: str) -> Optional[AIModel]:
+    """The model with its deferred detail columns, in one query; lazy loads cannot run on an async session."""
+    return await db.scalar(
+        select(AIModel)
+        .options(undefer_group(DETAIL_GROUP))
+        .where(AIModel.id == model_id)
+        .execution_options(populate_existing=True)
+    )
+
+@router.get("/", response_model=List[AIModelSummary])
 async def list_models(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
     category: Optional[str] = None,
@@ -25,12 +41,13 @@ async def list_models(
     access_level: Optional[str] = None,
 ) -> Any:
     """
-    Retrieve AI models with filtering options.
+    Retrieve AI models with filtering options. Rows are summaries; the
+    heavy detail columns are only served by the model detail endpoint.
     """
-    query = db.query(AIModel)
+    query = select(AIModel)
     
     if category:
-        query = query.filter(AIModel.category == category)
+        query = query.where(AIModel.category == category)
     
     if search:
         search_filter = or_(
@@ -38,24 +55,24 @@ async def list_models(
             AIModel.description.ilike(f"%{search}%"),
             AIModel.creator.ilike(f"%{search}%"),
         )
-        query = query.filter(search_filter)
+        query = query.where(search_filter)
     
     if access_level:
-        query = query.filter(AIModel.access_level == access_level)
+        query = query.where(AIModel.access_level == access_level)
     
-    total = query.count()
-    models = query.offset(skip).limit(limit).all()
+    models = (await db.scalars(query.offset(skip).limit(limit))).all()
     
     return models
 
 @router.get("/{model_id}")
 async def get_model_detailed(
     model_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Dict[str, Any]:
     """
     Get detailed information about a specific model.
-    If not in database, scrapes it from Hugging Face.
+    Stored models are served immediately and refreshed in the background
+    once stale; if not in database, scrapes it from Hugging Face.
     """
     try:
         print(f"Received request for model_id: {model_id}")
@@ -65,49 +82,24 @@ async def get_model_detailed(
         print(f"Decoded model_id: {decoded_model_id}")
         
         # Try to get from database first
-        model = db.query(AIModel).filter(AIModel.id == decoded_model_id).first()
+        model = await _load_detail(db, decoded_model_id)
         print(f"Found in database: {bool(model)}")
         
         if model:
-            # Convert SQLAlchemy model to dict
-            model_dict = {
-                column.name: getattr(model, column.name)
-                for column in model.__table__.columns
-            }
+            # Served from the database; stale rows are refreshed in the background
             print("Returning model from database")
-            return {"status": "success", "model": model_dict}
+            return serve_stored(model_to_dict(model))
         
-        # If not in database, scrape it
+        # If not in database, scrape it; concurrent misses share one scrape and one insert
         print("Model not found in database, scraping from Hugging Face...")
-        result = await scrape_specific_model(decoded_model_id)
+        result = await fetch_model(decoded_model_id)
         print(f"Scraping result status: {result['status']}")
         
         if result["status"] == "error":
             print(f"Scraping error: {result['message']}")
-            raise HTTPException(status_code=404, detail=result["message"])
+            raise HTTPException(status_code=result.get("status_code", 404), detail=result["message"])
         
-        # Create new model in database
-        try:
-            model_data = result["model"]
-            print("Creating new model in database")
-            model = AIModel(**model_data)
-            db.add(model)
-            db.commit()
-            db.refresh(model)
-            
-            # Convert SQLAlchemy model to dict
-            model_dict = {
-                column.name: getattr(model, column.name)
-                for column in model.__table__.columns
-            }
-            print("Successfully saved and returning model")
-            return {"status": "success", "model": model_dict}
-        except Exception as db_error:
-            print(f"Database error: {str(db_error)}")
-            print(traceback.format_exc())
-            # Return the scraped data even if database storage fails
-            print("Returning scraped data despite database error")
-            return result
+        return result
         
     except HTTPException:
         raise
@@ -119,7 +111,7 @@ async def get_model_detailed(
 @router.post("/", response_model=AIModelResponse)
 async def create_model(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     model_in: AIModelCreate,
     current_user: User = Depends(get_current_superuser),
 ) -> Any:
@@ -128,14 +120,13 @@ async def create_model(
     """
     model = AIModel(**model_in.dict())
     db.add(model)
-    db.commit()
-    db.refresh(model)
-    return model
+    await db.commit()
+    return await _load_detail(db, model.id)
 
 @router.put("/{model_id}", response_model=AIModelResponse)
 async def update_model(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     model_id: str,
     model_in: AIModelUpdate,
     current_user: User = Depends(get_current_superuser),
@@ -143,7 +134,7 @@ async def update_model(
     """
     Update AI model. Only for superusers.
     """
-    model = db.query(AIModel).filter(AIModel.id == model_id).first()
+    model = await _load_detail(db, model_id)
     if not model:
         raise HTTPException(
             status_code=404,
@@ -152,51 +143,160 @@ async def update_model(
     
     for field, value in model_in.dict(exclude_unset=True).items():
         setattr(model, field, value)
+    # Keeps the next scrape from skipping a row whose content no longer matches its hash
+    model.content_hash = stored_content_hash(model)
     
     db.add(model)
-    db.commit()
-    db.refresh(model)
-    return model
+    await db.commit()
+    return await _load_detail(db, model_id)
 
 @router.delete("/{model_id}", response_model=AIModelResponse)
 async def delete_model(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     model_id: str,
     current_user: User = Depends(get_current_superuser),
 ) -> Any:
     """
     Delete AI model. Only for superusers.
     """
-    model = db.query(AIModel).filter(AIModel.id == model_id).first()
+    model = await _load_detail(db, model_id)
     if not model:
         raise HTTPException(
             status_code=404,
             detail="Model not found",
         )
-    db.delete(model)
-    db.commit()
+    await db.delete(model)
+    await db.commit()
     return model
 
 @router.post("/scrape", status_code=202)
 async def scrape_models(
     background_tasks: BackgroundTasks,
+    mode: str = "auto",
     current_user: User = Depends(get_current_superuser),
 ) -> Any:
     """
     Trigger model scraping from Replicate and Hugging Face. Only for superusers.
+    `mode` is 'incremental', 'full' or 'auto' (full sweep only when one is due).
+    """
+    if mode not in SYNC_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(SYNC_MODES)}")
+    background_tasks.add_task(scrape_replicate_models, mode)
+    background_tasks.add_task(scrape_huggingface_models, mode)
+    return {"message": "Model scraping started in the background", "mode": mode}
+
+@router.post("/reparse", status_code=202)
+async def reparse_models(
+    background_tasks: BackgroundTasks,
+    kinds: Optional[List[str]] = Query(None),
+    current_user: User = Depends(get_current_superuser),
+) -> Any:
+    """
+    Rebuild models from stored upstream responses, without re-crawling. Only for superusers.
+    """
+    unknown = set(kinds or ()) - set(REPARSERS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown response kinds: {', '.join(sorted(unknown))}")
+    background_tasks.add_task(reparse_from_store, kinds)
+    return {"message": "Model reparse started in the background"}
+
+@router.post("/reclassify", status_code=202)
+async def reclassify_models(
+    background_tasks: BackgroundTasks,
+    force: bool = False,
+    current_user: User = Depends(get_current_superuser),
+) -> Any:
+    """
+    Recompute model categories with the current classifier. Only rows
+    classified by an older version are updated unless ``force`` is set.
+    Only for superusers.
+    """
+    background_tasks.add_task(reclassify_catalog, force=force)
+    return {"message": "Model reclassification started in the background"}
+
+@router.post("/negative-cache/clear")
+async def clear_negative_cache(
+    model_id: Optional[str] = None,
+    current_user: User = Depends(get_current_superuser),
+) -> Any:
+    """
+    Forget ids cached as missing upstream, or only ``model_id``. Only for
+    superusers. Reaches every worker when NEGATIVE_CACHE_REDIS_URL is set;
+    without it only this process forgets them.
+    """
+    if model_id is not None:
+        await missing_models.discard(unquote(model_id))
+        return {"message": f"Removed {unquote(model_id)} from the negative cache"}
+    removed = await missing_models.clear()
+    return {"message": f"Cleared {removed} negative cache entries"}
+
+async def _lineage(
+    db: AsyncSession, model_id: str, direction: str, relation: Optional[List[str]], max_depth: int, limit: int, cursor: Optional[str]
+) -> Dict[str, Any]:
+    unknown = set(relation or ()) - set(RELATIONS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown relations: {', '.join(sorted(unknown))}")
+    try:
+        return await db.run_sync(walk_lineage, model_id, direction, max_depth, relation, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/lineage/descendants")
+async def get_descendants(
+    model_id: str,
+    relation: Optional[List[str]] = Query(None),
+    max_depth: int = Query(3, ge=1, le=LINEAGE_MAX_DEPTH),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+) -> Dict[str, Any]:
+    """
+    Adapters, finetunes, merges and quantizations of ``model_id``, and
+    theirs, up to ``max_depth`` levels down. ``relation`` restricts the
+    edges followed, e.g. relation=quantization for all quantizations.
+    """
+    return await _lineage(db, model_id, "descendants", relation, max_depth, limit, cursor)
+
+@router.get("/lineage/ancestors")
+async def get_ancestors(
+    model_id: str,
+    relation: Optional[List[str]] = Query(None),
+    max_depth: int = Query(3, ge=1, le=LINEAGE_MAX_DEPTH),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+) -> Dict[str, Any]:
+    """
+    Models ``model_id`` derives from (its base models and theirs), up to ``max_depth`` levels up.
     """
-    background_tasks.add_task(scrape_replicate_models)
-    background_tasks.add_task(scrape_huggingface_models)
-    return {"message": "Model scraping started in the background"}
+    return await _lineage(db, model_id, "ancestors", relation, max_depth, limit, cursor)
+
+@router.post("/lineage/rebuild", status_code=202)
+async def rebuild_model_lineage(
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_superuser),
+) -> Any:
+    """
+    Re-derive the lineage edge table from the stored model trees and cards. Only for superusers.
+    """
+    background_tasks.add_task(rebuild_lineage)
+    return {"message": "Lineage rebuild started in the background"}
 
 @router.get("/{model_id}/refresh")
-async def refresh_model(model_id: str) -> Dict[str, Any]:
+async def refresh_model(
+    model_id: str,
+    current_user: User = Depends(get_current_superuser),
+) -> Dict[str, Any]:
     """
-    Force refresh model data from Hugging Face.
+    Force refresh model data from Hugging Face and store it. Only for
+    superusers; ids in the negative cache are scraped again too.
     """
-    result = await scrape_specific_model(model_id)
+    decoded_model_id = unquote(model_id)
+    result = await force_refresh(decoded_model_id)
     if result["status"] == "error":
-        raise HTTPException(status_code=404, detail=result["message"])
-    
+        raise HTTPException(status_code=result.get("status_code", 404), detail=result["message"])
+
+    # The model exists upstream again; stop refusing it
+    await missing_models.discard(decoded_model_id)
     return result 
\ No newline at end of file
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Any, List, Optional
 from datetime import datetime
-from sqlalchemy import or_
+from sqlalchemy import or_, select
 
 from models.database import get_db
 from models.models import Newsletter, User
@@ -18,7 +18,7 @@ router = APIRouter(
 @router.get("/", response_model=List[NewsletterResponse])
 async def list_newsletters(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
     category: Optional[str] = None,
@@ -27,10 +27,10 @@ async def list_newsletters(
     """
     Retrieve newsletters with filtering options.
     """
-    query = db.query(Newsletter)
+    query = select(Newsletter)
     
     if category:
-        query = query.filter(Newsletter.category == category)
+        query = query.where(Newsletter.category == category)
     
     if search:
         search_filter = or_(
@@ -38,17 +38,16 @@ async def list_newsletters(
             Newsletter.description.ilike(f"%{search}%"),
             Newsletter.author.ilike(f"%{search}%"),
         )
-        query = query.filter(search_filter)
+        query = query.where(search_filter)
     
-    total = query.count()
-    newsletters = query.offset(skip).limit(limit).all()
+    newsletters = (await db.scalars(query.offset(skip).limit(limit))).all()
     
     return newsletters
 
 @router.post("/", response_model=NewsletterResponse)
 async def create_newsletter(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     newsletter_in: NewsletterCreate,
     current_user: User = Depends(get_current_superuser),
 ) -> Any:
@@ -57,20 +56,20 @@ async def create_newsletter(
     """
     newsletter = Newsletter(**newsletter_in.dict())
     db.add(newsletter)
-    db.commit()
-    db.refresh(newsletter)
+    await db.commit()
+    await db.refresh(newsletter)
     return newsletter
 
 @router.get("/{newsletter_id}", response_model=NewsletterResponse)
 async def get_newsletter(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     newsletter_id: str,
 ) -> Any:
     """
     Get newsletter by ID.
     """
-    newsletter = db.query(Newsletter).filter(Newsletter.id == newsletter_id).first()
+    newsletter = await db.scalar(select(Newsletter).where(Newsletter.id == newsletter_id))
     if not newsletter:
         raise HTTPException(
             status_code=404,
@@ -81,7 +80,7 @@ async def get_newsletter(
 @router.put("/{newsletter_id}", response_model=NewsletterResponse)
 async def update_newsletter(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     newsletter_id: str,
     newsletter_in: NewsletterUpdate,
     current_user: User = Depends(get_current_superuser),
@@ -89,7 +88,7 @@ async def update_newsletter(
     """
     Update newsletter. Only for superusers.
     """
-    newsletter = db.query(Newsletter).filter(Newsletter.id == newsletter_id).first()
+    newsletter = await db.scalar(select(Newsletter).where(Newsletter.id == newsletter_id))
     if not newsletter:
         raise HTTPException(
             status_code=404,
@@ -100,41 +99,41 @@ async def update_newsletter(
         setattr(newsletter, field, value)
     
     db.add(newsletter)
-    db.commit()
-    db.refresh(newsletter)
+    await db.commit()
+    await db.refresh(newsletter)
     return newsletter
 
 @router.delete("/{newsletter_id}", response_model=NewsletterResponse)
 async def delete_newsletter(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     newsletter_id: str,
     current_user: User = Depends(get_current_superuser),
 ) -> Any:
     """
     Delete newsletter. Only for superusers.
     """
-    newsletter = db.query(Newsletter).filter(Newsletter.id == newsletter_id).first()
+    newsletter = await db.scalar(select(Newsletter).where(Newsletter.id == newsletter_id))
     if not newsletter:
         raise HTTPException(
             status_code=404,
             detail="Newsletter not found",
         )
-    db.delete(newsletter)
-    db.commit()
+    await db.delete(newsletter)
+    await db.commit()
     return newsletter
 
 @router.post("/{newsletter_id}/send")
 async def send_newsletter(
     newsletter_id: int,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_superuser)
 ):
     """
     Send a newsletter that hasn't been sent yet. Only accessible to superusers.
     """
-    newsletter = db.query(Newsletter).filter(Newsletter.id == newsletter_id).first()
+    newsletter = await db.scalar(select(Newsletter).where(Newsletter.id == newsletter_id))
     if not newsletter:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -156,5 +155,5 @@ async def send_newsletter(
         newsletter.content
     )
     
-    db.commit()
+    await db.commit()
     return {"message": "Newsletter sending started"} 
\ No newline at end of file
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Any, List, Optional
 from datetime import datetime, timedelta
-from sqlalchemy import or_
+from sqlalchemy import or_, select
 
 from models.database import get_db
 from models.models import Subscription, User
@@ -19,7 +19,7 @@ router = APIRouter(
 @router.get("/", response_model=List[SubscriptionResponse])
 async def list_subscriptions(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
     status: Optional[str] = None,
@@ -28,35 +28,34 @@ async def list_subscriptions(
     """
     Retrieve subscriptions with filtering options.
     """
-    query = db.query(Subscription)
+    query = select(Subscription)
     
     if status:
-        query = query.filter(Subscription.status == status)
+        query = query.where(Subscription.status == status)
     
     if search:
         search_filter = or_(
             Subscription.plan.ilike(f"%{search}%"),
             Subscription.payment_status.ilike(f"%{search}%"),
         )
-        query = query.filter(search_filter)
+        query = query.where(search_filter)
     
-    total = query.count()
-    subscriptions = query.offset(skip).limit(limit).all()
+    subscriptions = (await db.scalars(query.offset(skip).limit(limit))).all()
     
     return subscriptions
 
 @router.get("/my", response_model=SubscriptionResponse)
 async def get_my_subscription(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Get the current user's subscription.
     """
-    subscription = db.query(Subscription).filter(
+    subscription = await db.scalar(select(Subscription).where(
         Subscription.user_id == current_user.id,
         Subscription.status == "active"
-    ).first()
+    ))
     
     if not subscription:
         raise HTTPException(
@@ -68,7 +67,7 @@ async def get_my_subscription(
 @router.post("/", response_model=SubscriptionResponse)
 async def create_subscription(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     subscription_in: SubscriptionCreate,
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
@@ -77,21 +76,21 @@ async def create_subscription(
     """
     subscription = Subscription(**subscription_in.dict())
     db.add(subscription)
-    db.commit()
-    db.refresh(subscription)
+    await db.commit()
+    await db.refresh(subscription)
     return subscription
 
 @router.get("/{subscription_id}", response_model=SubscriptionResponse)
 async def get_subscription(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     subscription_id: str,
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
     Get subscription by ID.
     """
-    subscription = db.query(Subscription).filter(Subscription.id == subscription_id).first()
+    subscription = await db.scalar(select(Subscription).where(Subscription.id == subscription_id))
     if not subscription:
         raise HTTPException(
             status_code=404,
@@ -111,16 +110,16 @@ async def get_subscription(
 async def update_my_subscription(
     subscription_update: SubscriptionUpdate,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Update the current user's subscription.
     """
-    subscription = db.query(Subscription).filter(
+    subscription = await db.scalar(select(Subscription).where(
         Subscription.user_id == current_user.id,
         Subscription.status == "active"
-    ).first()
+    ))
     
     if not subscription:
         raise HTTPException(
@@ -148,23 +147,23 @@ async def update_my_subscription(
         if key != "plan":  # Plan is handled separately above
             setattr(subscription, key, value)
     
-    db.commit()
-    db.refresh(subscription)
+    await db.commit()
+    await db.refresh(subscription)
     return subscription
 
 @router.delete("/my")
 async def cancel_my_subscription(
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Cancel the current user's subscription.
     """
-    subscription = db.query(Subscription).filter(
+    subscription = await db.scalar(select(Subscription).where(
         Subscription.user_id == current_user.id,
         Subscription.status == "active"
-    ).first()
+    ))
     
     if not subscription:
         raise HTTPException(
@@ -184,13 +183,13 @@ async def cancel_my_subscription(
     subscription.status = "cancelled"
     current_user.subscription_plan = "free"
     
-    db.commit()
+    await db.commit()
     return {"message": "Subscription cancelled successfully"}
 
 @router.put("/{subscription_id}", response_model=SubscriptionResponse)
 async def update_subscription(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     subscription_id: str,
     subscription_in: SubscriptionUpdate,
     current_user: User = Depends(get_current_superuser),
@@ -198,7 +197,7 @@ async def update_subscription(
     """
     Update subscription. Only for superusers.
     """
-    subscription = db.query(Subscription).filter(Subscription.id == subscription_id).first()
+    subscription = await db.scalar(select(Subscription).where(Subscription.id == subscription_id))
     if not subscription:
         raise HTTPException(
             status_code=404,
@@ -209,26 +208,26 @@ async def update_subscription(
         setattr(subscription, field, value)
     
     db.add(subscription)
-    db.commit()
-    db.refresh(subscription)
+    await db.commit()
+    await db.refresh(subscription)
     return subscription
 
 @router.delete("/{subscription_id}", response_model=SubscriptionResponse)
 async def delete_subscription(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     subscription_id: str,
     current_user: User = Depends(get_current_superuser),
 ) -> Any:
     """
     Delete subscription. Only for superusers.
     """
-    subscription = db.query(Subscription).filter(Subscription.id == subscription_id).first()
+    subscription = await db.scalar(select(Subscription).where(Subscription.id == subscription_id))
     if not subscription:
         raise HTTPException(
             status_code=404,
             detail="Subscription not found",
         )
-    db.delete(subscription)
-    db.commit()
+    await db.delete(subscription)
+    await db.commit()
     return subscription 
\ No newline at end of file
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Any, List, Optional
-from sqlalchemy import or_
+from sqlalchemy import or_, select
 
 from models.database import get_db
 from models.models import Tool, User
@@ -16,7 +16,7 @@ router = APIRouter(
 @router.get("/", response_model=List[ToolResponse])
 async def list_tools(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
     category: Optional[str] = None,
@@ -25,10 +25,10 @@ async def list_tools(
     """
     Retrieve tools with filtering options.
     """
-    query = db.query(Tool)
+    query = select(Tool)
     
     if category:
-        query = query.filter(Tool.category == category)
+        query = query.where(Tool.category == category)
     
     if search:
         search_filter = or_(
@@ -36,17 +36,16 @@ async def list_tools(
             Tool.description.ilike(f"%{search}%"),
             Tool.creator.ilike(f"%{search}%"),
         )
-        query = query.filter(search_filter)
+        query = query.where(search_filter)
     
-    total = query.count()
-    tools = query.offset(skip).limit(limit).all()
+    tools = (await db.scalars(query.offset(skip).limit(limit))).all()
     
     return tools
 
 @router.post("/", response_model=ToolResponse)
 async def create_tool(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     tool_in: ToolCreate,
     current_user: User = Depends(get_current_superuser),
 ) -> Any:
@@ -55,20 +54,20 @@ async def create_tool(
     """
     tool = Tool(**tool_in.dict())
     db.add(tool)
-    db.commit()
-    db.refresh(tool)
+    await db.commit()
+    await db.refresh(tool)
     return tool
 
 @router.get("/{tool_id}", response_model=ToolResponse)
 async def get_tool(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     tool_id: str,
 ) -> Any:
     """
     Get tool by ID.
     """
-    tool = db.query(Tool).filter(Tool.id == tool_id).first()
+    tool = await db.scalar(select(Tool).where(Tool.id == tool_id))
     if not tool:
         raise HTTPException(
             status_code=404,
@@ -79,7 +78,7 @@ async def get_tool(
 @router.put("/{tool_id}", response_model=ToolResponse)
 async def update_tool(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     tool_id: str,
     tool_in: ToolUpdate,
     current_user: User = Depends(get_current_superuser),
@@ -87,7 +86,7 @@ async def update_tool(
     """
     Update tool. Only for superusers.
     """
-    tool = db.query(Tool).filter(Tool.id == tool_id).first()
+    tool = await db.scalar(select(Tool).where(Tool.id == tool_id))
     if not tool:
         raise HTTPException(
             status_code=404,
@@ -98,26 +97,26 @@ async def update_tool(
         setattr(tool, field, value)
     
     db.add(tool)
-    db.commit()
-    db.refresh(tool)
+    await db.commit()
+    await db.refresh(tool)
     return tool
 
 @router.delete("/{tool_id}", response_model=ToolResponse)
 async def delete_tool(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     tool_id: str,
     current_user: User = Depends(get_current_superuser),
 ) -> Any:
     """
     Delete tool. Only for superusers.
     """
-    tool = db.query(Tool).filter(Tool.id == tool_id).first()
+    tool = await db.scalar(select(Tool).where(Tool.id == tool_id))
     if not tool:
         raise HTTPException(
             status_code=404,
             detail="Tool not found",
         )
-    db.delete(tool)
-    db.commit()
+    await db.delete(tool)
+    await db.commit()
     return tool 
\ No newline at end of file
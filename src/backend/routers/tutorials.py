@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Any, List, Optional
-from sqlalchemy import or_
+from sqlalchemy import or_, select
 
 from models.database import get_db
 from models.models import Tutorial, User
@@ -13,7 +13,7 @@ router = APIRouter()
 @router.get("/", response_model=List[TutorialResponse])
 async def list_tutorials(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
     category: Optional[str] = None,
@@ -22,10 +22,10 @@ async def list_tutorials(
     """
     Retrieve tutorials with filtering options.
     """
-    query = db.query(Tutorial)
+    query = select(Tutorial)
     
     if category:
-        query = query.filter(Tutorial.category == category)
+        query = query.where(Tutorial.category == category)
     
     if search:
         search_filter = or_(
@@ -33,17 +33,16 @@ async def list_tutorials(
             Tutorial.description.ilike(f"%{search}%"),
             Tutorial.author.ilike(f"%{search}%"),
         )
-        query = query.filter(search_filter)
+        query = query.where(search_filter)
     
-    total = query.count()
-    tutorials = query.offset(skip).limit(limit).all()
+    tutorials = (await db.scalars(query.offset(skip).limit(limit))).all()
     
     return tutorials
 
 @router.post("/", response_model=TutorialResponse)
 async def create_tutorial(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     tutorial_in: TutorialCreate,
     current_user: User = Depends(get_current_superuser),
 ) -> Any:
@@ -52,20 +51,20 @@ async def create_tutorial(
     """
     tutorial = Tutorial(**tutorial_in.dict())
     db.add(tutorial)
-    db.commit()
-    db.refresh(tutorial)
+    await db.commit()
+    await db.refresh(tutorial)
     return tutorial
 
 @router.get("/{tutorial_id}", response_model=TutorialResponse)
 async def get_tutorial(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     tutorial_id: str,
 ) -> Any:
     """
     Get tutorial by ID.
     """
-    tutorial = db.query(Tutorial).filter(Tutorial.id == tutorial_id).first()
+    tutorial = await db.scalar(select(Tutorial).where(Tutorial.id == tutorial_id))
     if not tutorial:
         raise HTTPException(
             status_code=404,
@@ -76,7 +75,7 @@ async def get_tutorial(
 @router.put("/{tutorial_id}", response_model=TutorialResponse)
 async def update_tutorial(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     tutorial_id: str,
     tutorial_in: TutorialUpdate,
     current_user: User = Depends(get_current_superuser),
@@ -84,7 +83,7 @@ async def update_tutorial(
     """
     Update tutorial. Only for superusers.
     """
-    tutorial = db.query(Tutorial).filter(Tutorial.id == tutorial_id).first()
+    tutorial = await db.scalar(select(Tutorial).where(Tutorial.id == tutorial_id))
     if not tutorial:
         raise HTTPException(
             status_code=404,
@@ -95,40 +94,40 @@ async def update_tutorial(
         setattr(tutorial, field, value)
     
     db.add(tutorial)
-    db.commit()
-    db.refresh(tutorial)
+    await db.commit()
+    await db.refresh(tutorial)
     return tutorial
 
 @router.delete("/{tutorial_id}", response_model=TutorialResponse)
 async def delete_tutorial(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     tutorial_id: str,
     current_user: User = Depends(get_current_superuser),
 ) -> Any:
     """
     Delete tutorial. Only for superusers.
     """
-    tutorial = db.query(Tutorial).filter(Tutorial.id == tutorial_id).first()
+    tutorial = await db.scalar(select(Tutorial).where(Tutorial.id == tutorial_id))
     if not tutorial:
         raise HTTPException(
             status_code=404,
             detail="Tutorial not found",
         )
-    db.delete(tutorial)
-    db.commit()
+    await db.delete(tutorial)
+    await db.commit()
     return tutorial
 
 @router.post("/{tutorial_id}/upvote")
 async def upvote_tutorial(
     tutorial_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Upvote a tutorial.
     """
-    tutorial = db.query(Tutorial).filter(Tutorial.id == tutorial_id).first()
+    tutorial = await db.scalar(select(Tutorial).where(Tutorial.id == tutorial_id))
     if not tutorial:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -136,5 +135,5 @@ async def upvote_tutorial(
         )
     
     tutorial.upvotes += 1
-    db.commit()
+    await db.commit()
     return {"message": "Tutorial upvoted successfully"} 
\ No newline at end of file
@@ -0,0 +1,263 @@
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from models.database import SessionLocal
+from models.models import AIModel
+from models.types import LazyJSON
+from services.lineage import replace_lineage
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Rows written per transaction
+UPSERT_CHUNK_SIZE = int(os.getenv("UPSERT_CHUNK_SIZE", "500"))
+
+# Bound parameters per INSERT statement, below the SQLite and Postgres limits
+_MAX_STATEMENT_PARAMS = 30000
+
+# Managed by the database, never taken from scraped rows
+_SERVER_COLUMNS = ("created_at", "updated_at", "content_hash")
+
+# Scheduling state rather than scraped content: left out of the content hash
+# and written without bumping updated_at
+BOOKKEEPING_COLUMNS = frozenset({"last_scraped_at", "next_refresh_at", "unchanged_refreshes"})
+
+# Stored columns the content hash covers, on every path that writes content
+CONTENT_COLUMNS = tuple(
+    column for column in AIModel.__table__.columns
+    if column.key not in _SERVER_COLUMNS and column.key not in BOOKKEEPING_COLUMNS
+)
+# Values a column holds when a row leaves it out; hashed as if left out
+_COLUMN_DEFAULTS = {
+    column.key: column.default.arg
+    for column in CONTENT_COLUMNS
+    if column.default is not None and column.default.is_scalar
+}
+
+# Mapped attribute of each column, the keys the ORM bulk methods expect
+_ATTRIBUTES = {
+    column.key: AIModel.__mapper__.get_property_by_column(column).key for column in AIModel.__table__.columns
+}
+
+_DIALECT_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+@dataclass
+class UpsertReport:
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0  # Content identical to the stored row, not written
+    chunks: int = 0
+
+    def add(self, other: "UpsertReport") -> None:
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.skipped += other.skipped
+        self.chunks += other.chunks
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+def _canonical(value: Any) -> Any:
+    if isinstance(value, LazyJSON):
+        return value.value
+    # Scraped timestamps may be naive or aware; both hash as naive UTC
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.isoformat()
+    return str(value)
+
+def content_hash(row: Dict[str, Any]) -> str:
+    """
+    SHA-256 over a canonical serialization of the content columns of
+    ``row``: sorted keys, no whitespace, timestamps as naive UTC. Missing
+    columns, NULLs and column defaults all hash alike, so a scraped row
+    hashes the same as the row it is stored as.
+    """
+    content = {}
+    for column in CONTENT_COLUMNS:
+        value = row.get(column.key)
+        if column.key != "id" and value is not None and not (
+            column.key in _COLUMN_DEFAULTS and value == _COLUMN_DEFAULTS[column.key]
+        ):
+            content[column.key] = value
+    payload = json.dumps(content, sort_keys=True, separators=(",", ":"), default=_canonical)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def stored_content_hash(model: Any) -> str:
+    """
+    content_hash of the stored content of ``model``: an AIModel with its
+    deferred columns loaded, or a row selecting CONTENT_COLUMNS. For writes
+    that bypass bulk_upsert_models (manual edits, reclassification).
+    """
+    return content_hash({column.key: getattr(model, column.key) for column in CONTENT_COLUMNS})
+
+def _split_bookkeeping(row: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+    """The bookkeeping part of ``row`` (with its id) and whether it has any content."""
+    bookkeeping = {key: value for key, value in row.items() if key in BOOKKEEPING_COLUMNS}
+    return {"id": row["id"], **bookkeeping}, len(bookkeeping) + 1 < len(row)
+
+def touch_models(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """
+    Update bookkeeping columns by id without bumping ``updated_at``, so it
+    keeps meaning "the scraped content changed". The caller commits.
+    """
+    table = AIModel.__table__
+    layouts: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for row in rows:
+        layouts.setdefault(tuple(sorted(key for key in row if key != "id")), []).append(row)
+
+    for keys, group in layouts.items():
+        if not keys:
+            continue
+        statement = (
+            update(table)
+            .where(table.c.id == bindparam("_id"))
+            # Assigning updated_at to itself suppresses its onupdate default
+            .values(updated_at=table.c.updated_at, **{key: bindparam(key) for key in keys})
+        )
+        db.execute(statement, [{"_id": row["id"], **{key: row[key] for key in keys}} for row in group])
+
+def _kept_content(db: Session, rows: List[Dict[str, Any]], stored: Set[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    The stored values of the content columns that rows updating an existing
+    model leave out, by id, in one query. The upsert keeps those values, so
+    the new content hash has to cover them.
+    """
+    partial = {
+        row["id"]: [column for column in CONTENT_COLUMNS if column.key not in row]
+        for row in rows if row["id"] in stored
+    }
+    partial = {model_id: columns for model_id, columns in partial.items() if columns}
+    if not partial:
+        return {}
+    columns = {column.key: column for missing in partial.values() for column in missing}
+    loaded = db.execute(
+        select(AIModel.__table__.c.id, *columns.values()).where(AIModel.id.in_(list(partial)))
+    ).all()
+    return {
+        row.id: {column.key: getattr(row, column.key) for column in partial[row.id]}
+        for row in loaded
+    }
+
+def _plan_chunk(
+    db: Session, rows: List[Dict[str, Any]], report: UpsertReport
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Set[str]]:
+    """
+    Load the stored content hashes of the chunk in one query. Returns the
+    new or changed rows (with their new hash), the bookkeeping-only updates
+    of unchanged rows, and the ids among the changed rows that already exist.
+    """
+    stored = dict(db.execute(
+        select(AIModel.id, AIModel.content_hash).where(AIModel.id.in_([row["id"] for row in rows]))
+    ).all())
+    kept = _kept_content(db, [row for row in rows if _split_bookkeeping(row)[1]], set(stored))
+    changed, touched = [], []
+    for row in rows:
+        bookkeeping, has_content = _split_bookkeeping(row)
+        if not has_content:
+            # Nothing scraped to store: never insert a stub for an unknown id
+            report.skipped += 1
+            if row["id"] in stored:
+                touched.append(bookkeeping)
+            continue
+        fingerprint = content_hash({**kept.get(row["id"], {}), **row})
+        if row["id"] not in stored:
+            report.inserted += 1
+        elif stored[row["id"]] == fingerprint:
+            report.skipped += 1
+            touched.append(bookkeeping)
+            continue
+        else:
+            report.updated += 1
+        changed.append({**row, "content_hash": fingerprint})
+    return changed, touched, set(stored)
+
+def _write_native(db: Session, rows: List[Dict[str, Any]], insert: Callable) -> None:
+    """INSERT ... ON CONFLICT (id) DO UPDATE, one statement per column layout."""
+    layouts: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for row in rows:
+        layouts.setdefault(tuple(sorted(row)), []).append(row)
+
+    for keys, group in layouts.items():
+        step = max(1, _MAX_STATEMENT_PARAMS // len(keys))
+        for start in range(0, len(group), step):
+            statement = insert(AIModel).values(group[start:start + step])
+            updates = {key: statement.excluded[key] for key in keys if key != "id"}
+            updates["updated_at"] = func.now()
+            db.execute(statement.on_conflict_do_update(index_elements=[AIModel.id], set_=updates))
+
+def _write_orm(db: Session, rows: List[Dict[str, Any]], existing_ids: Set[str]) -> None:
+    """Fallback for dialects without ON CONFLICT: ORM bulk insert and bulk update."""
+    rows = [{_ATTRIBUTES.get(key, key): value for key, value in row.items()} for row in rows]
+    inserts = [row for row in rows if row["id"] not in existing_ids]
+    updates = [{**row, "updated_at": datetime.utcnow()} for row in rows if row["id"] in existing_ids]
+    if inserts:
+        db.bulk_insert_mappings(AIModel, inserts)
+    if updates:
+        db.bulk_update_mappings(AIModel, updates)
+
+def bulk_upsert_models(
+    rows: List[Dict[str, Any]],
+    chunk_size: int = UPSERT_CHUNK_SIZE,
+    session_factory: Callable[[], Session] = SessionLocal,
+) -> UpsertReport:
+    """
+    Insert or update normalized AIModel rows, committing every ``chunk_size`` rows.
+
+    Each chunk costs one SELECT of the stored content hashes of its ids and
+    one native upsert per column layout on SQLite and Postgres. Rows whose
+    content hash matches the stored one are not rewritten; only their
+    bookkeeping columns are updated, so ``updated_at`` only moves when the
+    scraped content changed. Lineage edges of changed rows are replaced in
+    the same transaction.
+    """
+    report = UpsertReport()
+    # Later duplicates of an id win, as they would with row-by-row writes
+    latest = {
+        row["id"]: {key: value for key, value in row.items() if key not in _SERVER_COLUMNS}
+        for row in rows
+    }
+    rows = list(latest.values())
+
+    db = session_factory()
+    try:
+        insert = _DIALECT_INSERTS.get(db.get_bind().dialect.name)
+        for start in range(0, len(rows), chunk_size):
+            chunk_report = UpsertReport(chunks=1)
+            changed, touched, existing_ids = _plan_chunk(db, rows[start:start + chunk_size], chunk_report)
+            if changed:
+                if insert is not None:
+                    _write_native(db, changed, insert)
+                else:
+                    _write_orm(db, changed, existing_ids)
+                replace_lineage(db, changed)
+            if touched:
+                touch_models(db, touched)
+            if changed or touched:
+                db.commit()
+            logger.info(
+                f"Upserted chunk of {min(chunk_size, len(rows) - start)} models: "
+                f"{chunk_report.inserted} inserted, {chunk_report.updated} updated, {chunk_report.skipped} skipped"
+            )
+            report.add(chunk_report)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return report
@@ -0,0 +1,249 @@
+import bisect
+import logging
+import os
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+
+from models.database import SessionLocal
+from models.models import AIModel
+from services.bulk_upsert import CONTENT_COLUMNS, content_hash
+
+try:
+    import ahocorasick
+except ImportError:  # Optional dependency, a compiled regex is used instead
+    ahocorasick = None
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever MODEL_CATEGORIES or the matching rules change, so the
+# reclassification job recomputes rows classified by an older version
+CLASSIFIER_VERSION = 1
+
+RECLASSIFY_CHUNK_SIZE = int(os.getenv("RECLASSIFY_CHUNK_SIZE", "1000"))
+
+# Define model categories and their associated keywords
+MODEL_CATEGORIES = {
+    "text-generation": [
+        "text-generation", "gpt", "llm", "language-model", "chat", "completion",
+        "text2text", "summarization", "translation"
+    ],
+    "image-generation": [
+        "text-to-image", "image-generation", "stable-diffusion", "gan",
+        "text2image", "diffusion", "dalle", "midjourney"
+    ],
+    "image-to-text": [
+        "image-to-text", "image-captioning", "ocr", "optical-character-recognition",
+        "visual-question-answering", "image2text"
+    ],
+    "text-to-speech": [
+        "text-to-speech", "tts", "speech-synthesis", "voice-generation",
+        "text2speech", "audio-generation"
+    ],
+    "speech-to-text": [
+        "speech-to-text", "speech-recognition", "transcription", "stt",
+        "voice-recognition", "speech2text"
+    ],
+    "audio-generation": [
+        "audio-generation", "music-generation", "sound-generation",
+        "audio-synthesis", "music-synthesis"
+    ],
+    "computer-vision": [
+        "object-detection", "image-classification", "face-detection",
+        "semantic-segmentation", "pose-estimation", "image-recognition"
+    ],
+    "video-generation": [
+        "text-to-video", "video-generation", "animation", "motion-synthesis",
+        "text2video"
+    ],
+    "multimodal": [
+        "multimodal", "vision-language", "audio-visual", "multi-task",
+        "cross-modal"
+    ],
+    "other": []  # Fallback category
+}
+
+FALLBACK_CATEGORY = "other"
+
+# Separates texts of a batch; never part of a keyword, so no match spans two models
+_SEPARATOR = "\x00"
+
+def category_input(model_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields used by determine_model_category, with missing values as empty strings."""
+    return {
+        "description": model_data.get("description") or "",
+        "tags": model_data.get("tags") or [],
+        "name": model_data.get("name") or "",
+        "pipeline_tag": model_data.get("pipeline_tag") or ""
+    }
+
+def category_text(model_data: Dict[str, Any]) -> str:
+    """Combine all relevant text for category matching."""
+    return " ".join([
+        model_data.get("description", "").lower(),
+        " ".join(model_data.get("tags", [])).lower(),
+        model_data.get("pipeline_tag", "").lower(),
+        model_data.get("name", "").lower()
+    ])
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """Regex alternation of ``keywords`` factored into a prefix trie, preferring the longest match."""
+    root: Dict[str, Any] = {}
+    for keyword in keywords:
+        node = root
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(root)
+
+class CompiledClassifier:
+    """
+    Keyword classifier equivalent to scanning MODEL_CATEGORIES in order with
+    ``keyword in text``: a model gets the first category any of whose
+    keywords occurs in its text.
+
+    All keywords are compiled once into a single Aho-Corasick automaton
+    (when pyahocorasick is installed) or a trie-shaped regex, and a batch is
+    classified in one scan over its joined texts.
+    """
+
+    def __init__(self, categories: Dict[str, List[str]] = MODEL_CATEGORIES, version: int = CLASSIFIER_VERSION):
+        self.version = version
+        self.categories = list(categories)
+        priority: Dict[str, int] = {}
+        for index, keywords in enumerate(categories.values()):
+            for keyword in keywords:
+                priority.setdefault(keyword, index)
+        # Any keyword that is a prefix of another also occurs wherever the longer one
+        # does; folding it in lets a longest-match scan report the best category
+        self._priority = {
+            keyword: min(rank for other, rank in priority.items() if keyword.startswith(other))
+            for keyword in priority
+        }
+        self._fallback = len(self.categories)
+
+        if ahocorasick is not None:
+            self.backend = "aho-corasick"
+            self._automaton = ahocorasick.Automaton()
+            for keyword, rank in self._priority.items():
+                self._automaton.add_word(keyword, (len(keyword), rank))
+            self._automaton.make_automaton()
+        else:
+            self.backend = "regex"
+            self._pattern = re.compile(_trie_pattern(sorted(self._priority)))
+
+    def _scan(self, joined: str, starts: List[int]) -> List[int]:
+        best = [self._fallback] * len(starts)
+        if not self._priority:
+            return best
+        if self.backend == "aho-corasick":
+            for end, (length, rank) in self._automaton.iter(joined):
+                item = bisect.bisect_right(starts, end - length + 1) - 1
+                if rank < best[item]:
+                    best[item] = rank
+            return best
+
+        search = self._pattern.search
+        position = 0
+        while True:
+            match = search(joined, position)
+            if match is None:
+                return best
+            item = bisect.bisect_right(starts, match.start()) - 1
+            rank = self._priority[match.group()]
+            if rank < best[item]:
+                best[item] = rank
+            if rank == 0 and item + 1 < len(starts):
+                # Nothing can beat the first category; skip to the next model
+                position = starts[item + 1]
+            else:
+                # Restart right after the match start so overlapping keywords are seen
+                position = match.start() + 1
+
+    def classify_texts(self, texts: List[str]) -> List[str]:
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + len(_SEPARATOR)
+        ranks = self._scan(_SEPARATOR.join(texts), starts)
+        return [self.categories[rank] if rank < self._fallback else FALLBACK_CATEGORY for rank in ranks]
+
+    def classify_batch(self, models: List[Dict[str, Any]]) -> List[str]:
+        """Categories for a batch of category_input() dicts, in one scan."""
+        return self.classify_texts([category_text(model) for model in models])
+
+    def classify(self, model_data: Dict[str, Any]) -> str:
+        return self.classify_texts([category_text(model_data)])[0]
+
+classifier = CompiledClassifier()
+
+def reclassify_catalog(
+    chunk_size: int = RECLASSIFY_CHUNK_SIZE,
+    force: bool = False,
+    session_factory: Callable[[], Session] = SessionLocal,
+    model_classifier: Optional[CompiledClassifier] = None,
+) -> Dict[str, Any]:
+    """
+    Recompute AIModel.category for the stored catalog, ``chunk_size`` rows
+    per transaction. Only rows classified by an older classifier version
+    (or never versioned) are touched unless ``force`` is set.
+    """
+    model_classifier = model_classifier or classifier
+    report = {"version": model_classifier.version, "scanned": 0, "changed": 0, "chunks": 0}
+    last_id = ""
+    db = session_factory()
+    try:
+        while True:
+            # Every content column, since the content hash covers the category
+            query = select(*CONTENT_COLUMNS).where(AIModel.id > last_id)
+            if not force:
+                query = query.where(or_(
+                    AIModel.category_version.is_(None),
+                    AIModel.category_version < model_classifier.version
+                ))
+            rows = db.execute(query.order_by(AIModel.id).limit(chunk_size)).all()
+            if not rows:
+                break
+
+            categories = model_classifier.classify_batch([category_input(row._asdict()) for row in rows])
+            updates = []
+            for row, category in zip(rows, categories):
+                values = {**row._asdict(), "category": category, "category_version": model_classifier.version}
+                updates.append({
+                    "id": row.id,
+                    "category": category,
+                    "category_version": model_classifier.version,
+                    "content_hash": content_hash(values),
+                })
+            db.execute(update(AIModel), updates)
+            db.commit()
+
+            report["scanned"] += len(rows)
+            report["changed"] += sum(1 for row, category in zip(rows, categories) if row.category != category)
+            report["chunks"] += 1
+            last_id = rows[-1].id
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    logger.info(
+        f"Reclassified {report['scanned']} models with classifier v{report['version']}: "
+        f"{report['changed']} changed category"
+    )
+    return report
@@ -0,0 +1,111 @@
+import logging
+import os
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from services.http_cache import revalidation_cache
+from services.ingestion import ingestion_complete, run_ingestion
+from services.model_scraper import HuggingFaceCatalogSource
+from services.rate_limit import upstream_limits
+from services.sync_state import SyncPlan, record_sync
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Number of id-hash shards the catalog crawl is split into; more shards than
+# worker processes keeps every process busy until the end
+CRAWL_SHARDS = int(os.getenv("CRAWL_SHARDS", "8"))
+CRAWL_SHARD_MAX_RETRIES = int(os.getenv("CRAWL_SHARD_MAX_RETRIES", "3"))
+CRAWL_SHARD_RETRY_DELAY = float(os.getenv("CRAWL_SHARD_RETRY_DELAY", "60"))
+# Worker processes crawling shards at the same time. Without a shared
+# UPSTREAM_LIMITS_REDIS_URL each gets this fraction of the upstream budgets.
+CRAWL_WORKERS = int(os.getenv("CRAWL_WORKERS") or min(CRAWL_SHARDS, os.cpu_count() or 1))
+
+def shard_retry_delay(retries: int) -> float:
+    """Seconds before retrying a shard that failed ``retries`` times already."""
+    return CRAWL_SHARD_RETRY_DELAY * 2 ** retries
+
+async def sync_huggingface_shard(
+    index: int,
+    shards: int,
+    since: Optional[datetime] = None,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Ingest shard ``index`` of ``shards`` of the Hugging Face catalog. The
+    sync state is left alone; finish_sharded_sync records it once every
+    shard has reported. A shard only counts as complete when no stage lost
+    a model.
+    """
+    source = HuggingFaceCatalogSource(since=since, shard=(index, shards))
+    # Shards run concurrently in CRAWL_WORKERS processes; together they stay within one budget
+    with upstream_limits.split(min(CRAWL_WORKERS, shards)):
+        try:
+            report = await run_ingestion(source, progress=progress)
+        finally:
+            source.discard_held()
+            await revalidation_cache.flush()
+
+    report["shard"] = index
+    report["shards"] = shards
+    report["unchanged"] = source.unchanged
+    report["high_water"] = source.high_water.isoformat() if source.high_water else None
+    report["complete"] = ingestion_complete(report)
+    return report
+
+def failed_shard_report(index: int, shards: int, error: BaseException) -> Dict[str, Any]:
+    """Stand-in report for a shard that exhausted its retries."""
+    return {"shard": index, "shards": shards, "complete": False, "error": str(error)}
+
+def merge_shard_reports(reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Totals across shard reports; elapsed time is the slowest shard's."""
+    merged: Dict[str, Any] = {
+        "shards": len(reports),
+        "failed_shards": sorted(report["shard"] for report in reports if not report.get("complete")),
+        "elapsed_seconds": max((report.get("elapsed_seconds", 0.0) for report in reports), default=0.0),
+        "unchanged": sum(report.get("unchanged", 0) for report in reports),
+        "stages": {},
+        "writes": {},
+        "high_water": max((report["high_water"] for report in reports if report.get("high_water")), default=None),
+    }
+    for report in reports:
+        for name, stats in report.get("stages", {}).items():
+            totals = merged["stages"].setdefault(name, {"items_in": 0, "items_out": 0, "errors": 0})
+            for key in totals:
+                totals[key] += stats[key]
+        for key, count in report.get("writes", {}).items():
+            merged["writes"][key] = merged["writes"].get(key, 0) + count
+    merged["complete"] = not merged["failed_shards"]
+    models = merged["stages"].get("upsert", {}).get("items_out", 0)
+    merged["models"] = models
+    merged["models_per_sec"] = round(models / merged["elapsed_seconds"], 2) if merged["elapsed_seconds"] else 0.0
+    return merged
+
+def finish_sharded_sync(reports: List[Dict[str, Any]], mode: str, since: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Aggregate the shard reports of one crawl and record the sync. The
+    watermark only advances when every shard completed, so changes missed
+    by a failed shard are picked up by the next run.
+    """
+    merged = merge_shard_reports(reports)
+    merged["mode"] = mode
+    plan = SyncPlan(
+        source=HuggingFaceCatalogSource.name,
+        mode=mode,
+        since=datetime.fromisoformat(since) if since else None,
+    )
+    if merged["complete"]:
+        high_water = datetime.fromisoformat(merged["high_water"]) if merged["high_water"] else None
+        record_sync(plan, high_water, {"models": merged["models"], "shards": merged["shards"], **merged["writes"]})
+    else:
+        logger.warning(
+            f"Hugging Face {mode} crawl incomplete (failed shards: {merged['failed_shards']}); watermark not advanced"
+        )
+    logger.info(
+        f"Sharded {mode} crawl wrote {merged['models']} models over {merged['shards']} shards "
+        f"in {merged['elapsed_seconds']}s ({merged['models_per_sec']}/s)"
+    )
+    return merged
@@ -0,0 +1,190 @@
+import logging
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from dotenv import load_dotenv
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from services.metrics import Histogram, register_stats
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Pool configuration, per engine
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# Connections the server grants this deployment (0: no budget), the number
+# of processes sharing them, API workers and Celery worker processes alike
+# (uvicorn reads WEB_CONCURRENCY as well), and the engines each process
+# creates: the sync engine and the async one of the API
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "0"))
+DB_POOL_PROCESSES = int(os.getenv("DB_POOL_PROCESSES") or os.getenv("WEB_CONCURRENCY") or "1")
+DB_POOL_ENGINES = int(os.getenv("DB_POOL_ENGINES", "2"))
+
+# Upper bounds (seconds) of the checkout wait buckets; a healthy pool answers in well under a millisecond
+CHECKOUT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+@dataclass
+class PoolStats:
+    """Counters describing how one engine's connection pool is used."""
+    overflows: int = 0  # Connections opened beyond pool_size
+    timeouts: int = 0
+    checkout_wait: Histogram = field(default_factory=lambda: Histogram(CHECKOUT_BUCKETS))
+    connect_time: Histogram = field(default_factory=lambda: Histogram(CHECKOUT_BUCKETS))
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "checkouts": self.checkout_wait.count,
+            "connects": self.connect_time.count,
+            "overflows": self.overflows,
+            "timeouts": self.timeouts,
+            "checkout_wait": self.checkout_wait.snapshot(),
+            "connect_time": self.connect_time.snapshot(),
+        }
+
+# Seconds spent opening connections during the current checkout, None outside
+# of one. A context variable, so concurrent checkouts on the greenlets of the
+# async engine do not share it.
+_checkout_connecting: ContextVar[Optional[List[float]]] = ContextVar("checkout_connecting", default=None)
+
+class _InstrumentedPool:
+    """
+    Mixin recording into ``stats`` the time a QueuePool checkout waits for a
+    free slot, the time spent opening new connections, overflow connections
+    and timeouts. Pre-ping and checkout events are not part of either time.
+    """
+
+    stats: PoolStats
+
+    def _do_get(self) -> Any:
+        if _checkout_connecting.get() is not None:
+            # QueuePool retries through _do_get after losing a race for an overflow slot
+            return super()._do_get()
+        connecting = [0.0]
+        token = _checkout_connecting.set(connecting)
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            _checkout_connecting.reset(token)
+            self.stats.checkout_wait.observe(max(0.0, time.perf_counter() - started - connecting[0]))
+
+    def _create_connection(self) -> Any:
+        started = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            elapsed = time.perf_counter() - started
+            self.stats.connect_time.observe(elapsed)
+            connecting = _checkout_connecting.get()
+            if connecting is not None:
+                connecting[0] += elapsed
+
+    def _inc_overflow(self) -> bool:
+        opened = super()._inc_overflow()
+        # The overflow counter starts at -pool_size, so it turns positive past the pool
+        if opened and self._overflow > 0:
+            self.stats.overflows += 1
+        return opened
+
+def instrumented_pool_class(base: Type[QueuePool], stats: PoolStats) -> Type[QueuePool]:
+    """
+    Subclass of ``base`` reporting into ``stats``. The stats live on the
+    class, so they survive the pool being recreated on dispose.
+    """
+    return type(f"Instrumented{base.__name__}", (_InstrumentedPool, base), {"stats": stats})
+
+def pool_sizing(
+    pool_size: int = DB_POOL_SIZE,
+    max_overflow: int = DB_MAX_OVERFLOW,
+    max_connections: int = DB_MAX_CONNECTIONS,
+    processes: int = DB_POOL_PROCESSES,
+    engines: int = DB_POOL_ENGINES,
+) -> Tuple[int, int]:
+    """
+    Pool size and overflow of one pool, capped so that ``processes``
+    processes with ``engines`` pools each never open more than
+    ``max_connections`` between them.
+    """
+    if max_connections <= 0:
+        return pool_size, max_overflow
+    share = max(1, max_connections // (max(1, processes) * max(1, engines)))
+    size = max(1, min(pool_size, share))
+    return size, max(0, min(max_overflow, share - size))
+
+def engine_options(url: str, asynchronous: bool = False) -> Dict[str, Any]:
+    """
+    create_engine keyword arguments for the dialect of ``url``. SQLite files
+    get a small instrumented pool usable across threads; server databases
+    get a sized pool that pings and recycles connections so ones dropped by
+    the server or a proxy are never handed out.
+    """
+    parsed = make_url(url)
+    options: Dict[str, Any] = {}
+    if parsed.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+        if parsed.database in (None, "", ":memory:"):
+            # One connection per thread by design; nothing to size
+            return options
+
+    pool_size, max_overflow = pool_sizing()
+    base = AsyncAdaptedQueuePool if asynchronous else QueuePool
+    options.update(
+        poolclass=instrumented_pool_class(base, PoolStats()),
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=DB_POOL_TIMEOUT,
+    )
+    if parsed.get_backend_name() != "sqlite":
+        options.update(
+            pool_pre_ping=DB_POOL_PRE_PING,
+            pool_recycle=DB_POOL_RECYCLE,
+            # Reusing the most recent connection lets idle ones reach the server's timeout
+            pool_use_lifo=True,
+        )
+    return options
+
+# Engines reported by pool_snapshot, by name
+_engines: Dict[str, Engine] = {}
+
+def track_engine(name: str, engine: Optional[Engine]) -> None:
+    """Report ``engine``'s pool under ``name``; None stops reporting it."""
+    if engine is None:
+        _engines.pop(name, None)
+    else:
+        _engines[name] = engine
+
+def pool_snapshot() -> Dict[str, Any]:
+    """Live occupancy and cumulative stats of every tracked pool."""
+    snapshot = {}
+    for name, engine in list(_engines.items()):
+        pool = engine.pool
+        data: Dict[str, Any] = {"dialect": engine.dialect.name, "pool": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            data.update(
+                size=pool.size(),
+                in_use=pool.checkedout(),
+                idle=pool.checkedin(),
+                overflow=max(0, pool.overflow()),
+                max_overflow=pool._max_overflow,
+                timeout=pool.timeout(),
+            )
+        if isinstance(pool, _InstrumentedPool):
+            data.update(pool.stats.as_dict())
+        snapshot[name] = data
+    return snapshot
+
+register_stats("db_pool", pool_snapshot)
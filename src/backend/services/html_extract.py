@@ -0,0 +1,278 @@
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, Tag
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# 'auto' uses lxml when it is installed and falls back to the stdlib parser;
+# 'lxml' or 'html.parser' force one backend
+HTML_PARSER = os.getenv("HTML_PARSER", "auto")
+
+# Strings inside these elements are not part of BeautifulSoup's .text
+_NON_TEXT_TAGS = frozenset(("script", "style", "template", "rt", "rp"))
+# Whitespace-only strings are kept verbatim inside these, and collapsed elsewhere
+_PRESERVE_WHITESPACE_TAGS = frozenset(("pre", "textarea"))
+_ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+
+class SoupBackend:
+    """BeautifulSoup on the stdlib html.parser; always available."""
+
+    name = "html.parser"
+
+    def parse(self, html: str) -> Any:
+        return BeautifulSoup(html, "html.parser")
+
+    def descendants(self, element: Any) -> Iterable[Any]:
+        return (node for node in element.descendants if isinstance(node, Tag))
+
+    def tag(self, element: Any) -> str:
+        return element.name
+
+    def get(self, element: Any, attr: str, default: Any = None) -> Any:
+        return element.get(attr, default)
+
+    def classes(self, element: Any) -> List[str]:
+        return element.get("class") or []
+
+    def text(self, element: Any) -> str:
+        return element.text
+
+class LxmlBackend:
+    """
+    Works on lxml's element tree directly, skipping the BeautifulSoup tree
+    build that dominates parse time, while keeping BeautifulSoup's text semantics.
+    """
+
+    name = "lxml"
+
+    def __init__(self):
+        import lxml.html
+        from lxml import etree
+        self._html = lxml.html
+        self._element = etree.Element
+
+    def parse(self, html: str) -> Any:
+        if not html.strip():
+            html = "<html></html>"
+        return self._html.document_fromstring(html)
+
+    def descendants(self, element: Any) -> Iterable[Any]:
+        if self.tag(element) == "html":
+            # The document root is itself part of the search, as it is under a BeautifulSoup object
+            return element.iter(self._element)
+        return element.iterdescendants(self._element)
+
+    def tag(self, element: Any) -> str:
+        return element.tag
+
+    def get(self, element: Any, attr: str, default: Any = None) -> Any:
+        return element.get(attr, default)
+
+    def classes(self, element: Any) -> List[str]:
+        return element.get("class", "").split()
+
+    def text(self, element: Any) -> str:
+        parts: List[str] = []
+
+        def add(string: str, preserve: bool) -> None:
+            if not preserve and not string.strip(_ASCII_SPACES):
+                string = "\n" if "\n" in string else " "
+            parts.append(string)
+
+        def walk(node: Any, preserve: bool) -> None:
+            preserve = preserve or node.tag in _PRESERVE_WHITESPACE_TAGS
+            if node.text:
+                add(node.text, preserve)
+            for child in node:
+                if isinstance(child.tag, str) and child.tag not in _NON_TEXT_TAGS:
+                    walk(child, preserve)
+                if child.tail:
+                    add(child.tail, preserve)
+
+        walk(element, any(ancestor.tag in _PRESERVE_WHITESPACE_TAGS for ancestor in element.iterancestors()))
+        return "".join(parts)
+
+def resolve_backend(parser: str = HTML_PARSER) -> Any:
+    if parser == "html.parser":
+        return SoupBackend()
+    try:
+        return LxmlBackend()
+    except ImportError:  # Optional dependency, the stdlib parser is used instead
+        if parser == "lxml":
+            raise
+        return SoupBackend()
+
+# A selector is (tag name, attribute, value). Attribute may be None to match
+# on the tag name alone; 'class' matches any one of the element's classes,
+# the same way BeautifulSoup's find() treats it.
+Selector = Tuple[str, Optional[str], Optional[str]]
+
+def _index(selectors: Dict[str, Selector]) -> Dict[str, List[Tuple[str, Optional[str], Optional[str]]]]:
+    by_tag: Dict[str, List[Tuple[str, Optional[str], Optional[str]]]] = {}
+    for key, (name, attr, value) in selectors.items():
+        by_tag.setdefault(name, []).append((key, attr, value))
+    return by_tag
+
+def _matches(backend: Any, element: Any, attr: Optional[str], value: Optional[str]) -> bool:
+    if attr is None:
+        return True
+    if attr == "class":
+        classes = backend.classes(element)
+        return value in classes or " ".join(classes) == value
+    return backend.get(element, attr) == value
+
+def first_matches(backend: Any, root: Any, selectors: Dict[str, Selector]) -> Dict[str, Any]:
+    """
+    Walk ``root`` once and return the first element matching each selector,
+    in document order. Stops as soon as every selector has matched.
+    """
+    found: Dict[str, Any] = dict.fromkeys(selectors)
+    by_tag = _index(selectors)
+    remaining = len(selectors)
+    for element in backend.descendants(root):
+        candidates = by_tag.get(backend.tag(element))
+        if not candidates:
+            continue
+        for key, attr, value in candidates:
+            if found[key] is None and _matches(backend, element, attr, value):
+                found[key] = element
+                remaining -= 1
+        if not remaining:
+            break
+    return found
+
+def all_matches(backend: Any, root: Any, selector: Selector) -> List[Any]:
+    name, attr, value = selector
+    return [
+        element for element in backend.descendants(root)
+        if backend.tag(element) == name and _matches(backend, element, attr, value)
+    ]
+
+# Top-level sections of a Replicate model page
+PAGE_SELECTORS: Dict[str, Selector] = {
+    "title": ("h1", None, None),
+    "description": ("div", "class", "markdown"),
+    "metrics": ("div", "class", "stats"),
+    "versions": ("div", "id", "versions"),
+    "examples": ("div", "id", "examples"),
+    "hardware": ("div", "id", "hardware"),
+    "links": ("div", "class", "links"),
+    "tags": ("div", "class", "tags"),
+    "license": ("div", "class", "license"),
+    "featured": ("div", "class", "featured-badge"),
+    "updated": ("time", "class", "updated"),
+    "docker": ("pre", "class", "docker"),
+}
+
+VERSION_FIELDS: Dict[str, Selector] = {
+    "name": ("div", "class", "version-name"),
+    "time": ("time", None, None),
+}
+EXAMPLE_FIELDS: Dict[str, Selector] = {
+    "title": ("h3", None, None),
+    "description": ("p", None, None),
+    "input": ("pre", "class", "input"),
+    "output": ("pre", "class", "output"),
+}
+LABEL_VALUE_FIELDS: Dict[str, Selector] = {
+    "label": ("div", "class", "label"),
+    "value": ("div", "class", "value"),
+}
+
+def extract_replicate_page(html: str, url: str, parser: str = HTML_PARSER) -> Dict[str, Any]:
+    """
+    Extract model information from a Replicate model page.
+
+    The document is walked once to locate every section; each repeated item
+    (version, example, spec, stat) is then walked once for all of its fields.
+    """
+    backend = resolve_backend(parser)
+    root = backend.parse(html)
+    sections = first_matches(backend, root, PAGE_SELECTORS)
+
+    def text(element: Any, default: str = "") -> str:
+        return backend.text(element).strip() if element is not None else default
+
+    def items(section: str, selector: Selector, fields: Dict[str, Selector]) -> List[Tuple[Any, Dict[str, Any]]]:
+        if sections[section] is None:
+            return []
+        return [
+            (item, first_matches(backend, item, fields))
+            for item in all_matches(backend, sections[section], selector)
+        ]
+
+    versions = []
+    for item, fields in items("versions", ("div", "class", "version"), VERSION_FIELDS):
+        versions.append({
+            'id': backend.get(item, 'id', '').replace('version-', ''),
+            'name': text(fields["name"]),
+            'created_at': backend.get(fields["time"], 'datetime') if fields["time"] is not None else None
+        })
+
+    examples = []
+    for item, fields in items("examples", ("div", "class", "example"), EXAMPLE_FIELDS):
+        examples.append({key: text(fields[key]) for key in EXAMPLE_FIELDS})
+
+    hardware_info = {}
+    for item, fields in items("hardware", ("div", "class", "spec"), LABEL_VALUE_FIELDS):
+        hardware_info[text(fields["label"]).lower()] = text(fields["value"])
+
+    model_data = {
+        "name": text(sections["title"], "Unknown"),
+        "creator": url.split('/')[-2] if len(url.split('/')) > 2 else "Unknown",
+        "category": "uncategorized",  # Will be updated based on tags
+        "description": text(sections["description"]),
+        "replicate_url": url,
+        "metrics": {},
+        "created_at": datetime.utcnow(),
+        "is_featured": False,
+        "access_level": "free",
+        "versions": versions,
+        "examples": examples,
+        "hardware_requirements": hardware_info,
+        "last_updated": None,
+        "license": None,
+        "paper_url": None,
+        "github_url": None,
+        "docker_image": None
+    }
+
+    if sections["metrics"] is not None:
+        metrics = {}
+        for stat, fields in items("metrics", ("div", "class", "stat"), LABEL_VALUE_FIELDS):
+            if fields["label"] is not None and fields["value"] is not None:
+                metrics[text(fields["label"]).lower()] = text(fields["value"])
+        model_data["metrics"] = metrics
+
+    if sections["links"] is not None:
+        for link in all_matches(backend, sections["links"], ("a", None, None)):
+            href = backend.get(link, 'href', '')
+            if 'github.com' in href:
+                model_data['github_url'] = href
+            elif 'arxiv.org' in href or '.pdf' in href:
+                model_data['paper_url'] = href
+
+    if sections["tags"] is not None:
+        tags = [text(tag) for tag in all_matches(backend, sections["tags"], ("a", None, None))]
+        if tags:
+            model_data["category"] = tags[0]  # Use first tag as primary category
+            model_data["tags"] = tags
+
+    if sections["license"] is not None:
+        model_data['license'] = text(sections["license"])
+
+    model_data["is_featured"] = sections["featured"] is not None
+
+    if sections["updated"] is not None:
+        model_data['last_updated'] = backend.get(sections["updated"], 'datetime')
+
+    if sections["docker"] is not None:
+        model_data['docker_image'] = text(sections["docker"])
+
+    return model_data
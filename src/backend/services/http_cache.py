@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import os
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Set
+
+import httpx
+from dotenv import load_dotenv
+
+from models.database import SessionLocal
+from models.models import HttpValidator
+from services.metrics import register_stats
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+HTTP_CACHE_MEMORY_ENTRIES = int(os.getenv("HTTP_CACHE_MEMORY_ENTRIES", "10000"))
+HTTP_CACHE_FLUSH_SIZE = int(os.getenv("HTTP_CACHE_FLUSH_SIZE", "200"))
+
+class _NotModified:
+    """Returned instead of a body when upstream answered 304 Not Modified."""
+
+    def __repr__(self) -> str:
+        return "NOT_MODIFIED"
+
+    def __bool__(self) -> bool:
+        return False
+
+NOT_MODIFIED = _NotModified()
+
+# Keys whose validators the running RevalidationCache.holding() block holds back
+_holding: ContextVar[Optional[Set[str]]] = ContextVar("revalidation_holding", default=None)
+
+@dataclass
+class RevalidationStats:
+    hits: int = 0  # Validators were known and sent
+    misses: int = 0  # No validators stored, unconditional fetch
+    not_modified: int = 0  # Upstream answered 304
+    bytes_saved: int = 0  # Body bytes not transferred thanks to 304s
+    bytes_received: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["not_modified_ratio"] = self.not_modified / self.hits if self.hits else 0.0
+        return data
+
+def cache_key(url: str, params: Any = None) -> str:
+    """Key the validators of ``url`` requested with ``params`` are stored under."""
+    return str(httpx.URL(url, params=params))
+
+class RevalidationCache:
+    """
+    Persistent ETag / Last-Modified store used to make conditional requests.
+
+    Validators live in the http_validators table with a bounded in-memory LRU
+    in front of it. New validators are buffered and written in batches so a
+    catalog run does not pay one commit per URL.
+
+    Validators of a response whose content still has to be stored can be
+    held back (``hold=True`` or a ``holding()`` block) and are only kept once
+    the caller commits them: a validator persisted for a row that was never
+    written would turn every later fetch of it into a 304.
+    """
+
+    def __init__(self, memory_entries: int = HTTP_CACHE_MEMORY_ENTRIES, flush_size: int = HTTP_CACHE_FLUSH_SIZE):
+        self.memory_entries = memory_entries
+        self.flush_size = flush_size
+        self.stats = RevalidationStats()
+        self._memory: "OrderedDict[str, Optional[Dict[str, Any]]]" = OrderedDict()
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._held: Dict[str, Dict[str, Any]] = {}
+
+    def _remember(self, key: str, validators: Optional[Dict[str, Any]]) -> None:
+        self._memory[key] = validators
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        db = SessionLocal()
+        try:
+            row = db.query(HttpValidator).filter(HttpValidator.url == key).first()
+            if row is None:
+                return None
+            return {"etag": row.etag, "last_modified": row.last_modified, "content_length": row.content_length or 0}
+        finally:
+            db.close()
+
+    async def _lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        if key in self._pending:
+            return self._pending[key]
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+        loop = asyncio.get_running_loop()
+        try:
+            validators = await loop.run_in_executor(None, self._load, key)
+        except Exception as e:
+            logger.error(f"Error loading validators for {key}: {e}")
+            return None
+        self._remember(key, validators)
+        return validators
+
+    def _write(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        db = SessionLocal()
+        try:
+            existing = {
+                row.url: row
+                for row in db.query(HttpValidator).filter(HttpValidator.url.in_(list(entries))).all()
+            }
+            for key, validators in entries.items():
+                row = existing.get(key)
+                if row is None:
+                    db.add(HttpValidator(url=key, **validators))
+                else:
+                    row.etag = validators["etag"]
+                    row.last_modified = validators["last_modified"]
+                    row.content_length = validators["content_length"]
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def flush(self) -> None:
+        """Persist buffered validators."""
+        if not self._pending:
+            return
+        entries, self._pending = self._pending, {}
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self._write, entries)
+        except Exception as e:
+            logger.error(f"Error persisting {len(entries)} HTTP validators: {e}")
+
+    def _store(self, key: str, validators: Dict[str, Any]) -> None:
+        self._pending[key] = validators
+        self._remember(key, validators)
+
+    def commit(self, keys: Iterable[str]) -> None:
+        """Keep the held validators of ``keys``; they are persisted with the next flush."""
+        for key in keys:
+            validators = self._held.pop(key, None)
+            if validators is not None:
+                self._store(key, validators)
+
+    def discard(self, keys: Iterable[str]) -> None:
+        """Drop the held validators of ``keys``; their next fetch revalidates against the ones stored before."""
+        for key in keys:
+            self._held.pop(key, None)
+
+    @asynccontextmanager
+    async def holding(self) -> AsyncIterator[Set[str]]:
+        """
+        Hold back the validators of every response received in the block,
+        including by tasks it starts. Yields their keys; the ones not
+        discarded are committed when the block exits without an exception.
+        """
+        keys: Set[str] = set()
+        token = _holding.set(keys)
+        try:
+            yield keys
+        except BaseException:
+            self.discard(keys)
+            raise
+        else:
+            self.commit(keys)
+            if len(self._pending) >= self.flush_size:
+                await self.flush()
+        finally:
+            _holding.reset(token)
+
+    async def get(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        conditional: bool = True,
+        hold: bool = False,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """
+        GET ``url`` on ``client``, revalidating with stored validators when
+        ``conditional`` is set. Callers must treat a 304 response as
+        "unchanged" since it carries no body.
+
+        With ``hold`` new validators wait for ``commit(cache_key(url))``.
+        """
+        if not HTTP_CACHE_ENABLED:
+            return await client.get(url, **kwargs)
+
+        key = cache_key(url, kwargs.get("params"))
+        validators = await self._lookup(key) if conditional else None
+        headers = dict(kwargs.pop("headers", None) or {})
+        if validators:
+            self.stats.hits += 1
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+        else:
+            self.stats.misses += 1
+
+        response = await client.get(url, headers=headers, **kwargs)
+
+        if response.status_code == 304:
+            self.stats.not_modified += 1
+            self.stats.bytes_saved += (validators or {}).get("content_length", 0)
+            return response
+
+        self.stats.bytes_received += len(response.content)
+        if response.status_code == 200:
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if etag or last_modified:
+                fresh = {"etag": etag, "last_modified": last_modified, "content_length": len(response.content)}
+                scope = _holding.get()
+                if fresh != validators:
+                    if hold or scope is not None:
+                        self._held[key] = fresh
+                        if scope is not None:
+                            scope.add(key)
+                    else:
+                        self._store(key, fresh)
+                        if len(self._pending) >= self.flush_size:
+                            await self.flush()
+        return response
+
+revalidation_cache = RevalidationCache()
+register_stats("http_revalidation", lambda: revalidation_cache.stats.as_dict())
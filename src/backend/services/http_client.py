@@ -0,0 +1,224 @@
+import asyncio
+import importlib.util
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, asdict
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+import httpx
+from dotenv import load_dotenv
+
+from services.metrics import register_stats
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Pool configuration
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "40"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "10"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").lower() in ("1", "true", "yes")
+
+_SEND_HEADERS_EVENTS = ("http11.send_request_headers.started", "http2.send_request_headers.started")
+
+@dataclass
+class PoolStats:
+    """Counters describing how the shared connection pool is used."""
+    requests: int = 0
+    connections_opened: int = 0
+    connections_reused: int = 0
+    host_wait_seconds: float = 0.0
+    connection_wait_seconds: float = 0.0
+    max_connection_wait_seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["avg_connection_wait_seconds"] = (
+            self.connection_wait_seconds / self.requests if self.requests else 0.0
+        )
+        return data
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response stream that frees the per-host slot once the body is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, semaphore: asyncio.Semaphore):
+        self._stream = stream
+        self._semaphore = semaphore
+        self._released = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._semaphore.release()
+
+class _PooledTransport(httpx.AsyncBaseTransport):
+    """
+    Transport enforcing a per-host connection limit and recording pool stats
+    through the httpcore ``trace`` extension.
+    """
+
+    def __init__(self, stats: PoolStats, per_host: int, **transport_kwargs: Any):
+        self._transport = httpx.AsyncHTTPTransport(**transport_kwargs)
+        self._stats = stats
+        self._per_host = per_host
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _semaphore(self, host: str) -> asyncio.Semaphore:
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self._per_host)
+        return self._host_semaphores[host]
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        stats = self._stats
+        semaphore = self._semaphore(request.url.host)
+
+        queued_at = time.perf_counter()
+        await semaphore.acquire()
+        entered_pool_at = time.perf_counter()
+        stats.host_wait_seconds += entered_pool_at - queued_at
+        stats.requests += 1
+
+        state = {"opened": False, "waited": False}
+        outer_trace = request.extensions.get("trace")
+
+        async def trace(name: str, info: Dict[str, Any]) -> None:
+            if not state["waited"] and (name == "connection.connect_tcp.started" or name in _SEND_HEADERS_EVENTS):
+                state["waited"] = True
+                waited = time.perf_counter() - entered_pool_at
+                stats.connection_wait_seconds += waited
+                stats.max_connection_wait_seconds = max(stats.max_connection_wait_seconds, waited)
+            if name == "connection.connect_tcp.complete":
+                state["opened"] = True
+                stats.connections_opened += 1
+            elif name in _SEND_HEADERS_EVENTS and not state["opened"]:
+                # Headers sent without connecting first: a pooled connection was reused
+                state["opened"] = True
+                stats.connections_reused += 1
+            if outer_trace is not None:
+                await outer_trace(name, info)
+
+        request.extensions["trace"] = trace
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            semaphore.release()
+            raise
+        response.stream = _ReleasingStream(response.stream, semaphore)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+class HTTPClientPool:
+    """
+    Process-wide owner of the shared ``httpx.AsyncClient``.
+
+    The FastAPI app starts and stops it from its lifespan and the Celery worker
+    from its process signals. ``get_client`` creates the client lazily so
+    scripts and tests can use the scrapers without explicit startup.
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing: Set[asyncio.Task] = set()
+        self.stats = PoolStats()
+
+    def _build_client(self) -> httpx.AsyncClient:
+        http2 = HTTP2_ENABLED
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP2_ENABLED is set but the 'h2' package is not installed; using HTTP/1.1")
+            http2 = False
+
+        transport = _PooledTransport(
+            self.stats,
+            HTTP_MAX_CONNECTIONS_PER_HOST,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+        return httpx.AsyncClient(
+            transport=transport,
+            timeout=HTTP_TIMEOUT,
+            follow_redirects=True,
+        )
+
+    def get_client(self) -> httpx.AsyncClient:
+        """Return the shared client for the running event loop, creating it if needed."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            if self._client is not None and not self._client.is_closed:
+                # Connections belong to a loop that is no longer running
+                logger.warning("Event loop changed; replacing the shared HTTP client")
+                self._close_stale(self._client, self._loop)
+            self._client = self._build_client()
+            self._loop = loop
+        return self._client
+
+    def _close_stale(self, client: httpx.AsyncClient, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """Close a client left behind by another event loop, on that loop while it still runs."""
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            return
+        task = asyncio.get_running_loop().create_task(self._aclose_quietly(client))
+        # Keep a reference until it finishes, the loop only holds a weak one
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _aclose_quietly(client: httpx.AsyncClient) -> None:
+        try:
+            await client.aclose()
+        except Exception as e:
+            # Sockets of a closed loop may already be gone; the client is discarded either way
+            logger.debug(f"Error closing stale HTTP client: {e}")
+
+    async def startup(self) -> None:
+        """Create the shared client ahead of the first request."""
+        self.get_client()
+        logger.info("Shared HTTP client pool started")
+
+    async def shutdown(self) -> None:
+        """Close the shared client and every pooled connection."""
+        client, self._client, self._loop = self._client, None, None
+        if client is not None and not client.is_closed:
+            await client.aclose()
+            logger.info("Shared HTTP client pool closed")
+
+    @asynccontextmanager
+    async def lifespan(self) -> AsyncIterator[httpx.AsyncClient]:
+        """Hold the pool open for the duration of the block."""
+        await self.startup()
+        try:
+            yield self.get_client()
+        finally:
+            await self.shutdown()
+
+    def snapshot(self) -> Dict[str, Any]:
+        data = self.stats.as_dict()
+        data["http2"] = HTTP2_ENABLED
+        data["max_connections"] = HTTP_MAX_CONNECTIONS
+        data["max_connections_per_host"] = HTTP_MAX_CONNECTIONS_PER_HOST
+        return data
+
+http_pool = HTTPClientPool()
+register_stats("http_pool", http_pool.snapshot)
+
+def get_client() -> httpx.AsyncClient:
+    """Shortcut for the process-wide pooled client."""
+    return http_pool.get_client()
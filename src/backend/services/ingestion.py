@@ -0,0 +1,334 @@
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from services.bulk_upsert import bulk_upsert_models
+from services.metrics import register_stats
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Pipeline tuning
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "500"))
+INGEST_FETCH_CONCURRENCY = int(os.getenv("INGEST_FETCH_CONCURRENCY", "16"))
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "500"))
+# Seconds between progress callbacks of a running ingestion
+INGEST_PROGRESS_INTERVAL = float(os.getenv("INGEST_PROGRESS_INTERVAL", "10"))
+
+# Marks the end of a stage's output
+_DONE = object()
+
+@dataclass
+class StageStats:
+    """Throughput counters for one pipeline stage."""
+    name: str
+    workers: int = 1
+    items_in: int = 0
+    items_out: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        wall = 0.0
+        if self.started_at is not None:
+            wall = (self.finished_at or time.perf_counter()) - self.started_at
+        return {
+            "workers": self.workers,
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "errors": self.errors,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "wall_seconds": round(wall, 3),
+            # Rate the stage actually achieved inside the pipeline
+            "models_per_sec": round(self.items_out / wall, 2) if wall else 0.0,
+            # Rate the stage could sustain on its own; the lowest one is the bottleneck
+            "capacity_models_per_sec": round(self.items_in * self.workers / self.busy_seconds, 2) if self.busy_seconds else 0.0,
+        }
+
+@dataclass
+class IngestionReport:
+    source: str
+    stages: Dict[str, StageStats] = field(default_factory=dict)
+    writes: Dict[str, int] = field(default_factory=dict)  # Totals reported by write_batch
+    started_at: float = field(default_factory=time.perf_counter)
+    finished_at: Optional[float] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        elapsed = (self.finished_at or time.perf_counter()) - self.started_at
+        stages = {name: stats.as_dict() for name, stats in self.stages.items()}
+        bottleneck = min(
+            (name for name in stages if stages[name]["capacity_models_per_sec"]),
+            key=lambda name: stages[name]["capacity_models_per_sec"],
+            default=None,
+        )
+        return {
+            "source": self.source,
+            "elapsed_seconds": round(elapsed, 3),
+            "bottleneck": bottleneck,
+            "stages": stages,
+            "writes": dict(self.writes),
+        }
+
+# Report of the most recent ingestion run in this process
+_last_report: Optional[IngestionReport] = None
+
+def _last_report_snapshot() -> Dict[str, Any]:
+    return _last_report.as_dict() if _last_report else {}
+
+register_stats("ingestion", _last_report_snapshot)
+
+async def _produce(stats: StageStats, items: AsyncIterator[Any], outbox: asyncio.Queue) -> None:
+    """Feed the pipeline from an async iterator, blocking while downstream is full."""
+    stats.started_at = time.perf_counter()
+    iterator = items.__aiter__()
+    try:
+        while True:
+            started = time.perf_counter()
+            try:
+                item = await iterator.__anext__()
+            except StopAsyncIteration:
+                break
+            finally:
+                stats.busy_seconds += time.perf_counter() - started
+            stats.items_in += 1
+            stats.items_out += 1
+            await outbox.put(item)
+    except Exception as e:
+        stats.errors += 1
+        logger.error(f"Error in {stats.name} stage: {e}")
+    finally:
+        stats.finished_at = time.perf_counter()
+        await outbox.put(_DONE)
+
+async def _run_stage(
+    stats: StageStats,
+    fn: Callable[[Any], Awaitable[Any]],
+    inbox: asyncio.Queue,
+    outbox: asyncio.Queue,
+) -> None:
+    """
+    Apply ``fn`` to every item with ``stats.workers`` concurrent workers.
+    Items for which ``fn`` returns None or raises are dropped.
+    """
+    async def worker() -> None:
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                # Leave the marker for sibling workers
+                await inbox.put(_DONE)
+                return
+            stats.items_in += 1
+            started = time.perf_counter()
+            try:
+                result = await fn(item)
+            except Exception as e:
+                stats.errors += 1
+                logger.error(f"Error in {stats.name} stage: {e}")
+                result = None
+            finally:
+                stats.busy_seconds += time.perf_counter() - started
+            if result is not None:
+                stats.items_out += 1
+                await outbox.put(result)
+
+    stats.started_at = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(stats.workers)))
+    finally:
+        stats.finished_at = time.perf_counter()
+        await outbox.put(_DONE)
+
+async def _run_batch_stage(
+    stats: StageStats,
+    fn: Callable[[List[Any]], List[Any]],
+    inbox: asyncio.Queue,
+    outbox: asyncio.Queue,
+    batch_size: int,
+) -> None:
+    """
+    Apply ``fn`` to batches of up to ``batch_size`` items: whatever is queued
+    when the stage gets to run, without waiting for a batch to fill. A batch
+    for which ``fn`` raises is dropped.
+    """
+    stats.started_at = time.perf_counter()
+    done = False
+    try:
+        while not done:
+            batch = [await inbox.get()]
+            while len(batch) < batch_size and not inbox.empty():
+                batch.append(inbox.get_nowait())
+            if batch[-1] is _DONE:
+                batch.pop()
+                done = True
+            if not batch:
+                continue
+            stats.items_in += len(batch)
+            started = time.perf_counter()
+            try:
+                results = fn(batch)
+            except Exception as e:
+                stats.errors += len(batch)
+                logger.error(f"Error in {stats.name} stage: {e}")
+                results = []
+            finally:
+                stats.busy_seconds += time.perf_counter() - started
+            for result in results:
+                stats.items_out += 1
+                await outbox.put(result)
+    finally:
+        stats.finished_at = time.perf_counter()
+        await outbox.put(_DONE)
+
+async def _run_sink(
+    stats: StageStats,
+    write_batch: Callable[[List[Dict[str, Any]]], Any],
+    inbox: asyncio.Queue,
+    batch_size: int,
+    totals: Dict[str, int],
+    written: Optional[Callable[[List[Dict[str, Any]]], Any]] = None,
+    failed: Optional[Callable[[List[Dict[str, Any]]], Any]] = None,
+) -> None:
+    """
+    Collect items into batches and write each batch off the event loop.
+    Counts returned by ``write_batch`` as a dict are summed into ``totals``.
+    Each batch is then passed to ``written``, or to ``failed`` when the write raised.
+    """
+    loop = asyncio.get_running_loop()
+    batch: List[Dict[str, Any]] = []
+
+    async def flush() -> None:
+        started = time.perf_counter()
+        try:
+            result = await loop.run_in_executor(None, write_batch, list(batch))
+        except Exception as e:
+            stats.errors += len(batch)
+            logger.error(f"Error in {stats.name} stage: {e}")
+            if failed is not None:
+                failed(list(batch))
+        else:
+            stats.items_out += len(batch)
+            if isinstance(result, dict):
+                for key, count in result.items():
+                    totals[key] = totals.get(key, 0) + count
+            if written is not None:
+                written(list(batch))
+        finally:
+            stats.busy_seconds += time.perf_counter() - started
+            batch.clear()
+
+    stats.started_at = time.perf_counter()
+    while True:
+        item = await inbox.get()
+        if item is _DONE:
+            break
+        stats.items_in += 1
+        batch.append(item)
+        if len(batch) >= batch_size:
+            await flush()
+    if batch:
+        await flush()
+    stats.finished_at = time.perf_counter()
+
+def upsert_model_batch(rows: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Insert or update a batch of normalized model rows with the bulk upsert
+    engine. Returns the inserted / updated / skipped counts.
+    """
+    return bulk_upsert_models(rows).as_dict()
+
+def ingestion_complete(report: Dict[str, Any]) -> bool:
+    """
+    True when no stage of a run_ingestion report recorded an error. A model
+    lost by any stage, not only the listing or the writes, is left behind
+    by a watermark advanced past it.
+    """
+    return not any(stats["errors"] for stats in report["stages"].values())
+
+async def run_ingestion(
+    source: Any,
+    write_batch: Callable[[List[Dict[str, Any]]], Any] = upsert_model_batch,
+    fetch_concurrency: int = INGEST_FETCH_CONCURRENCY,
+    queue_size: int = INGEST_QUEUE_SIZE,
+    batch_size: int = INGEST_BATCH_SIZE,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    progress_interval: float = INGEST_PROGRESS_INTERVAL,
+) -> Dict[str, Any]:
+    """
+    Stream a catalog source through list -> fetch -> normalize -> classify -> upsert.
+
+    ``source`` provides ``name``, ``list_models()`` (async iterator of listing
+    entries), ``fetch_detail(entry)``, ``normalize(payload)`` and
+    ``classify_batch(rows)`` (the category of each row; sources may provide
+    ``classify(row)`` instead), plus an optional ``classifier_version`` stamped on
+    classified rows and optional ``written(rows)`` / ``failed(rows)`` called
+    after each batch write succeeds or fails. Stages are connected by bounded queues, so a slow stage
+    applies backpressure upstream and memory stays flat regardless of catalog size.
+
+    ``progress``, if given, receives the report so far every ``progress_interval`` seconds.
+    """
+    global _last_report
+    report = IngestionReport(source=source.name)
+    _last_report = report
+
+    listed, fetched, normalized, classified = (asyncio.Queue(maxsize=queue_size) for _ in range(4))
+    stages = report.stages
+    stages["list"] = StageStats("list")
+    stages["fetch"] = StageStats("fetch", workers=fetch_concurrency)
+    stages["normalize"] = StageStats("normalize")
+    stages["classify"] = StageStats("classify")
+    stages["upsert"] = StageStats("upsert")
+
+    async def normalize(payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return source.normalize(payload)
+
+    classifier_version = getattr(source, "classifier_version", None)
+    classify_batch = getattr(source, "classify_batch", None) or (lambda rows: [source.classify(row) for row in rows])
+
+    def classify(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        for row, category in zip(rows, classify_batch(rows)):
+            row["category"] = category
+            if classifier_version is not None:
+                row["category_version"] = classifier_version
+        return rows
+
+    async def report_progress() -> None:
+        while True:
+            await asyncio.sleep(progress_interval)
+            try:
+                progress(report.as_dict())
+            except Exception as e:
+                logger.warning(f"Progress callback failed: {e}")
+
+    logger.info(f"Starting {source.name} catalog ingestion")
+    monitor = asyncio.create_task(report_progress()) if progress is not None else None
+    try:
+        await asyncio.gather(
+            _produce(stages["list"], source.list_models(), listed),
+            _run_stage(stages["fetch"], source.fetch_detail, listed, fetched),
+            _run_stage(stages["normalize"], normalize, fetched, normalized),
+            _run_batch_stage(stages["classify"], classify, normalized, classified, batch_size),
+            _run_sink(
+                stages["upsert"], write_batch, classified, batch_size, report.writes,
+                written=getattr(source, "written", None), failed=getattr(source, "failed", None),
+            ),
+        )
+    finally:
+        if monitor is not None:
+            monitor.cancel()
+    report.finished_at = time.perf_counter()
+
+    summary = report.as_dict()
+    logger.info(
+        f"Finished {source.name} ingestion in {summary['elapsed_seconds']}s: "
+        + ", ".join(f"{name}={stats['models_per_sec']}/s" for name, stats in summary["stages"].items())
+        + f" (bottleneck: {summary['bottleneck']})"
+    )
+    return summary
@@ -0,0 +1,201 @@
+import logging
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import and_, delete, func, insert, literal, or_, select
+from sqlalchemy.orm import Session
+
+from models.database import SessionLocal
+from models.models import AIModel, ModelLineage
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Upper bound of the depth a lineage query may ask for
+LINEAGE_MAX_DEPTH = int(os.getenv("LINEAGE_MAX_DEPTH", "10"))
+LINEAGE_REBUILD_CHUNK_SIZE = int(os.getenv("LINEAGE_REBUILD_CHUNK_SIZE", "1000"))
+
+# Model tree key -> relation of its entries to the model
+TREE_RELATIONS = {
+    "adapters": "adapter",
+    "finetunes": "finetune",
+    "merges": "merge",
+    "quantizations": "quantization",
+}
+RELATIONS = tuple(TREE_RELATIONS.values())
+
+# cardData.base_model_relation values; a bare base_model is read as a finetune
+_CARD_RELATIONS = {"adapter": "adapter", "finetune": "finetune", "merge": "merge", "quantized": "quantization"}
+
+Edge = Tuple[str, str, str, str]  # parent_id, child_id, relation, origin
+
+def _entry_id(entry: Any) -> Optional[str]:
+    if isinstance(entry, dict):
+        entry = entry.get("id") or entry.get("modelId")
+    return entry if isinstance(entry, str) and entry else None
+
+def edges_from_row(row: Dict[str, Any]) -> Set[Edge]:
+    """
+    Lineage edges stated by one model row: its children from ``model_tree``
+    and its parents from ``card_data.base_model``.
+    """
+    model_id = row["id"]
+    edges = set()
+    for key, relation in TREE_RELATIONS.items():
+        for entry in (row.get("model_tree") or {}).get(key) or ():
+            child = _entry_id(entry)
+            if child and child != model_id:
+                edges.add((model_id, child, relation, "tree"))
+
+    card = row.get("card_data") or {}
+    bases = card.get("base_model") or ()
+    relation = _CARD_RELATIONS.get(card.get("base_model_relation"), "finetune")
+    for entry in [bases] if isinstance(bases, str) else bases:
+        parent = _entry_id(entry)
+        if parent and parent != model_id:
+            edges.add((parent, model_id, relation, "card"))
+    return edges
+
+def replace_lineage(db: Session, rows: List[Dict[str, Any]]) -> int:
+    """
+    Replace the edges stated by ``rows`` in the caller's transaction. A
+    column missing from a row (e.g. a model tree answered 304) keeps the
+    edges it stated before. Returns the number of edges written.
+    """
+    table = ModelLineage.__table__
+    tree_ids = [row["id"] for row in rows if "model_tree" in row]
+    card_ids = [row["id"] for row in rows if "card_data" in row]
+    if not tree_ids and not card_ids:
+        return 0
+
+    conditions = []
+    if tree_ids:
+        conditions.append(and_(table.c.origin == "tree", table.c.parent_id.in_(tree_ids)))
+    if card_ids:
+        conditions.append(and_(table.c.origin == "card", table.c.child_id.in_(card_ids)))
+    db.execute(delete(table).where(or_(*conditions)))
+
+    edges = set()
+    for row in rows:
+        edges.update(
+            edge for edge in edges_from_row(row)
+            if edge[3] == "tree" and "model_tree" in row or edge[3] == "card" and "card_data" in row
+        )
+    if edges:
+        db.execute(insert(table), [
+            {"parent_id": parent, "child_id": child, "relation": relation, "origin": origin}
+            for parent, child, relation, origin in edges
+        ])
+    return len(edges)
+
+def rebuild_lineage(
+    chunk_size: int = LINEAGE_REBUILD_CHUNK_SIZE,
+    session_factory: Callable[[], Session] = SessionLocal,
+) -> Dict[str, int]:
+    """Re-derive every edge from the stored model trees and cards, ``chunk_size`` models per transaction."""
+    report = {"models": 0, "edges": 0}
+    last_id = ""
+    db = session_factory()
+    try:
+        while True:
+            rows = db.execute(
+                select(AIModel.id, AIModel.model_tree, AIModel.card_data)
+                .where(AIModel.id > last_id)
+                .order_by(AIModel.id)
+                .limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+            report["edges"] += replace_lineage(db, [row._asdict() for row in rows])
+            db.commit()
+            report["models"] += len(rows)
+            last_id = rows[-1].id
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    logger.info(f"Rebuilt lineage of {report['models']} models: {report['edges']} edges")
+    return report
+
+def parse_cursor(cursor: Optional[str]) -> Optional[Tuple[int, str]]:
+    """``"<depth>:<model id>"`` as returned in ``next``; ValueError when malformed."""
+    if not cursor:
+        return None
+    depth, _, model_id = cursor.partition(":")
+    if not model_id:
+        raise ValueError(f"Invalid lineage cursor: {cursor!r}")
+    return int(depth), model_id
+
+def walk_lineage(
+    db: Session,
+    model_id: str,
+    direction: str = "descendants",
+    max_depth: int = 3,
+    relations: Optional[Iterable[str]] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Models reachable from ``model_id`` through lineage edges, each at its
+    shortest distance, ordered by depth then id. One recursive CTE bounded
+    by ``max_depth``; every step is an index lookup, so the cost follows the
+    size of the subgraph, not of the edge table. Pages are keyset-paginated
+    with the ``next`` cursor.
+    """
+    edges = ModelLineage.__table__
+    if direction == "descendants":
+        start, step = edges.c.parent_id, edges.c.child_id
+    elif direction == "ancestors":
+        start, step = edges.c.child_id, edges.c.parent_id
+    else:
+        raise ValueError(f"Unknown lineage direction: {direction}")
+    relation_filter = edges.c.relation.in_(list(relations)) if relations else literal(True)
+
+    walk = (
+        select(step.label("model_id"), literal(1).label("depth"))
+        .where(start == model_id, relation_filter)
+        .cte("walk", recursive=True)
+    )
+    # UNION rather than UNION ALL collapses paths that meet at the same depth
+    walk = walk.union(
+        select(step, walk.c.depth + 1)
+        .join(walk, start == walk.c.model_id)
+        .where(walk.c.depth < max_depth, relation_filter)
+    )
+    reached = (
+        select(walk.c.model_id, func.min(walk.c.depth).label("depth"))
+        .where(walk.c.model_id != model_id)
+        .group_by(walk.c.model_id)
+        .subquery()
+    )
+    query = select(reached.c.model_id, reached.c.depth)
+    after = parse_cursor(cursor)
+    if after is not None:
+        query = query.where(or_(
+            reached.c.depth > after[0],
+            and_(reached.c.depth == after[0], reached.c.model_id > after[1]),
+        ))
+    rows = db.execute(query.order_by(reached.c.depth, reached.c.model_id).limit(limit + 1)).all()
+    page, more = rows[:limit], len(rows) > limit
+
+    # Catalog details for the page only
+    known = {
+        row.id: row._asdict()
+        for row in db.execute(
+            select(AIModel.id, AIModel.name, AIModel.category, AIModel.downloads)
+            .where(AIModel.id.in_([row.model_id for row in page]))
+        )
+    } if page else {}
+    return {
+        "model_id": model_id,
+        "direction": direction,
+        "max_depth": max_depth,
+        "items": [
+            {"id": row.model_id, "depth": row.depth, "in_catalog": row.model_id in known, **known.get(row.model_id, {})}
+            for row in page
+        ],
+        "next": f"{page[-1].depth}:{page[-1].model_id}" if more else None,
+    }
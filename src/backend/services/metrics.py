@@ -0,0 +1,73 @@
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Sequence
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Named providers returning a JSON-serialisable snapshot of their stats
+_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+def register_stats(name: str, provider: Callable[[], Dict[str, Any]]) -> None:
+    """Register a stats provider under ``name``, replacing any previous one."""
+    _providers[name] = provider
+
+def collect_stats() -> Dict[str, Any]:
+    """
+    Collect a snapshot from every registered provider.
+    A failing provider is reported as an error instead of failing the whole snapshot.
+    """
+    snapshot = {}
+    for name, provider in list(_providers.items()):
+        try:
+            snapshot[name] = provider()
+        except Exception as e:
+            logger.error(f"Error collecting stats from {name}: {e}")
+            snapshot[name] = {"error": str(e)}
+    return snapshot
+
+# Upper bounds (seconds) of the default latency buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class Histogram:
+    """
+    Fixed-bucket histogram, cheap enough to update on every request.
+    Quantiles are estimated as the upper bound of the bucket they fall in.
+    """
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # Last bucket: above every bound
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.bounds[index] if index < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        buckets = {f"le_{bound:g}": count for bound, count in zip(self.bounds, self.counts)}
+        buckets["le_inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else 0.0,
+            "max": round(self.max, 6),
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": buckets,
+        }
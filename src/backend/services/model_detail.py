@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import os
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Set
+
+from dotenv import load_dotenv
+from sqlalchemy.orm import undefer_group
+
+from models.database import SessionLocal
+from models.models import AIModel, DETAIL_GROUP
+from services.bulk_upsert import bulk_upsert_models
+from services.http_cache import revalidation_cache
+from services.metrics import register_stats
+from services.model_scraper import scrape_specific_model
+from services.negative_cache import missing_models
+from services.singleflight import SingleFlight
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Seconds a scraped model is served without revalidation. Models changed
+# upstream within MODEL_ACTIVE_WINDOW_DAYS get the shorter active TTL.
+MODEL_FRESH_TTL = float(os.getenv("MODEL_FRESH_TTL", "21600"))
+MODEL_ACTIVE_FRESH_TTL = float(os.getenv("MODEL_ACTIVE_FRESH_TTL", "3600"))
+MODEL_ACTIVE_WINDOW_DAYS = int(os.getenv("MODEL_ACTIVE_WINDOW_DAYS", "7"))
+
+# Concurrent on-demand scrapes of the same model id share one upstream fetch and one write
+model_fetches = SingleFlight("model_detail")
+register_stats("model_detail_singleflight", lambda: model_fetches.stats.as_dict())
+
+@dataclass
+class FreshnessStats:
+    fresh: int = 0  # Stored rows served within their TTL
+    stale: int = 0  # Stored rows served while a refresh runs
+    refreshes: int = 0  # Background refreshes started
+    deduplicated: int = 0  # Stale hits that found a refresh already running
+    refresh_failures: int = 0
+
+freshness_stats = FreshnessStats()
+register_stats("model_detail_freshness", lambda: asdict(freshness_stats))
+
+# Ids with a background refresh running, and the tasks themselves so they are not collected
+_refreshing: Set[str] = set()
+_refresh_tasks: Set[asyncio.Task] = set()
+
+def model_to_dict(model: AIModel) -> Dict[str, Any]:
+    return {
+        column.name: getattr(model, column.name)
+        for column in model.__table__.columns
+    }
+
+def load_model(model_id: str) -> Optional[Dict[str, Any]]:
+    """Stored model as a dict, or None."""
+    db = SessionLocal()
+    try:
+        model = db.query(AIModel).options(undefer_group(DETAIL_GROUP)).filter(AIModel.id == model_id).first()
+        return model_to_dict(model) if model else None
+    finally:
+        db.close()
+
+def was_scraped(model_id: str) -> bool:
+    """Whether ``model_id`` is stored and was scraped with its enrichment at least once."""
+    db = SessionLocal()
+    try:
+        return db.query(AIModel.last_scraped_at).filter(AIModel.id == model_id).scalar() is not None
+    finally:
+        db.close()
+
+async def _load_stored(model_id: str) -> Optional[Dict[str, Any]]:
+    loop = asyncio.get_running_loop()
+    model = await loop.run_in_executor(None, load_model, model_id)
+    return {"status": "success", "model": model} if model else None
+
+async def scrape_and_store(model_id: str, conditional: bool = False) -> Dict[str, Any]:
+    """
+    Scrape a model and upsert it. Returns the stored row, or the scraped
+    data when the write fails, or the scrape error.
+
+    With ``conditional`` the stored validators are sent upstream; a model
+    not modified since only gets its changed enrichment columns and is
+    marked as freshly scraped. Rows never scraped here (e.g. from catalog
+    syncs, whose validators the detail endpoint shares) are scraped in full.
+    New validators are only kept once the row is written.
+    """
+    loop = asyncio.get_running_loop()
+    if conditional and not await loop.run_in_executor(None, was_scraped, model_id):
+        conditional = False
+    async with revalidation_cache.holding() as held:
+        result = await scrape_specific_model(model_id, conditional=conditional)
+        if result["status"] == "unchanged":
+            row = {"id": model_id, **result.get("enrichment", {})}
+        elif result["status"] != "success":
+            revalidation_cache.discard(held)
+            if result.get("status_code") == 404:
+                await missing_models.add(model_id)
+            return result
+        else:
+            row = dict(result["model"])
+        row["last_scraped_at"] = datetime.now(timezone.utc)
+
+        try:
+            # An upsert, so a concurrent writer in another process cannot make this fail
+            await loop.run_in_executor(None, bulk_upsert_models, [row])
+            stored = await _load_stored(model_id)
+        except Exception as e:
+            logger.error(f"Error storing scraped model {model_id}: {e}")
+            revalidation_cache.discard(held)
+            return result
+    return stored or result
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+def freshness_ttl(model: Dict[str, Any], now: Optional[datetime] = None) -> float:
+    """Seconds ``model`` stays fresh after a scrape; recently active models revalidate sooner."""
+    now = now or datetime.now(timezone.utc)
+    last_updated = _utc(model.get("last_updated"))
+    if last_updated is not None and now - last_updated < timedelta(days=MODEL_ACTIVE_WINDOW_DAYS):
+        return MODEL_ACTIVE_FRESH_TTL
+    return MODEL_FRESH_TTL
+
+def is_stale(model: Dict[str, Any], now: Optional[datetime] = None) -> bool:
+    """
+    Whether a stored Hugging Face model is due for revalidation. Rows never
+    scraped on demand (e.g. from catalog syncs) are stale; other sources
+    have no detail scraper and never are.
+    """
+    if model.get("source") not in (None, "huggingface"):
+        return False
+    scraped_at = _utc(model.get("last_scraped_at"))
+    if scraped_at is None:
+        return True
+    now = now or datetime.now(timezone.utc)
+    return (now - scraped_at).total_seconds() >= freshness_ttl(model, now)
+
+async def _refresh(model_id: str) -> None:
+    try:
+        result = await revalidate_model(model_id)
+        if result["status"] != "success":
+            freshness_stats.refresh_failures += 1
+            logger.warning(f"Background refresh of {model_id} failed: {result.get('message')}")
+    except Exception as e:
+        freshness_stats.refresh_failures += 1
+        logger.error(f"Background refresh of {model_id} failed: {e}")
+    finally:
+        _refreshing.discard(model_id)
+
+def schedule_refresh(model_id: str) -> bool:
+    """Start a background refresh unless one is already running. Returns whether one was started."""
+    if model_id in _refreshing:
+        freshness_stats.deduplicated += 1
+        return False
+    _refreshing.add(model_id)
+    freshness_stats.refreshes += 1
+    task = asyncio.get_running_loop().create_task(_refresh(model_id))
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+    return True
+
+def serve_stored(model: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Response for a stored model: served as is, queueing a deduplicated
+    background refresh first when it is stale.
+    """
+    if is_stale(model):
+        freshness_stats.stale += 1
+        schedule_refresh(model["id"])
+    else:
+        freshness_stats.fresh += 1
+    return {"status": "success", "model": model}
+
+async def revalidate_model(model_id: str) -> Dict[str, Any]:
+    """
+    Refresh a stored model with its stored validators, so an unmodified
+    model costs a 304. Shares any fetch of the same id already in flight.
+    """
+    return await model_fetches.do(model_id, lambda: scrape_and_store(model_id, conditional=True))
+
+async def force_refresh(model_id: str) -> Dict[str, Any]:
+    """Scrape and store ``model_id`` now, sharing any refresh already in flight."""
+    return await model_fetches.do(model_id, lambda: scrape_and_store(model_id))
+
+async def fetch_model(model_id: str) -> Dict[str, Any]:
+    """
+    Scrape and store a model missing from the database, coalescing
+    concurrent requests for the same id into one scrape and one write.
+    Ids recently found missing upstream are refused without a scrape.
+    """
+    if await missing_models.contains(model_id):
+        return {"status": "error", "message": "Model not found", "status_code": 404}
+    return await model_fetches.do(
+        model_id,
+        lambda: scrape_and_store(model_id),
+        after_wait=lambda: _load_stored(model_id),
+    )
@@ -1,6 +1,17 @@
+import asyncio
+import weakref
+import zlib
 import httpx
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Awaitable, AsyncIterator, Tuple
 from models.database import get_db
+from services.http_client import get_client
+from services.http_cache import cache_key, revalidation_cache, NOT_MODIFIED
+from services.response_store import response_store
+from services.ingestion import ingestion_complete, run_ingestion
+from services.sync_state import plan_sync, record_sync, parse_timestamp
+from services.rate_limit import send_with_retry
+from services.upstream_metrics import upstream_metrics
+from services.classifier import CLASSIFIER_VERSION, MODEL_CATEGORIES, category_input, classifier
 import os
 import re
 from bs4 import BeautifulSoup
@@ -16,267 +27,481 @@ load_dotenv()
 
 HUGGINGFACE_API_KEY = os.getenv("HUGGINGFACE_API_KEY")
 
-# Define model categories and their associated keywords
-MODEL_CATEGORIES = {
-    "text-generation": [
-        "text-generation", "gpt", "llm", "language-model", "chat", "completion",
-        "text2text", "summarization", "translation"
-    ],
-    "image-generation": [
-        "text-to-image", "image-generation", "stable-diffusion", "gan", 
-        "text2image", "diffusion", "dalle", "midjourney"
-    ],
-    "image-to-text": [
-        "image-to-text", "image-captioning", "ocr", "optical-character-recognition",
-        "visual-question-answering", "image2text"
-    ],
-    "text-to-speech": [
-        "text-to-speech", "tts", "speech-synthesis", "voice-generation",
-        "text2speech", "audio-generation"
-    ],
-    "speech-to-text": [
-        "speech-to-text", "speech-recognition", "transcription", "stt",
-        "voice-recognition", "speech2text"
-    ],
-    "audio-generation": [
-        "audio-generation", "music-generation", "sound-generation",
-        "audio-synthesis", "music-synthesis"
-    ],
-    "computer-vision": [
-        "object-detection", "image-classification", "face-detection",
-        "semantic-segmentation", "pose-estimation", "image-recognition"
-    ],
-    "video-generation": [
-        "text-to-video", "video-generation", "animation", "motion-synthesis",
-        "text2video"
-    ],
-    "multimodal": [
-        "multimodal", "vision-language", "audio-visual", "multi-task",
-        "cross-modal"
-    ],
-    "other": []  # Fallback category
-}
+# Enrichment fan-out limits (seconds / in-flight requests)
+ENRICHMENT_HOST_CONCURRENCY = int(os.getenv("ENRICHMENT_HOST_CONCURRENCY", "4"))
+ENRICHMENT_FETCH_TIMEOUT = float(os.getenv("ENRICHMENT_FETCH_TIMEOUT", "10"))
+ENRICHMENT_DEADLINE = float(os.getenv("ENRICHMENT_DEADLINE", "15"))
+
+# Catalog listing page size for full ingestion
+HF_LIST_PAGE_SIZE = int(os.getenv("HF_LIST_PAGE_SIZE", "1000"))
+
+def huggingface_headers() -> Dict[str, str]:
+    """Authorization headers for Hugging Face requests made on the shared client."""
+    if HUGGINGFACE_API_KEY:
+        return {"Authorization": f"Bearer {HUGGINGFACE_API_KEY}"}
+    return {}
 
 def determine_model_category(model_data: Dict[str, Any]) -> str:
     """
     Determine the category of a model based on its tags, description, and pipeline tag.
     """
-    # Combine all relevant text for category matching
-    model_text = " ".join([
-        model_data.get("description", "").lower(),
-        " ".join(model_data.get("tags", [])).lower(),
-        model_data.get("pipeline_tag", "").lower(),
-        model_data.get("name", "").lower()
-    ])
-
-    # Check each category's keywords against the model text
-    for category, keywords in MODEL_CATEGORIES.items():
-        if any(keyword in model_text for keyword in keywords):
-            return category
-    
-    return "other"
+    return classifier.classify(model_data)
+
+async def huggingface_get(
+    client: httpx.AsyncClient,
+    url: str,
+    conditional: bool = False,
+    revalidate: bool = True,
+    kind: Optional[str] = None,
+    **kwargs: Any,
+) -> httpx.Response:
+    """
+    GET a Hugging Face URL under the shared retry policy and the request
+    budget of its credential class. ``revalidate`` routes the request through
+    the revalidation cache; listing pages that change on every call skip it.
+    ``kind`` names the endpoint in the upstream metrics.
+    """
+    headers = huggingface_headers()
+    if revalidate:
+        send = lambda: revalidation_cache.get(client, url, conditional=conditional, headers=headers, **kwargs)
+    else:
+        send = lambda: client.get(url, headers=headers, **kwargs)
+    return await send_with_retry(send, url, authenticated="Authorization" in headers, kind=kind)
 
-async def fetch_model_papers(client: httpx.AsyncClient, model_id: str) -> List[Dict[str, str]]:
+async def fetch_model_papers(client: httpx.AsyncClient, model_id: str, conditional: bool = False) -> List[Dict[str, str]]:
     """Fetch research papers associated with the model."""
-    try:
-        response = await client.get(f"https://huggingface.co/{model_id}/papers")
-        if response.status_code == 200:
-            papers = []
-            soup = BeautifulSoup(response.text, 'html.parser')
-            paper_elements = soup.find_all('a', {'class': 'paper-link'})
-            for paper in paper_elements:
-                papers.append({
-                    "title": paper.get_text(strip=True),
-                    "url": paper.get('href'),
-                    "type": "paper"
-                })
-            return papers
-    except Exception as e:
-        print(f"Error fetching papers for {model_id}: {e}")
-    return []
-
-async def fetch_model_spaces(client: httpx.AsyncClient, model_id: str) -> List[Dict[str, Any]]:
+    response = await huggingface_get(client, f"https://huggingface.co/{model_id}/papers", conditional=conditional, kind="hf_papers")
+    if response.status_code == 304:
+        return NOT_MODIFIED
+    if response.status_code == 404:
+        return []
+    response.raise_for_status()
+    papers = []
+    with upstream_metrics.parsing("hf_papers"):
+        soup = BeautifulSoup(response.text, 'html.parser')
+        paper_elements = soup.find_all('a', {'class': 'paper-link'})
+        for paper in paper_elements:
+            papers.append({
+                "title": paper.get_text(strip=True),
+                "url": paper.get('href'),
+                "type": "paper"
+            })
+    return papers
+
+async def fetch_model_spaces(client: httpx.AsyncClient, model_id: str, conditional: bool = False) -> List[Dict[str, Any]]:
     """Fetch spaces using this model."""
-    try:
-        response = await client.get(
-            f"https://huggingface.co/api/models/{model_id}/spaces",
-            params={"limit": 100}
-        )
-        if response.status_code == 200:
-            return response.json()
-    except Exception as e:
-        print(f"Error fetching spaces for {model_id}: {e}")
-    return []
+    response = await huggingface_get(
+        client,
+        f"https://huggingface.co/api/models/{model_id}/spaces",
+        conditional=conditional,
+        kind="hf_spaces",
+        params={"limit": 100}
+    )
+    if response.status_code == 304:
+        return NOT_MODIFIED
+    if response.status_code == 404:
+        return []
+    response.raise_for_status()
+    with upstream_metrics.parsing("hf_spaces"):
+        return response.json()
 
-async def fetch_model_tree(client: httpx.AsyncClient, model_id: str) -> Dict[str, Any]:
+async def fetch_model_tree(client: httpx.AsyncClient, model_id: str, conditional: bool = False) -> Dict[str, Any]:
     """Fetch model tree information including adapters, finetuning, merges, etc."""
-    try:
-        response = await client.get(
-            f"https://huggingface.co/api/models/{model_id}/tree"
-        )
-        if response.status_code == 200:
-            tree_data = response.json()
-            return {
-                "adapters": tree_data.get("adapters", []),
-                "finetunes": tree_data.get("finetunes", []),
-                "merges": tree_data.get("merges", []),
-                "quantizations": tree_data.get("quantizations", [])
-            }
-    except Exception as e:
-        print(f"Error fetching model tree for {model_id}: {e}")
-    return {}
+    response = await huggingface_get(client, f"https://huggingface.co/api/models/{model_id}/tree", conditional=conditional, kind="hf_tree")
+    if response.status_code == 304:
+        return NOT_MODIFIED
+    if response.status_code == 404:
+        return {}
+    response.raise_for_status()
+    with upstream_metrics.parsing("hf_tree"):
+        tree_data = response.json()
+    return {
+        "adapters": tree_data.get("adapters", []),
+        "finetunes": tree_data.get("finetunes", []),
+        "merges": tree_data.get("merges", []),
+        "quantizations": tree_data.get("quantizations", [])
+    }
 
-async def fetch_model_technical_details(client: httpx.AsyncClient, model_id: str) -> Dict[str, Any]:
+async def fetch_model_technical_details(client: httpx.AsyncClient, model_id: str, conditional: bool = False) -> Dict[str, Any]:
     """Fetch detailed technical specifications of the model."""
-    try:
-        response = await client.get(
-            f"https://huggingface.co/api/models/{model_id}/specs"
-        )
-        if response.status_code == 200:
-            specs = response.json()
-            return {
-                "model_size": specs.get("model_size"),
-                "tensor_type": specs.get("tensor_type"),
-                "parameters": specs.get("parameters"),
-                "architecture": specs.get("architecture"),
-                "license": specs.get("license"),
-                "dataset_used": specs.get("dataset"),
-                "training_data": specs.get("training_data"),
-                "inference_providers": specs.get("inference_providers", []),
-                "safetensors": specs.get("safetensors", False)
-            }
-    except Exception as e:
-        print(f"Error fetching technical details for {model_id}: {e}")
-    return {}
+    response = await huggingface_get(client, f"https://huggingface.co/api/models/{model_id}/specs", conditional=conditional, kind="hf_specs")
+    if response.status_code == 304:
+        return NOT_MODIFIED
+    if response.status_code == 404:
+        return {}
+    response.raise_for_status()
+    with upstream_metrics.parsing("hf_specs"):
+        specs = response.json()
+    return {
+        "model_size": specs.get("model_size"),
+        "tensor_type": specs.get("tensor_type"),
+        "parameters": specs.get("parameters"),
+        "architecture": specs.get("architecture"),
+        "license": specs.get("license"),
+        "dataset_used": specs.get("dataset"),
+        "training_data": specs.get("training_data"),
+        "inference_providers": specs.get("inference_providers", []),
+        "safetensors": specs.get("safetensors", False)
+    }
 
-async def fetch_model_citation(client: httpx.AsyncClient, model_id: str) -> Optional[str]:
+async def fetch_model_citation(client: httpx.AsyncClient, model_id: str, conditional: bool = False) -> Optional[str]:
     """Fetch citation information for the model."""
-    try:
-        response = await client.get(f"https://huggingface.co/{model_id}/raw/main/README.md")
-        if response.status_code == 200:
-            content = response.text
-            citation_match = re.search(r'```(?:bibtex)?\s*(@.*?)\s*```', content, re.DOTALL)
-            if citation_match:
-                return citation_match.group(1).strip()
-    except Exception as e:
-        print(f"Error fetching citation for {model_id}: {e}")
+    response = await huggingface_get(client, f"https://huggingface.co/{model_id}/raw/main/README.md", conditional=conditional, kind="hf_readme")
+    if response.status_code == 304:
+        return NOT_MODIFIED
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    with upstream_metrics.parsing("hf_readme"):
+        citation_match = re.search(r'```(?:bibtex)?\s*(@.*?)\s*```', response.text, re.DOTALL)
+    if citation_match:
+        return citation_match.group(1).strip()
     return None
 
-async def fetch_model_downloads(client: httpx.AsyncClient, model_id: str) -> Dict[str, Any]:
+async def fetch_model_downloads(client: httpx.AsyncClient, model_id: str, conditional: bool = False) -> Dict[str, Any]:
     """Fetch download statistics for the model."""
-    try:
-        response = await client.get(f"https://huggingface.co/api/models/{model_id}/downloads")
-        if response.status_code == 200:
-            return response.json()
-    except Exception as e:
-        print(f"Error fetching downloads for {model_id}: {e}")
-    return {}
+    response = await huggingface_get(client, f"https://huggingface.co/api/models/{model_id}/downloads", conditional=conditional, kind="hf_downloads")
+    if response.status_code == 304:
+        return NOT_MODIFIED
+    if response.status_code == 404:
+        return {}
+    response.raise_for_status()
+    with upstream_metrics.parsing("hf_downloads"):
+        return response.json()
+
+# Enrichment fetchers keyed by result name, with the value used when a fetch
+# fails, times out or misses the overall deadline. A 404 is a genuine "no
+# data" answer; other failures raise after the retry policy gives up.
+ENRICHMENT_FETCHERS: Dict[str, tuple] = {
+    "papers": (fetch_model_papers, list),
+    "spaces": (fetch_model_spaces, list),
+    "model_tree": (fetch_model_tree, dict),
+    "technical_details": (fetch_model_technical_details, dict),
+    "citation": (fetch_model_citation, lambda: None),
+    "downloads": (fetch_model_downloads, dict),
+}
+
+# Per event loop, per host semaphores bounding in-flight enrichment requests
+_host_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+
+def _host_semaphore(host: str) -> asyncio.Semaphore:
+    """Return the semaphore limiting concurrent requests to a host."""
+    loop = asyncio.get_running_loop()
+    semaphores = _host_semaphores.setdefault(loop, {})
+    if host not in semaphores:
+        semaphores[host] = asyncio.Semaphore(ENRICHMENT_HOST_CONCURRENCY)
+    return semaphores[host]
+
+async def _bounded_fetch(
+    fetcher: Callable[..., Awaitable[Any]],
+    client: httpx.AsyncClient,
+    model_id: str,
+    host: str,
+    conditional: bool,
+) -> Any:
+    """Run one enrichment fetch under the host limit and the per-fetch timeout."""
+    async with _host_semaphore(host):
+        return await asyncio.wait_for(
+            fetcher(client, model_id, conditional=conditional),
+            timeout=ENRICHMENT_FETCH_TIMEOUT
+        )
+
+async def fetch_model_enrichment(
+    client: httpx.AsyncClient,
+    model_id: str,
+    host: str = "huggingface.co",
+    deadline: Optional[float] = None,
+    conditional: bool = False,
+) -> Dict[str, Any]:
+    """
+    Fetch all enrichment metadata for a model concurrently.
+
+    Each fetch is bounded by ENRICHMENT_FETCH_TIMEOUT and the whole fan-out by
+    ``deadline`` (ENRICHMENT_DEADLINE by default). A fetch that fails, times out
+    or is still running at the deadline yields its default value, so one slow
+    endpoint never discards the results of the others. With ``conditional``,
+    endpoints that answer 304 Not Modified are left out of the result, and
+    so are failed ones: a revalidation keeps the stored value rather than
+    overwriting it with the default.
+    """
+    deadline = ENRICHMENT_DEADLINE if deadline is None else deadline
+    tasks = {
+        name: asyncio.create_task(_bounded_fetch(fetcher, client, model_id, host, conditional))
+        for name, (fetcher, _) in ENRICHMENT_FETCHERS.items()
+    }
+    done, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    results = {}
+    for name, task in tasks.items():
+        default = ENRICHMENT_FETCHERS[name][1]
+        if task in pending:
+            logger.warning(f"Enrichment '{name}' for {model_id} missed the {deadline}s deadline")
+            if not conditional:
+                results[name] = default()
+        elif task.exception() is not None:
+            exc = task.exception()
+            if isinstance(exc, asyncio.TimeoutError):
+                logger.warning(f"Enrichment '{name}' for {model_id} timed out after {ENRICHMENT_FETCH_TIMEOUT}s")
+            else:
+                logger.error(f"Enrichment '{name}' for {model_id} failed: {exc}")
+            if not conditional:
+                results[name] = default()
+        elif task.result() is not NOT_MODIFIED:
+            results[name] = task.result()
+    return results
+
+def enrichment_columns(enrichment: Dict[str, Any]) -> Dict[str, Any]:
+    """AIModel columns set by the result of fetch_model_enrichment."""
+    columns = {}
+    if "downloads" in enrichment:
+        columns["downloads"] = enrichment["downloads"].get("downloads", 0)
+    for field in ("papers", "spaces", "model_tree", "technical_details", "citation"):
+        if field in enrichment:
+            columns[field] = enrichment[field]
+    return columns
+
+def normalize_huggingface_model(model: Dict[str, Any], model_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Map a Hugging Face /api/models payload onto AIModel columns.
+    Category and enrichment metadata are filled in by the caller.
+    """
+    model_id = model_id or model.get("modelId") or model.get("id")
+    return {
+        "id": model_id,
+        "name": model_id,
+        "creator": model.get("author", ""),
+        "source": "huggingface",
+        "description": model.get("description", ""),
+        "huggingface_url": f"https://huggingface.co/{model_id}",
+        "replicate_url": None,
+        "benchmark_metrics": model.get("metrics", {}),
+        "tags": model.get("tags", []),
+        "last_updated": datetime.strptime(model.get("lastModified"), "%Y-%m-%dT%H:%M:%S.%fZ") if model.get("lastModified") else None,
+        "downloads": model.get("downloads", 0),
+        "likes": model.get("likes", 0),
+        "model_type": "downloadable",
+        
+        # Additional HF-specific metadata
+        "pipeline_tag": model.get("pipeline_tag"),
+        "mask_token": model.get("mask_token"),
+        "widget_data": model.get("widgetData"),
+        "config": model.get("config", {}),
+        "card_data": model.get("cardData", {}),
+        
+        # Community metrics
+        "discussion_count": model.get("discussionCount", 0),
+        "pull_requests": model.get("pullRequests", []),
+        "gated": bool(model.get("gated", False)),
+        "private": model.get("private", False),
+        "siblings": model.get("siblings", []),
+        "tasks": model.get("tasks", []),
+        
+        # Files and assets
+        "files": model.get("files", []),
+        "model_index": model.get("modelIndex", {}),
+        "available_libraries": model.get("libraries", [])
+    }
 
-async def scrape_specific_model(model_id: str) -> Dict[str, Any]:
+async def scrape_specific_model(model_id: str, conditional: bool = False) -> Dict[str, Any]:
     """
     Scrape detailed information for a specific model.
+
+    With ``conditional`` the stored validators are sent upstream: the result
+    status is "unchanged" when the model itself was not modified, and
+    enrichment fields whose endpoint answered 304 are omitted so stored values
+    are kept. The enrichment endpoints change independently of the model
+    (new papers, spaces) and may have failed before, so an unchanged model
+    still revalidates them; their new columns come back as ``enrichment``.
     """
     logger.info(f"Starting to scrape model: {model_id}")
     
-    headers = {}
     if HUGGINGFACE_API_KEY:
-        headers["Authorization"] = f"Bearer {HUGGINGFACE_API_KEY}"
         logger.info("Using Hugging Face API key")
     else:
         logger.warning("No Hugging Face API key found")
     
-    async with httpx.AsyncClient(headers=headers) as client:
-        # Fetch basic model info
-        logger.info(f"Fetching basic info for model: {model_id}")
-        response = await client.get(f"https://huggingface.co/api/models/{model_id}")
-        logger.info(f"Basic info response status: {response.status_code}")
+    client = get_client()
+
+    # Fetch basic model info
+    logger.info(f"Fetching basic info for model: {model_id}")
+    response = await huggingface_get(client, f"https://huggingface.co/api/models/{model_id}", conditional=conditional, kind="hf_model")
+    logger.info(f"Basic info response status: {response.status_code}")
+    
+    if response.status_code == 304:
+        logger.info(f"Model {model_id} not modified upstream")
+        enrichment = await fetch_model_enrichment(client, model_id, conditional=True)
+        return {"status": "unchanged", "model_id": model_id, "enrichment": enrichment_columns(enrichment)}
+    
+    if response.status_code == 404:
+        logger.error(f"Error fetching model: {response.text}")
+        return {"status": "error", "message": "Model not found", "status_code": 404}
+
+    if response.status_code != 200:
+        # Throttled or failing upstream after retries; not evidence the model is missing
+        logger.error(f"Error fetching model {model_id}: upstream answered {response.status_code}")
+        return {"status": "error", "message": f"Upstream error {response.status_code}", "status_code": 502}
         
-        if response.status_code != 200:
-            logger.error(f"Error fetching model: {response.text}")
-            return {"status": "error", "message": "Model not found"}
-            
+    with upstream_metrics.parsing("hf_model"):
         model = response.json()
-        logger.info("Successfully fetched basic model info")
-        
-        # Fetch all additional metadata concurrently
-        logger.info("Fetching additional metadata")
-        papers = await fetch_model_papers(client, model_id)
-        spaces = await fetch_model_spaces(client, model_id)
-        tree_data = await fetch_model_tree(client, model_id)
-        technical_details = await fetch_model_technical_details(client, model_id)
-        citation = await fetch_model_citation(client, model_id)
-        downloads_stats = await fetch_model_downloads(client, model_id)
-        
-        # Determine model category
-        model_data = {
-            "description": model.get("description", ""),
-            "tags": model.get("tags", []),
-            "name": model_id,
-            "pipeline_tag": model.get("pipeline_tag", "")
-        }
-        category = determine_model_category(model_data)
-        
-        # Compile complete model data
-        model_data = {
-            "id": model_id,
-            "name": model_id,
-            "creator": model.get("author", ""),
-            "source": "huggingface",
-            "category": category,
-            "description": model.get("description", ""),
-            "huggingface_url": f"https://huggingface.co/{model_id}",
-            "replicate_url": None,
-            "benchmark_metrics": model.get("metrics", {}),
-            "tags": model.get("tags", []),
-            "last_updated": datetime.strptime(model.get("lastModified"), "%Y-%m-%dT%H:%M:%S.%fZ") if model.get("lastModified") else None,
-            "downloads": downloads_stats.get("downloads", 0),
-            "likes": model.get("likes", 0),
-            "model_type": "downloadable",
-            
-            # Enhanced metadata
-            "papers": papers,
-            "spaces": spaces,
-            "model_tree": tree_data,
-            "technical_details": technical_details,
-            "citation": citation,
-            
-            # Additional HF-specific metadata
-            "pipeline_tag": model.get("pipeline_tag"),
-            "mask_token": model.get("mask_token"),
-            "widget_data": model.get("widgetData"),
-            "config": model.get("config", {}),
-            "card_data": model.get("cardData", {}),
-            
-            # Community metrics
-            "discussion_count": model.get("discussionCount", 0),
-            "pull_requests": model.get("pullRequests", []),
-            "gated": model.get("gated", False),
-            "private": model.get("private", False),
-            "siblings": model.get("siblings", []),
-            "tasks": model.get("tasks", []),
-            
-            # Files and assets
-            "files": model.get("files", []),
-            "model_index": model.get("modelIndex", {}),
-            "available_libraries": model.get("libraries", []),
-            
-            # Timestamps
-            "created_at": None,  # Let SQLAlchemy handle this
-            "updated_at": None   # Let SQLAlchemy handle this
-        }
-        
-        logger.info("Successfully compiled model data")
-        return {
-            "status": "success",
-            "model": model_data
+    await response_store.aput(str(response.url), response.content, "huggingface_model", "application/json")
+    logger.info("Successfully fetched basic model info")
+    
+    # Fetch all additional metadata concurrently
+    logger.info("Fetching additional metadata")
+    enrichment = await fetch_model_enrichment(client, model_id, conditional=conditional)
+    
+    # Compile complete model data
+    model_data = normalize_huggingface_model(model, model_id)
+    model_data["category"] = determine_model_category(category_input(model_data))
+    model_data["category_version"] = CLASSIFIER_VERSION
+    
+    # Enhanced metadata
+    model_data.update(enrichment_columns(enrichment))
+    
+    # Timestamps
+    model_data["created_at"] = None  # Let SQLAlchemy handle this
+    model_data["updated_at"] = None  # Let SQLAlchemy handle this
+    
+    logger.info("Successfully compiled model data")
+    return {
+        "status": "success",
+        "model": model_data
+    }
+
+def shard_of(model_id: str, shards: int) -> int:
+    """Stable shard of ``model_id``; crc32 rather than hash(), which differs per process."""
+    return zlib.crc32(model_id.encode("utf-8")) % shards
+
+class HuggingFaceCatalogSource:
+    """
+    Hugging Face catalog adapter for the ingestion pipeline.
+
+    Models are listed newest change first. With ``since`` set, listing stops
+    at the first model not modified after it, so an incremental run only
+    fetches what changed. ``high_water`` tracks the newest change listed.
+    With ``shard`` = (index, count) only models of that id-hash shard are
+    yielded; every shard still walks the whole listing, which costs one
+    request per page against one per model for the details.
+
+    Validators of fetched details are held until the model's row is
+    written, so a failed write is fetched in full again on the next run.
+    """
+
+    name = "huggingface"
+    classifier_version = CLASSIFIER_VERSION
+
+    def __init__(
+        self,
+        page_size: int = HF_LIST_PAGE_SIZE,
+        since: Optional[datetime] = None,
+        shard: Optional[Tuple[int, int]] = None,
+    ):
+        self.page_size = page_size
+        self.since = since
+        self.shard = shard
+        self.high_water: Optional[datetime] = None
+        self.unchanged = 0
+        self._held: Dict[str, str] = {}  # Model id -> cache key of validators awaiting its write
+
+    async def list_models(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield listing entries page by page, following the Link header cursor."""
+        client = get_client()
+        url: Optional[str] = "https://huggingface.co/api/models"
+        params: Optional[Dict[str, Any]] = {
+            "limit": self.page_size,
+            "sort": "lastModified",
+            "direction": -1,
         }
+        while url:
+            response = await huggingface_get(client, url, revalidate=False, kind="hf_listing", params=params)
+            response.raise_for_status()
+            with upstream_metrics.parsing("hf_listing"):
+                entries = response.json()
+            for entry in entries:
+                modified = parse_timestamp(entry.get("lastModified"))
+                if self.since is not None and modified is not None and modified <= self.since:
+                    return
+                if modified is not None and (self.high_water is None or modified > self.high_water):
+                    self.high_water = modified
+                if self.shard is not None and shard_of(entry.get("modelId") or entry.get("id"), self.shard[1]) != self.shard[0]:
+                    continue
+                yield entry
+            url = response.links.get("next", {}).get("url")
+            params = None  # The next URL already carries the query
+
+    async def fetch_detail(self, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        model_id = entry.get("modelId") or entry.get("id")
+        url = f"https://huggingface.co/api/models/{model_id}"
+        response = await huggingface_get(get_client(), url, conditional=True, hold=True, kind="hf_model")
+        if response.status_code == 304:
+            # Unchanged since the last run: skip parsing and the database write
+            self.unchanged += 1
+            return None
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        await response_store.aput(str(response.url), response.content, "huggingface_model", "application/json")
+        with upstream_metrics.parsing("hf_model"):
+            payload = response.json()
+        # Keyed like the row normalize() derives from the payload
+        self._held[payload.get("modelId") or payload.get("id") or model_id] = cache_key(url)
+        return payload
+
+    def _release(self, rows: List[Dict[str, Any]]) -> List[str]:
+        return [key for key in (self._held.pop(row["id"], None) for row in rows) if key]
+
+    def written(self, rows: List[Dict[str, Any]]) -> None:
+        revalidation_cache.commit(self._release(rows))
+
+    def failed(self, rows: List[Dict[str, Any]]) -> None:
+        revalidation_cache.discard(self._release(rows))
+
+    def discard_held(self) -> None:
+        """Drop the validators of models lost before their write (e.g. a normalize error)."""
+        revalidation_cache.discard(self._held.values())
+        self._held.clear()
+
+    def normalize(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return normalize_huggingface_model(payload)
+
+    def classify_batch(self, rows: List[Dict[str, Any]]) -> List[str]:
+        return classifier.classify_batch([category_input(row) for row in rows])
+
+async def sync_huggingface_catalog(mode: str = "auto") -> Dict[str, Any]:
+    """
+    Ingest the Hugging Face catalog through the pipelined ingestion stages.
+
+    ``mode`` is 'incremental' (only models changed since the stored
+    watermark), 'full' (reconciliation sweep) or 'auto', which picks a full
+    sweep every FULL_SYNC_INTERVAL_HOURS. Returns the per-stage report.
+    """
+    plan = plan_sync(HuggingFaceCatalogSource.name, mode)
+    source = HuggingFaceCatalogSource(since=plan.since)
+    try:
+        report = await run_ingestion(source)
+    finally:
+        source.discard_held()
+        await revalidation_cache.flush()
+    report["mode"] = plan.mode
+    report["unchanged"] = source.unchanged
+
+    if not ingestion_complete(report):
+        # Keep the old watermark so the missed changes are picked up next run
+        logger.warning(f"Hugging Face {plan.mode} sync incomplete; watermark not advanced")
+    else:
+        record_sync(plan, source.high_water, {"models": report["stages"]["upsert"]["items_out"], **report["writes"]})
+    return report
 
-async def scrape_models() -> Dict[str, Any]:
+async def scrape_models(mode: str = "auto") -> Dict[str, Any]:
     """
-    Scrapes AI models from Replicate and Hugging Face with enhanced metadata.
+    Scrapes AI models with enhanced metadata, incrementally unless a full
+    reconciliation sweep is due.
     """
-    # Implementation here
-    pass
+    return await sync_huggingface_catalog(mode)
 
 async def get_categories_distribution(db) -> Dict[str, int]:
     """
@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import os
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+from services.metrics import register_stats
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# How long "not found upstream" is trusted, and how many ids are kept in memory
+NEGATIVE_CACHE_TTL = float(os.getenv("NEGATIVE_CACHE_TTL", "600"))
+NEGATIVE_CACHE_MAX_ENTRIES = int(os.getenv("NEGATIVE_CACHE_MAX_ENTRIES", "10000"))
+# Optional Redis-compatible store sharing entries across processes
+NEGATIVE_CACHE_REDIS_URL = os.getenv("NEGATIVE_CACHE_REDIS_URL")
+
+@dataclass
+class NegativeCacheStats:
+    hits: int = 0
+    misses: int = 0
+    shared_hits: int = 0  # Hits answered by the shared store rather than this process
+    stored: int = 0
+    evictions: int = 0  # Entries dropped to stay under the memory cap
+    expirations: int = 0
+    errors: int = 0
+
+class NegativeCache:
+    """
+    Remembers ids an upstream answered 404 for, so repeated lookups of
+    unknown ids (typos, bots) are refused without a round-trip.
+
+    Entries live in a bounded in-memory LRU for ``ttl`` seconds. With a
+    Redis URL they are also written to the shared store and looked up there
+    on a local miss, so one process's 404 covers every worker. Removals bump
+    a shared epoch; a process whose local entries predate the current epoch
+    drops them before answering from memory, so a clear or discard in one
+    worker reaches all of them.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float = NEGATIVE_CACHE_TTL,
+        max_entries: int = NEGATIVE_CACHE_MAX_ENTRIES,
+        redis_url: Optional[str] = NEGATIVE_CACHE_REDIS_URL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.redis_url = redis_url
+        self.stats = NegativeCacheStats()
+        self._clock = clock
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+        # Shared epoch the local entries were recorded under
+        self._epoch = 0
+        # redis.asyncio clients are bound to the loop that created them
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+    def _key(self, key: str) -> str:
+        return f"negative:{self.name}:{key}"
+
+    def _epoch_key(self) -> str:
+        # Outside the entry namespace, so clear() never deletes it
+        return f"negative-epoch:{self.name}"
+
+    def _redis(self) -> Any:
+        if not self.redis_url:
+            return None
+        loop = asyncio.get_running_loop()
+        if loop not in self._clients:
+            try:
+                import redis.asyncio as redis_asyncio
+            except ImportError:  # Optional dependency, entries stay per process
+                logger.warning("redis is not installed; the negative cache is per process only")
+                self.redis_url = None
+                return None
+            self._clients[loop] = redis_asyncio.from_url(self.redis_url)
+        return self._clients[loop]
+
+    def _remember(self, key: str, expires: float) -> None:
+        self._entries[key] = expires
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _local(self, key: str) -> bool:
+        expires = self._entries.get(key)
+        if expires is None:
+            return False
+        if expires <= self._clock():
+            del self._entries[key]
+            self.stats.expirations += 1
+            return False
+        self._entries.move_to_end(key)
+        return True
+
+    async def _sync_epoch(self, redis: Any) -> None:
+        """Drop the local entries if another process removed entries since they were recorded."""
+        try:
+            epoch = await redis.get(self._epoch_key())
+        except Exception as e:
+            self.stats.errors += 1
+            logger.warning(f"Negative cache store unavailable: {e}")
+            return
+        self._advance(int(epoch or 0))
+
+    def _advance(self, epoch: int) -> None:
+        if epoch != self._epoch:
+            self._entries.clear()
+            self._epoch = epoch
+
+    async def _bump_epoch(self, redis: Any) -> None:
+        """Tell the other processes to drop their local entries."""
+        epoch = await redis.incr(self._epoch_key())
+        # Our own bump leaves the local entries valid, unless another one came in between
+        if epoch == self._epoch + 1:
+            self._epoch = epoch
+        else:
+            self._advance(epoch)
+
+    async def contains(self, key: str) -> bool:
+        """Whether ``key`` was recently found missing upstream."""
+        redis = self._redis()
+        if redis is not None and key in self._entries:
+            await self._sync_epoch(redis)
+        if self._local(key):
+            self.stats.hits += 1
+            return True
+
+        if redis is not None:
+            try:
+                remaining_ms = await redis.pttl(self._key(key))
+            except Exception as e:
+                self.stats.errors += 1
+                logger.warning(f"Negative cache store unavailable: {e}")
+            else:
+                # -2: no such key, -1: no expiry (never written by us)
+                if remaining_ms > 0:
+                    self._remember(key, self._clock() + remaining_ms / 1000)
+                    self.stats.hits += 1
+                    self.stats.shared_hits += 1
+                    return True
+
+        self.stats.misses += 1
+        return False
+
+    async def add(self, key: str) -> None:
+        self._remember(key, self._clock() + self.ttl)
+        self.stats.stored += 1
+        redis = self._redis()
+        if redis is not None:
+            try:
+                await redis.set(self._key(key), "1", px=int(self.ttl * 1000))
+            except Exception as e:
+                self.stats.errors += 1
+                logger.warning(f"Could not share negative cache entry for {key}: {e}")
+
+    async def discard(self, key: str) -> None:
+        self._entries.pop(key, None)
+        redis = self._redis()
+        if redis is not None:
+            try:
+                await redis.delete(self._key(key))
+                await self._bump_epoch(redis)
+            except Exception as e:
+                self.stats.errors += 1
+                logger.warning(f"Could not remove negative cache entry for {key}: {e}")
+
+    async def clear(self) -> int:
+        """Drop every entry, locally and in the shared store. Returns how many were removed."""
+        removed = len(self._entries)
+        self._entries.clear()
+        redis = self._redis()
+        if redis is not None:
+            try:
+                keys = [key async for key in redis.scan_iter(match=self._key("*"))]
+                if keys:
+                    removed = max(removed, await redis.delete(*keys))
+                await self._bump_epoch(redis)
+            except Exception as e:
+                self.stats.errors += 1
+                logger.warning(f"Could not clear shared negative cache: {e}")
+        return removed
+
+    def snapshot(self) -> Dict[str, Any]:
+        data = asdict(self.stats)
+        data["size"] = len(self._entries)
+        data["max_entries"] = self.max_entries
+        data["ttl"] = self.ttl
+        data["shared"] = bool(self.redis_url)
+        return data
+
+# Hugging Face model ids that answered 404
+missing_models = NegativeCache("models")
+register_stats("negative_cache", missing_models.snapshot)
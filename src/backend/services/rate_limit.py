@@ -0,0 +1,464 @@
+import asyncio
+import logging
+import os
+import random
+import time
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Set, Tuple
+
+import httpx
+from dotenv import load_dotenv
+
+from services.metrics import register_stats
+from services.upstream_metrics import upstream_metrics
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Request budgets (requests per second): starting rate and the ceiling the
+# adaptive limiter may climb to while upstream stays healthy
+UPSTREAM_DEFAULT_RATE = float(os.getenv("UPSTREAM_DEFAULT_RATE", "2"))
+UPSTREAM_DEFAULT_MAX_RATE = float(os.getenv("UPSTREAM_DEFAULT_MAX_RATE", "10"))
+UPSTREAM_MIN_RATE = float(os.getenv("UPSTREAM_MIN_RATE", "0.2"))
+REPLICATE_RATE = float(os.getenv("REPLICATE_RATE", "1"))
+REPLICATE_MAX_RATE = float(os.getenv("REPLICATE_MAX_RATE", "8"))
+HF_ANON_RATE = float(os.getenv("HF_ANON_RATE", "2"))
+HF_ANON_MAX_RATE = float(os.getenv("HF_ANON_MAX_RATE", "5"))
+HF_AUTH_RATE = float(os.getenv("HF_AUTH_RATE", "5"))
+HF_AUTH_MAX_RATE = float(os.getenv("HF_AUTH_MAX_RATE", "20"))
+
+# Optional Redis-compatible store holding the buckets, so the budgets above
+# are shared by every process (API, Celery workers, crawl shards). Without it
+# each process gets the full budget and the rates must be sized per process.
+UPSTREAM_LIMITS_REDIS_URL = os.getenv("UPSTREAM_LIMITS_REDIS_URL")
+UPSTREAM_LIMITS_KEY_TTL = int(os.getenv("UPSTREAM_LIMITS_KEY_TTL", "3600"))
+
+# Retry policy for 429 / 5xx responses and transport errors
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "4"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "0.5"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "30"))
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        logger.warning(f"Unparseable Retry-After header: {value}")
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    current = now if now is not None else datetime.now(timezone.utc).timestamp()
+    return max(0.0, when.timestamp() - current)
+
+def is_throttled(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+@dataclass
+class LimiterStats:
+    acquired: int = 0
+    wait_seconds: float = 0.0
+    healthy: int = 0
+    throttled: int = 0  # 429 / 5xx responses observed
+    retry_after_pauses: int = 0
+    retries: int = 0
+    exhausted: int = 0  # Requests that gave up while still throttled or failing
+    shared_errors: int = 0  # Shared store calls that failed; the process budget was used instead
+
+class AdaptiveTokenBucket:
+    """
+    Token bucket whose refill rate adapts to upstream health.
+
+    Healthy responses raise the rate additively up to ``max_rate``; 429 and
+    5xx responses halve it down to ``min_rate``. A Retry-After hint pauses
+    the whole bucket until the server says it is ready again, so every
+    coroutine sharing the bucket backs off together.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        max_rate: float,
+        min_rate: float = 0.1,
+        burst: float = 1.0,
+        increase: float = 0.1,
+        decrease: float = 0.5,
+        max_pause: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.max_pause = max_pause
+        self.stats = LimiterStats()
+        self._clock = clock
+        self._tokens = burst
+        self._updated = clock()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _delay(self) -> float:
+        """Seconds until a token is available, taking it when there is one."""
+        now = self._clock()
+        self._refill(now)
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    async def acquire(self) -> None:
+        waited = 0.0
+        while True:
+            delay = self._delay()
+            if delay <= 0:
+                break
+            await asyncio.sleep(delay)
+            waited += delay
+        self.stats.acquired += 1
+        self.stats.wait_seconds += waited
+
+    def observe(self, status_code: int, retry_after: Optional[str] = None) -> None:
+        """Adjust the rate from the outcome of a request made under this bucket."""
+        if is_throttled(status_code):
+            self.stats.throttled += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            pause = parse_retry_after(retry_after)
+            if pause:
+                self.stats.retry_after_pauses += 1
+                self._paused_until = max(self._paused_until, self._clock() + min(pause, self.max_pause))
+        elif status_code < 400:
+            self.stats.healthy += 1
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def snapshot(self) -> Dict[str, Any]:
+        data = asdict(self.stats)
+        data["wait_seconds"] = round(self.stats.wait_seconds, 3)
+        data["rate"] = round(self.rate, 3)
+        data["paused_for"] = round(max(0.0, self._paused_until - self._clock()), 3)
+        return data
+
+# Refill the shared bucket at its shared rate and take a token.
+# Returns the seconds to wait (0 when a token was taken) and the current rate.
+_ACQUIRE_SCRIPT = """
+local burst, initial, ttl = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated', 'rate', 'paused_until')
+local rate = tonumber(state[3]) or initial
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+local paused_until = tonumber(state[4]) or 0
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local delay = 0
+if now < paused_until then
+    delay = paused_until - now
+elseif tokens >= 1 then
+    tokens = tokens - 1
+else
+    delay = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now), 'rate', tostring(rate))
+redis.call('EXPIRE', KEYS[1], ttl)
+return {tostring(delay), tostring(rate)}
+"""
+
+# Apply the outcome of a request to the shared rate: ARGV[1] is 1 when throttled
+_OBSERVE_SCRIPT = """
+local initial, min_rate, max_rate = tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+local increase, decrease, pause, ttl = tonumber(ARGV[5]), tonumber(ARGV[6]), tonumber(ARGV[7]), tonumber(ARGV[8])
+local rate = tonumber(redis.call('HGET', KEYS[1], 'rate')) or initial
+if ARGV[1] == '1' then
+    rate = math.max(min_rate, rate * decrease)
+    if pause > 0 then
+        local clock = redis.call('TIME')
+        local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+        local paused_until = tonumber(redis.call('HGET', KEYS[1], 'paused_until')) or 0
+        redis.call('HSET', KEYS[1], 'paused_until', tostring(math.max(paused_until, now + pause)))
+    end
+else
+    rate = math.min(max_rate, rate + increase)
+end
+redis.call('HSET', KEYS[1], 'rate', tostring(rate))
+redis.call('EXPIRE', KEYS[1], ttl)
+return tostring(rate)
+"""
+
+class SharedTokenBucket(AdaptiveTokenBucket):
+    """
+    Adaptive bucket whose tokens, rate and Retry-After pause live in a Redis
+    hash, so every process using the same store draws from one budget and
+    backs off together. Timing uses the store's clock. While the store is
+    unavailable the process falls back to its local bucket.
+    """
+
+    def __init__(self, key: str, redis_url: str, key_ttl: int = UPSTREAM_LIMITS_KEY_TTL, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.key = key
+        self.redis_url = redis_url
+        self.key_ttl = key_ttl
+        self._initial_rate = self.rate
+        # redis.asyncio clients are bound to the loop that created them
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+        self._updates: Set[asyncio.Task] = set()
+
+    def _redis(self) -> Any:
+        if not self.redis_url:
+            return None
+        loop = asyncio.get_running_loop()
+        if loop not in self._clients:
+            try:
+                import redis.asyncio as redis_asyncio
+            except ImportError:  # Optional dependency, budgets stay per process
+                logger.warning("redis is not installed; upstream budgets are per process only")
+                self.redis_url = None
+                return None
+            self._clients[loop] = redis_asyncio.from_url(self.redis_url)
+        return self._clients[loop]
+
+    async def _shared_delay(self) -> float:
+        redis = self._redis()
+        if redis is None:
+            return self._delay()
+        try:
+            delay, rate = await redis.eval(_ACQUIRE_SCRIPT, 1, self.key, self.burst, self._initial_rate, self.key_ttl)
+        except Exception as e:
+            self.stats.shared_errors += 1
+            logger.warning(f"Shared upstream budget {self.key} unavailable: {e}")
+            return self._delay()
+        self.rate = float(rate)
+        return float(delay)
+
+    async def acquire(self) -> None:
+        waited = 0.0
+        while True:
+            delay = await self._shared_delay()
+            if delay <= 0:
+                break
+            await asyncio.sleep(delay)
+            waited += delay
+        self.stats.acquired += 1
+        self.stats.wait_seconds += waited
+
+    async def _share_observation(self, throttled: bool, pause: float) -> None:
+        redis = self._redis()
+        if redis is None:
+            return
+        try:
+            rate = await redis.eval(
+                _OBSERVE_SCRIPT, 1, self.key, "1" if throttled else "0", self._initial_rate, self.min_rate,
+                self.max_rate, self.increase, self.decrease, min(pause, self.max_pause), self.key_ttl,
+            )
+        except Exception as e:
+            self.stats.shared_errors += 1
+            logger.warning(f"Could not update shared upstream budget {self.key}: {e}")
+            return
+        self.rate = float(rate)
+
+    def observe(self, status_code: int, retry_after: Optional[str] = None) -> None:
+        # The local bucket tracks the same signal, for snapshots and as the fallback
+        super().observe(status_code, retry_after)
+        if not (is_throttled(status_code) or status_code < 400):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        pause = (parse_retry_after(retry_after) or 0.0) if is_throttled(status_code) else 0.0
+        task = loop.create_task(self._share_observation(is_throttled(status_code), pause))
+        # Keep a reference until it finishes, the loop only holds a weak one
+        self._updates.add(task)
+        task.add_done_callback(self._updates.discard)
+
+    def snapshot(self) -> Dict[str, Any]:
+        data = super().snapshot()
+        data["shared"] = bool(self.redis_url)
+        return data
+
+# (host, authenticated) -> (starting rate, max rate). Hosts not listed get the default budget.
+HOST_BUDGETS: Dict[Tuple[str, bool], Tuple[float, float]] = {
+    ("huggingface.co", False): (HF_ANON_RATE, HF_ANON_MAX_RATE),
+    ("huggingface.co", True): (HF_AUTH_RATE, HF_AUTH_MAX_RATE),
+    ("replicate.com", False): (REPLICATE_RATE, REPLICATE_MAX_RATE),
+    ("api.replicate.com", True): (REPLICATE_RATE, REPLICATE_MAX_RATE),
+}
+
+class UpstreamLimits:
+    """
+    Process-wide registry of adaptive buckets, one per host and credential
+    class, so every worker coroutine draws from the same budget. With a
+    ``redis_url`` the buckets are shared with every other process too.
+    """
+
+    def __init__(
+        self,
+        budgets: Optional[Dict[Tuple[str, bool], Tuple[float, float]]] = None,
+        default: Tuple[float, float] = (UPSTREAM_DEFAULT_RATE, UPSTREAM_DEFAULT_MAX_RATE),
+        min_rate: float = UPSTREAM_MIN_RATE,
+        redis_url: Optional[str] = UPSTREAM_LIMITS_REDIS_URL,
+    ):
+        self.budgets = HOST_BUDGETS if budgets is None else budgets
+        self.default = default
+        self.min_rate = min_rate
+        self.redis_url = redis_url
+        self.processes = 1
+        self._buckets: Dict[Tuple[str, bool], AdaptiveTokenBucket] = {}
+        # Open split() scopes and the process count to restore when the last one closes
+        self._splits = 0
+        self._unsplit = 1
+
+    @property
+    def shared(self) -> bool:
+        return bool(self.redis_url)
+
+    def split_across(self, processes: int) -> None:
+        """
+        Give this process 1/``processes`` of every budget, for work fanned out
+        over that many processes without a shared store. Buckets already in
+        use are rescaled in place. A no-op when the budgets are shared.
+        """
+        processes = max(1, processes)
+        if self.shared or processes == self.processes:
+            return
+        factor = self.processes / processes
+        self.processes = processes
+        for bucket in self._buckets.values():
+            bucket.rate *= factor
+            bucket.max_rate *= factor
+            bucket.min_rate *= factor
+            bucket.burst = max(1.0, bucket.burst * factor)
+
+    @contextmanager
+    def split(self, processes: int) -> Iterator["UpstreamLimits"]:
+        """
+        split_across(``processes``) for the duration of the block, then give
+        the process its full budgets back, so later work in a long-lived
+        worker is not left throttled. Overlapping blocks restore on the last exit.
+        """
+        if self._splits == 0:
+            self._unsplit = self.processes
+        self._splits += 1
+        self.split_across(processes)
+        try:
+            yield self
+        finally:
+            self._splits -= 1
+            if self._splits == 0:
+                self.split_across(self._unsplit)
+
+    def bucket(self, host: str, authenticated: bool = False) -> AdaptiveTokenBucket:
+        key = (host, authenticated)
+        if key not in self._buckets:
+            rate, max_rate = self.budgets.get(key, self.default)
+            if not self.shared:
+                rate, max_rate = rate / self.processes, max_rate / self.processes
+            options = dict(rate=rate, max_rate=max_rate, min_rate=min(self.min_rate, rate), burst=max(1.0, rate))
+            if self.redis_url:
+                self._buckets[key] = SharedTokenBucket(
+                    f"ratelimit:{host}:{'auth' if authenticated else 'anon'}", self.redis_url, **options
+                )
+            else:
+                self._buckets[key] = AdaptiveTokenBucket(**options)
+        return self._buckets[key]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            f"{host}:{'auth' if authenticated else 'anon'}": bucket.snapshot()
+            for (host, authenticated), bucket in self._buckets.items()
+        }
+
+upstream_limits = UpstreamLimits()
+register_stats("upstream_limits", upstream_limits.snapshot)
+
+@dataclass
+class RetryPolicy:
+    """Jittered exponential backoff that defers to the server's Retry-After hint."""
+    max_attempts: int = RETRY_MAX_ATTEMPTS
+    base_delay: float = RETRY_BASE_DELAY
+    max_delay: float = RETRY_MAX_DELAY
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """
+        Seconds to sleep before retry number ``attempt`` (0-based), or None
+        when the server asks for a longer wait than ``max_delay`` and the
+        request should give up instead of stalling its caller.
+        """
+        if retry_after is not None:
+            if retry_after > self.max_delay:
+                return None
+            # The bucket is already paused for retry_after; jitter spreads the wake-ups
+            return random.uniform(0, self.base_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+async def send_with_retry(
+    send: Callable[[], Awaitable[httpx.Response]],
+    url: str,
+    authenticated: bool = False,
+    policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+    limits: Optional[UpstreamLimits] = None,
+    kind: Optional[str] = None,
+) -> httpx.Response:
+    """
+    Run ``send`` under the budget of ``url``'s host, retrying 429s, 5xx
+    responses and transport errors according to ``policy``.
+
+    The last response is returned once retries are exhausted, so callers
+    still decide what a failed status means; the last transport error is
+    re-raised. Every call is recorded in upstream_metrics under ``kind``
+    (the host when not given).
+    """
+    host = httpx.URL(url).host
+    bucket = (limits or upstream_limits).bucket(host, authenticated)
+    kind = kind or host
+    started = time.perf_counter()
+    for attempt in range(policy.max_attempts):
+        last_attempt = attempt == policy.max_attempts - 1
+        await bucket.acquire()
+        try:
+            response = await send()
+        except httpx.TransportError as e:
+            bucket.observe(503)
+            if last_attempt:
+                bucket.stats.exhausted += 1
+                upstream_metrics.record_call(kind, None, time.perf_counter() - started, retries=attempt)
+                raise
+            logger.warning(f"Transport error for {url} ({e!r}), retrying")
+            wait = policy.delay(attempt)
+        else:
+            retry_after = response.headers.get("Retry-After")
+            bucket.observe(response.status_code, retry_after)
+            wait = None
+            if is_throttled(response.status_code):
+                wait = None if last_attempt else policy.delay(attempt, parse_retry_after(retry_after))
+                if wait is None:
+                    bucket.stats.exhausted += 1
+            if wait is None:
+                upstream_metrics.record_call(
+                    kind, response.status_code, time.perf_counter() - started,
+                    response.num_bytes_downloaded, retries=attempt
+                )
+                return response
+            logger.warning(f"{url} answered {response.status_code}, retry {attempt + 1} in {wait:.2f}s")
+        bucket.stats.retries += 1
+        await asyncio.sleep(wait)
+    raise ValueError("RetryPolicy.max_attempts must be at least 1")
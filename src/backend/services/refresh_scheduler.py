@@ -0,0 +1,239 @@
+import asyncio
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.orm import Session
+
+from models.database import SessionLocal
+from models.models import AIModel
+from services.bulk_upsert import touch_models
+from services.metrics import register_stats
+from services.model_detail import revalidate_model
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Bounds of the per-model refresh interval (seconds)
+REFRESH_MIN_INTERVAL = float(os.getenv("REFRESH_MIN_INTERVAL", "3600"))
+REFRESH_MAX_INTERVAL = float(os.getenv("REFRESH_MAX_INTERVAL", "2592000"))
+# Models refreshed per scheduler tick (one tick a minute), spread evenly over the tick
+REFRESH_PER_TICK = int(os.getenv("REFRESH_PER_TICK", "60"))
+REFRESH_TICK_SECONDS = float(os.getenv("REFRESH_TICK_SECONDS", "60"))
+REFRESH_CONCURRENCY = int(os.getenv("REFRESH_CONCURRENCY", "8"))
+
+# Interval growth per consecutive refresh that found nothing new
+_BACKOFF_FACTOR = 1.5
+# Claimed models are pushed this far out so an overlapping tick skips them
+_CLAIM_LEASE = timedelta(minutes=15)
+
+# Upper bounds of the refresh-age buckets reported by age_distribution()
+_AGE_BUCKETS = (
+    ("1h", timedelta(hours=1)),
+    ("6h", timedelta(hours=6)),
+    ("1d", timedelta(days=1)),
+    ("7d", timedelta(days=7)),
+    ("30d", timedelta(days=30)),
+)
+
+def popularity(model: Dict[str, Any]) -> float:
+    """Log-scaled popularity score; likes and discussions weigh more than raw downloads."""
+    return (
+        math.log10(1 + (model.get("downloads") or 0))
+        + 2 * math.log10(1 + (model.get("likes") or 0))
+        + math.log10(1 + (model.get("discussion_count") or 0))
+    )
+
+def refresh_interval(model: Dict[str, Any]) -> timedelta:
+    """
+    How long ``model`` waits before its next refresh. Popular models come
+    back sooner; every refresh in a row that found no change stretches the
+    interval, so dead models cost almost nothing.
+    """
+    seconds = REFRESH_MAX_INTERVAL / (1 + popularity(model))
+    seconds *= _BACKOFF_FACTOR ** (model.get("unchanged_refreshes") or 0)
+    return timedelta(seconds=min(REFRESH_MAX_INTERVAL, max(REFRESH_MIN_INTERVAL, seconds)))
+
+@dataclass
+class SchedulerStats:
+    ticks: int = 0
+    refreshed: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    last_tick_models: int = 0
+    last_tick_seconds: float = 0.0
+
+scheduler_stats = SchedulerStats()
+register_stats("refresh_scheduler", lambda: asdict(scheduler_stats))
+
+def _due_filter(now: datetime):
+    return (
+        (AIModel.source == "huggingface")
+        & or_(AIModel.next_refresh_at.is_(None), AIModel.next_refresh_at <= now)
+    )
+
+def _interleave(first: List[Any], second: List[Any], limit: int) -> List[Any]:
+    merged = []
+    for position in range(max(len(first), len(second))):
+        merged.extend(rows[position] for rows in (first, second) if position < len(rows))
+    return merged[:limit]
+
+def claim_due_models(
+    limit: int = REFRESH_PER_TICK,
+    session_factory: Callable[[], Session] = SessionLocal,
+) -> List[Dict[str, Any]]:
+    """
+    Take up to ``limit`` models whose refresh is due and lease them so a
+    concurrent tick does not pick them again. Overdue models (most overdue
+    first) alternate with never-scheduled ones (most popular first), so a
+    large backlog of new models cannot starve the scheduled ones.
+
+    The rows are locked with SKIP LOCKED where the database supports it, so
+    overlapping ticks in other processes claim disjoint models.
+    """
+    now = datetime.now(timezone.utc)
+    columns = (AIModel.id, AIModel.last_updated, AIModel.unchanged_refreshes)
+    db = session_factory()
+    try:
+        overdue = db.execute(
+            select(*columns)
+            .where(_due_filter(now) & AIModel.next_refresh_at.is_not(None))
+            .order_by(AIModel.next_refresh_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).all()
+        unscheduled = db.execute(
+            select(*columns)
+            .where(_due_filter(now) & AIModel.next_refresh_at.is_(None))
+            .order_by(AIModel.likes.desc(), AIModel.downloads.desc(), AIModel.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).all()
+        rows = _interleave(overdue, unscheduled, limit)
+        if rows:
+            touch_models(db, [{"id": row.id, "next_refresh_at": now + _CLAIM_LEASE} for row in rows])
+        # Ends the transaction either way, releasing the row locks
+        db.commit()
+        return [row._asdict() for row in rows]
+    finally:
+        db.close()
+
+def schedule_next(
+    model_id: str,
+    changed: Optional[bool],
+    session_factory: Callable[[], Session] = SessionLocal,
+) -> None:
+    """
+    Record a refresh outcome: ``changed`` True or False for a successful
+    refresh, None when it failed (retried after the minimum interval).
+    """
+    now = datetime.now(timezone.utc)
+    db = session_factory()
+    try:
+        model = db.execute(
+            select(AIModel.downloads, AIModel.likes, AIModel.discussion_count, AIModel.unchanged_refreshes)
+            .where(AIModel.id == model_id)
+        ).first()
+        if model is None:
+            return
+        if changed is None:
+            values = {"next_refresh_at": now + timedelta(seconds=REFRESH_MIN_INTERVAL)}
+        else:
+            unchanged = 0 if changed else (model.unchanged_refreshes or 0) + 1
+            values = {
+                "unchanged_refreshes": unchanged,
+                "next_refresh_at": now + refresh_interval({**model._asdict(), "unchanged_refreshes": unchanged}),
+            }
+        touch_models(db, [{"id": model_id, **values}])
+        db.commit()
+    finally:
+        db.close()
+
+async def _refresh_one(model: Dict[str, Any]) -> None:
+    loop = asyncio.get_running_loop()
+    changed: Optional[bool] = None
+    try:
+        result = await revalidate_model(model["id"])
+        if result["status"] == "success":
+            # Hugging Face bumps lastModified on every change to the repo
+            changed = result["model"].get("last_updated") != model["last_updated"]
+        elif result.get("status_code") == 404:
+            # Gone upstream; look again rarely rather than every minute
+            changed = False
+    except Exception as e:
+        logger.error(f"Scheduled refresh of {model['id']} failed: {e}")
+
+    if changed is None:
+        scheduler_stats.failed += 1
+    else:
+        scheduler_stats.refreshed += 1
+        if changed:
+            scheduler_stats.changed += 1
+        else:
+            scheduler_stats.unchanged += 1
+    await loop.run_in_executor(None, schedule_next, model["id"], changed)
+
+async def refresh_due_models(
+    limit: int = REFRESH_PER_TICK,
+    tick_seconds: float = REFRESH_TICK_SECONDS,
+    concurrency: int = REFRESH_CONCURRENCY,
+) -> Dict[str, Any]:
+    """
+    One scheduler tick: claim the due models and refresh them with start
+    times spread evenly over ``tick_seconds``, so upstream sees a steady
+    rate instead of bursts.
+    """
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    models = await loop.run_in_executor(None, claim_due_models, limit)
+    semaphore = asyncio.Semaphore(concurrency)
+    spacing = tick_seconds / len(models) if models else 0.0
+
+    async def paced(position: int, model: Dict[str, Any]) -> None:
+        await asyncio.sleep(position * spacing)
+        async with semaphore:
+            await _refresh_one(model)
+
+    await asyncio.gather(*(paced(position, model) for position, model in enumerate(models)))
+
+    scheduler_stats.ticks += 1
+    scheduler_stats.last_tick_models = len(models)
+    scheduler_stats.last_tick_seconds = round(time.perf_counter() - started, 3)
+    return {"claimed": len(models), "seconds": scheduler_stats.last_tick_seconds}
+
+def queue_depth(session_factory: Callable[[], Session] = SessionLocal) -> int:
+    """Models whose refresh is due now."""
+    db = session_factory()
+    try:
+        return db.query(func.count(AIModel.id)).filter(_due_filter(datetime.now(timezone.utc))).scalar()
+    finally:
+        db.close()
+
+def age_distribution(session_factory: Callable[[], Session] = SessionLocal) -> Dict[str, int]:
+    """Hugging Face models by time since their last refresh, in one grouped query."""
+    now = datetime.now(timezone.utc)
+    bucket = case(
+        (AIModel.last_scraped_at.is_(None), "never"),
+        *((AIModel.last_scraped_at >= now - age, label) for label, age in _AGE_BUCKETS),
+        else_="older",
+    )
+    db = session_factory()
+    try:
+        counts = dict(
+            db.query(bucket, func.count(AIModel.id))
+            .filter(AIModel.source == "huggingface")
+            .group_by(bucket)
+            .all()
+        )
+    finally:
+        db.close()
+    labels = [label for label, _ in _AGE_BUCKETS] + ["older", "never"]
+    return {label: counts.get(label, 0) for label in labels}
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from services.ingestion import run_ingestion
+from services.model_scraper import normalize_huggingface_model
+from services.response_store import ResponseStore, response_store
+from services.classifier import CLASSIFIER_VERSION, category_input, classifier
+from services.scraper import normalize_replicate_model, normalize_replicate_page, parse_model_html
+
+logger = logging.getLogger(__name__)
+
+def _reparse_replicate_page(body: bytes, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    page_data = parse_model_html(body.decode("utf-8", errors="replace"), entry["url"])
+    return normalize_replicate_page(page_data) if page_data else None
+
+# Stored response kind -> function rebuilding an AIModel row from the raw body
+REPARSERS: Dict[str, Callable[[bytes, Dict[str, Any]], Optional[Dict[str, Any]]]] = {
+    "huggingface_model": lambda body, entry: normalize_huggingface_model(json.loads(body)),
+    "replicate_model": lambda body, entry: normalize_replicate_model(json.loads(body)),
+    "replicate_page": _reparse_replicate_page,
+}
+
+# Stored kinds normalizing to the same replicate:{owner}/{name} row, by
+# precedence: the API object wins and the page fills the columns it leaves empty
+REPLICATE_KINDS = ("replicate_model", "replicate_page")
+
+def _replicate_id(entry: Dict[str, Any]) -> str:
+    # API and page URLs both end in /{owner}/{name}
+    owner, name = urlsplit(entry["url"]).path.rstrip("/").split("/")[-2:]
+    return f"replicate:{owner}/{name}"
+
+def merge_replicate_rows(rows: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Merge rows of one Replicate model given in REPLICATE_KINDS order; earlier rows win."""
+    merged: Dict[str, Any] = {}
+    for row in rows:
+        for key, value in row.items():
+            if not merged.get(key):
+                merged[key] = value
+    return merged or None
+
+class StoredResponseSource:
+    """
+    Ingestion source replaying the response store instead of the network, so
+    changes to the parsers or the classifier can be applied to the catalog offline.
+    """
+
+    name = "response_store"
+    classifier_version = CLASSIFIER_VERSION
+
+    def __init__(self, store: ResponseStore = response_store, kinds: Optional[Iterable[str]] = None):
+        self.store = store
+        self.kinds = set(kinds) if kinds else set(REPARSERS)
+
+    async def list_models(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stored entries of the selected kinds. Replicate entries are held back
+        until the walk ends and yielded as one group per model, so each id is
+        rebuilt from all of its responses in a fixed order.
+        """
+        loop = asyncio.get_running_loop()
+        entries = self.store.iter_entries()
+        replicate: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        while True:
+            entry = await loop.run_in_executor(None, next, entries, None)
+            if entry is None:
+                break
+            if entry["kind"] not in self.kinds:
+                continue
+            if entry["kind"] in REPLICATE_KINDS:
+                group = replicate.setdefault(_replicate_id(entry), {})
+                previous = group.get(entry["kind"])
+                if previous is None or entry["stored_at"] > previous["stored_at"]:
+                    group[entry["kind"]] = entry
+                continue
+            yield entry
+        for group in replicate.values():
+            yield {"kind": "replicate", "entries": [group[kind] for kind in REPLICATE_KINDS if kind in group]}
+
+    async def fetch_detail(self, entry: Dict[str, Any]) -> Optional[Tuple[Dict[str, Any], Any]]:
+        loop = asyncio.get_running_loop()
+        if entry["kind"] == "replicate":
+            bodies = []
+            for member in entry["entries"]:
+                body = await loop.run_in_executor(None, self.store.read_body, member)
+                if body is not None:
+                    bodies.append((member, body))
+            return (entry, bodies) if bodies else None
+        body = await loop.run_in_executor(None, self.store.read_body, entry)
+        return (entry, body) if body is not None else None
+
+    def normalize(self, item: Tuple[Dict[str, Any], Any]) -> Optional[Dict[str, Any]]:
+        entry, body = item
+        if entry["kind"] == "replicate":
+            rows = [REPARSERS[member["kind"]](member_body, member) for member, member_body in body]
+            return merge_replicate_rows([row for row in rows if row])
+        return REPARSERS[entry["kind"]](body, entry)
+
+    def classify_batch(self, rows: List[Dict[str, Any]]) -> List[str]:
+        return classifier.classify_batch([category_input(row) for row in rows])
+
+async def reparse_from_store(kinds: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Rebuild AIModel rows from stored upstream responses without any network access.
+    Returns the ingestion report.
+    """
+    unknown = set(kinds or ()) - set(REPARSERS)
+    if unknown:
+        raise ValueError(f"Unknown response kinds: {', '.join(sorted(unknown))}")
+    logger.info("Reparsing catalog from the response store")
+    return await run_ingestion(StoredResponseSource(kinds=kinds))
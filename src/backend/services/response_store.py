@@ -0,0 +1,244 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from services.metrics import register_stats
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency, zlib is used instead
+    zstandard = None
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_STORE_ENABLED = os.getenv("RESPONSE_STORE_ENABLED", "true").lower() in ("1", "true", "yes")
+RESPONSE_STORE_DIR = os.getenv("RESPONSE_STORE_DIR", "./response_store")
+RESPONSE_STORE_TTL_HOURS = float(os.getenv("RESPONSE_STORE_TTL_HOURS", "720"))
+RESPONSE_STORE_MAX_BYTES = int(os.getenv("RESPONSE_STORE_MAX_BYTES", str(1024 ** 3)))
+RESPONSE_STORE_SWEEP_EVERY = int(os.getenv("RESPONSE_STORE_SWEEP_EVERY", "1000"))
+
+@dataclass
+class StoreStats:
+    writes: int = 0
+    dedup_hits: int = 0  # Body already stored under the same content hash
+    reads: int = 0
+    read_misses: int = 0
+    raw_bytes: int = 0  # Uncompressed bytes written
+    stored_bytes: int = 0  # Compressed bytes written
+    evicted_objects: int = 0
+    evicted_entries: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["compression_ratio"] = round(self.raw_bytes / self.stored_bytes, 2) if self.stored_bytes else 0.0
+        data["codec"] = "zstd" if zstandard else "zlib"
+        return data
+
+def _compress(body: bytes) -> Tuple[bytes, str]:
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=10).compress(body), ".zst"
+    return zlib.compress(body, 6), ".zz"
+
+def _decompress(data: bytes, suffix: str) -> bytes:
+    if suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read .zst objects")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+def _write_atomic(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+class ResponseStore:
+    """
+    Compressed, content-addressed store of raw upstream responses.
+
+    Bodies are kept once per SHA-256 under ``objects/`` and every URL has a
+    small JSON index entry under ``index/`` pointing at its latest body and
+    recording its ``kind`` (which normalizer can rebuild a row from it).
+    Entries older than the TTL are dropped and the least recently used
+    objects are evicted once the store exceeds its size budget.
+    """
+
+    def __init__(
+        self,
+        root: str = RESPONSE_STORE_DIR,
+        ttl_hours: float = RESPONSE_STORE_TTL_HOURS,
+        max_bytes: int = RESPONSE_STORE_MAX_BYTES,
+        sweep_every: int = RESPONSE_STORE_SWEEP_EVERY,
+        enabled: bool = RESPONSE_STORE_ENABLED,
+    ):
+        self.root = root
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_bytes = max_bytes
+        self.sweep_every = sweep_every
+        self.enabled = enabled
+        self.stats = StoreStats()
+        self._writes_since_sweep = 0
+
+    def _index_path(self, url: str) -> str:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return os.path.join(self.root, "index", key[:2], f"{key}.json")
+
+    def _object_path(self, digest: str, suffix: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], f"{digest}{suffix}")
+
+    def put(self, url: str, body: bytes, kind: str, content_type: Optional[str] = None) -> Optional[str]:
+        """Store ``body`` as the latest response for ``url``. Returns its content hash."""
+        if not self.enabled:
+            return None
+        digest = hashlib.sha256(body).hexdigest()
+        existing = [
+            path for path in (self._object_path(digest, ".zst"), self._object_path(digest, ".zz"))
+            if os.path.exists(path)
+        ]
+        if existing:
+            self.stats.dedup_hits += 1
+            os.utime(existing[0])
+            suffix = os.path.splitext(existing[0])[1]
+        else:
+            compressed, suffix = _compress(body)
+            _write_atomic(self._object_path(digest, suffix), compressed)
+            self.stats.raw_bytes += len(body)
+            self.stats.stored_bytes += len(compressed)
+
+        entry = {
+            "url": url,
+            "hash": digest,
+            "codec": suffix,
+            "kind": kind,
+            "content_type": content_type,
+            "stored_at": time.time(),
+        }
+        _write_atomic(self._index_path(url), json.dumps(entry).encode())
+        self.stats.writes += 1
+
+        self._writes_since_sweep += 1
+        if self._writes_since_sweep >= self.sweep_every:
+            self.sweep()
+        return digest
+
+    async def aput(self, url: str, body: bytes, kind: str, content_type: Optional[str] = None) -> Optional[str]:
+        """``put`` without blocking the event loop. Failures are logged, never raised."""
+        if not self.enabled:
+            return None
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(None, self.put, url, body, kind, content_type)
+        except Exception as e:
+            logger.error(f"Error storing response for {url}: {e}")
+            return None
+
+    def _read_entry(self, path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, "rb") as f:
+                return json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def read_body(self, entry: Dict[str, Any]) -> Optional[bytes]:
+        """Return the decompressed body an index entry points at."""
+        path = self._object_path(entry["hash"], entry["codec"])
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            self.stats.read_misses += 1
+            return None
+        os.utime(path)  # Reads count as use for eviction
+        self.stats.reads += 1
+        return _decompress(data, entry["codec"])
+
+    def get(self, url: str) -> Optional[bytes]:
+        """Return the latest stored body for ``url`` if it has not expired."""
+        entry = self._read_entry(self._index_path(url))
+        if entry is None or time.time() - entry["stored_at"] > self.ttl_seconds:
+            self.stats.read_misses += 1
+            return None
+        return self.read_body(entry)
+
+    def iter_entries(self, kind: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Yield live index entries, optionally only those of one ``kind``."""
+        index_root = os.path.join(self.root, "index")
+        now = time.time()
+        for dirpath, _, filenames in os.walk(index_root):
+            for filename in filenames:
+                if not filename.endswith(".json"):
+                    continue
+                entry = self._read_entry(os.path.join(dirpath, filename))
+                if entry is None or now - entry["stored_at"] > self.ttl_seconds:
+                    continue
+                if kind is None or entry["kind"] == kind:
+                    yield entry
+
+    def sweep(self) -> Dict[str, int]:
+        """Drop expired entries and objects, then evict LRU objects over the size budget."""
+        self._writes_since_sweep = 0
+        now = time.time()
+        evicted_entries = evicted_objects = 0
+
+        for dirpath, _, filenames in os.walk(os.path.join(self.root, "index")):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                entry = self._read_entry(path)
+                if entry is None or now - entry["stored_at"] > self.ttl_seconds:
+                    try:
+                        os.remove(path)
+                        evicted_entries += 1
+                    except OSError:
+                        pass
+
+        objects = []
+        for dirpath, _, filenames in os.walk(os.path.join(self.root, "objects")):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if now - stat.st_mtime > self.ttl_seconds:
+                    try:
+                        os.remove(path)
+                        evicted_objects += 1
+                    except OSError:
+                        pass
+                else:
+                    objects.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in objects)
+        if total > self.max_bytes:
+            # Evict least recently used objects down to 90% of the budget
+            target = self.max_bytes * 0.9
+            for _, size, path in sorted(objects):
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                    evicted_objects += 1
+                except OSError:
+                    pass
+
+        self.stats.evicted_entries += evicted_entries
+        self.stats.evicted_objects += evicted_objects
+        if evicted_entries or evicted_objects:
+            logger.info(f"Response store sweep evicted {evicted_entries} entries and {evicted_objects} objects")
+        return {"evicted_entries": evicted_entries, "evicted_objects": evicted_objects, "stored_bytes": total}
+
+response_store = ResponseStore()
+register_stats("response_store", lambda: response_store.stats.as_dict())
@@ -1,20 +1,23 @@
 import os
-import requests
-from typing import List, Dict, Any, Optional
-from datetime import datetime
-from bs4 import BeautifulSoup
-from huggingface_hub import HfApi
+from typing import List, Dict, Any, Optional, Set
 from dotenv import load_dotenv
 import httpx
 import asyncio
-from sqlalchemy.orm import Session
 import logging
 from urllib.parse import urljoin
 import re
 import json
 
-from models.database import SessionLocal
-from models.models import AIModel
+from services.http_client import get_client, http_pool
+from services.http_cache import revalidation_cache, NOT_MODIFIED
+from services.response_store import response_store
+from services.html_extract import all_matches, extract_replicate_page, resolve_backend
+from services.rate_limit import send_with_retry
+from services.upstream_metrics import upstream_metrics
+from services.bulk_upsert import UpsertReport, bulk_upsert_models
+from services.model_scraper import determine_model_category, category_input, sync_huggingface_catalog
+from services.classifier import CLASSIFIER_VERSION
+from services.sync_state import plan_sync, record_sync, parse_timestamp, load_cursor, save_cursor
 
 load_dotenv()
 
@@ -26,275 +29,295 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 BASE_URL = "https://replicate.com"
+REPLICATE_MODELS_API = "https://api.replicate.com/v1/models"
 MODELS_URL = f"{BASE_URL}/explore"
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 }
+MODEL_LINK_PATTERN = re.compile(r'/[^/]+/[^/]+$')
 
-async def fetch_page(url: str, client: httpx.AsyncClient) -> Optional[str]:
-    """Fetch a page with retry logic."""
-    max_retries = 3
-    for attempt in range(max_retries):
-        try:
-            response = await client.get(url, headers=HEADERS, timeout=30.0)
-            response.raise_for_status()
-            return response.text
-        except httpx.HTTPError as e:
-            logger.error(f"HTTP error occurred: {e}")
-            if attempt == max_retries - 1:
-                return None
-            await asyncio.sleep(2 ** attempt)  # Exponential backoff
-        except Exception as e:
-            logger.error(f"Error fetching {url}: {e}")
-            return None
-
-async def parse_model_page(url: str, client: httpx.AsyncClient) -> Optional[Dict[str, Any]]:
-    """Parse individual model page to extract detailed information."""
-    html = await fetch_page(url, client)
+# Explore pages fetched concurrently during discovery
+DISCOVERY_WINDOW = int(os.getenv("DISCOVERY_WINDOW", "4"))
+
+async def fetch_page(
+    url: str,
+    client: Optional[httpx.AsyncClient] = None,
+    conditional: bool = False,
+    kind: str = "replicate_page",
+) -> Optional[str]:
+    """
+    Fetch a page under the shared host budget and retry policy.
+    With ``conditional``, returns NOT_MODIFIED when the page is unchanged since the last fetch.
+    ``kind`` names the endpoint in the upstream metrics.
+    """
+    client = client or get_client()
+    try:
+        response = await send_with_retry(
+            lambda: revalidation_cache.get(client, url, conditional=conditional, headers=HEADERS, timeout=30.0),
+            url,
+            kind=kind,
+        )
+        if response.status_code == 304:
+            return NOT_MODIFIED
+        response.raise_for_status()
+        return response.text
+    except httpx.HTTPError as e:
+        logger.error(f"HTTP error occurred: {e}")
+        return None
+    except Exception as e:
+        logger.error(f"Error fetching {url}: {e}")
+        return None
+
+async def parse_model_page(url: str, client: Optional[httpx.AsyncClient] = None, conditional: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Parse individual model page to extract detailed information.
+    With ``conditional``, returns NOT_MODIFIED without parsing when the page is unchanged.
+    """
+    html = await fetch_page(url, client, conditional=conditional)
+    if html is NOT_MODIFIED:
+        return NOT_MODIFIED
     if not html:
         return None
 
-    soup = BeautifulSoup(html, 'html.parser')
-    
+    await response_store.aput(url, html.encode(), "replicate_page", "text/html")
+    with upstream_metrics.parsing("replicate_page"):
+        return parse_model_html(html, url)
+
+def parse_model_html(html: str, url: str) -> Optional[Dict[str, Any]]:
+    """Extract detailed model information from a Replicate model page."""
     try:
-        # Extract model information
-        title_elem = soup.find('h1')
-        description_elem = soup.find('div', {'class': 'markdown'})
-        metrics_elem = soup.find('div', {'class': 'stats'})
-        
-        # Find the script tag containing the model data
-        script_tags = soup.find_all('script', {'type': 'application/json'})
-        model_json_data = {}
-        for script in script_tags:
-            try:
-                data = json.loads(script.string)
-                if isinstance(data, dict) and 'props' in data:
-                    model_json_data = data
-                    break
-            except:
-                continue
-
-        # Extract version information
-        versions = []
-        versions_section = soup.find('div', {'id': 'versions'})
-        if versions_section:
-            version_items = versions_section.find_all('div', {'class': 'version'})
-            for item in version_items:
-                version_info = {
-                    'id': item.get('id', '').replace('version-', ''),
-                    'name': item.find('div', {'class': 'version-name'}).text.strip() if item.find('div', {'class': 'version-name'}) else '',
-                    'created_at': item.find('time').get('datetime') if item.find('time') else None
-                }
-                versions.append(version_info)
-
-        # Extract example section
-        examples = []
-        examples_section = soup.find('div', {'id': 'examples'})
-        if examples_section:
-            example_items = examples_section.find_all('div', {'class': 'example'})
-            for item in example_items:
-                example = {
-                    'title': item.find('h3').text.strip() if item.find('h3') else '',
-                    'description': item.find('p').text.strip() if item.find('p') else '',
-                    'input': item.find('pre', {'class': 'input'}).text.strip() if item.find('pre', {'class': 'input'}) else '',
-                    'output': item.find('pre', {'class': 'output'}).text.strip() if item.find('pre', {'class': 'output'}) else ''
-                }
-                examples.append(example)
-
-        # Extract hardware requirements and performance metrics
-        hardware_section = soup.find('div', {'id': 'hardware'})
-        hardware_info = {}
-        if hardware_section:
-            hardware_items = hardware_section.find_all('div', {'class': 'spec'})
-            for item in hardware_items:
-                key = item.find('div', {'class': 'label'}).text.strip() if item.find('div', {'class': 'label'}) else ''
-                value = item.find('div', {'class': 'value'}).text.strip() if item.find('div', {'class': 'value'}) else ''
-                hardware_info[key.lower()] = value
-
-        model_data = {
-            "name": title_elem.text.strip() if title_elem else "Unknown",
-            "creator": url.split('/')[-2] if len(url.split('/')) > 2 else "Unknown",
-            "category": "uncategorized",  # Will be updated based on tags
-            "description": description_elem.text.strip() if description_elem else "",
-            "replicate_url": url,
-            "metrics": {},
-            "created_at": datetime.utcnow(),
-            "is_featured": False,
-            "access_level": "free",
-            "versions": versions,
-            "examples": examples,
-            "hardware_requirements": hardware_info,
-            "last_updated": None,
-            "license": None,
-            "paper_url": None,
-            "github_url": None,
-            "docker_image": None
-        }
-
-        # Extract metrics
-        if metrics_elem:
-            metrics = {}
-            for stat in metrics_elem.find_all('div', {'class': 'stat'}):
-                label = stat.find('div', {'class': 'label'})
-                value = stat.find('div', {'class': 'value'})
-                if label and value:
-                    metrics[label.text.strip().lower()] = value.text.strip()
-            model_data["metrics"] = metrics
-
-        # Extract additional links
-        links_section = soup.find('div', {'class': 'links'})
-        if links_section:
-            for link in links_section.find_all('a'):
-                href = link.get('href', '')
-                if 'github.com' in href:
-                    model_data['github_url'] = href
-                elif 'arxiv.org' in href or '.pdf' in href:
-                    model_data['paper_url'] = href
-
-        # Extract tags/categories
-        tags_elem = soup.find('div', {'class': 'tags'})
-        if tags_elem:
-            tags = [tag.text.strip() for tag in tags_elem.find_all('a')]
-            if tags:
-                model_data["category"] = tags[0]  # Use first tag as primary category
-                model_data["tags"] = tags
-
-        # Extract license information
-        license_elem = soup.find('div', {'class': 'license'})
-        if license_elem:
-            model_data['license'] = license_elem.text.strip()
-
-        # Check if model is featured
-        featured_badge = soup.find('div', {'class': 'featured-badge'})
-        model_data["is_featured"] = bool(featured_badge)
-
-        # Extract last updated date
-        updated_elem = soup.find('time', {'class': 'updated'})
-        if updated_elem:
-            model_data['last_updated'] = updated_elem.get('datetime')
-
-        # Extract Docker image information
-        docker_elem = soup.find('pre', {'class': 'docker'})
-        if docker_elem:
-            model_data['docker_image'] = docker_elem.text.strip()
-
-        return model_data
+        return extract_replicate_page(html, url)
     except Exception as e:
         logger.error(f"Error parsing model page {url}: {e}")
         return None
 
-async def get_model_urls(client: httpx.AsyncClient) -> List[str]:
-    """Get all model URLs from the explore page."""
-    model_urls = set()
+def explore_page_links(html: str) -> Set[str]:
+    """Absolute model URLs linked from an explore page."""
+    backend = resolve_backend()
+    root = backend.parse(html)
+    return {
+        urljoin(BASE_URL, backend.get(link, "href"))
+        for link in all_matches(backend, root, ("a", None, None))
+        if MODEL_LINK_PATTERN.search(backend.get(link, "href") or "")
+    }
+
+async def get_model_urls(client: Optional[httpx.AsyncClient] = None, window: int = DISCOVERY_WINDOW) -> List[str]:
+    """
+    Get all model URLs from the explore pages.
+
+    Up to ``window`` pages are fetched concurrently under the replicate.com
+    request budget, but results are consumed in page order so the
+    crawl still stops at the first page that yields no new URLs.
+    """
+    client = client or get_client()
+    model_urls: Set[str] = set()
+    pending: Dict[int, asyncio.Task] = {}
+    next_page = 1
     page = 1
-    
-    while True:
-        url = f"{MODELS_URL}?page={page}"
-        html = await fetch_page(url, client)
-        if not html:
-            break
-
-        soup = BeautifulSoup(html, 'html.parser')
-        model_links = soup.find_all('a', href=re.compile(r'/[^/]+/[^/]+$'))
-        
-        new_urls = {urljoin(BASE_URL, link['href']) for link in model_links}
-        if not new_urls or new_urls.issubset(model_urls):
-            break
-            
-        model_urls.update(new_urls)
-        page += 1
-        await asyncio.sleep(1)  # Rate limiting
-    
+
+    try:
+        while True:
+            while next_page < page + window:
+                pending[next_page] = asyncio.create_task(
+                    fetch_page(f"{MODELS_URL}?page={next_page}", client, kind="replicate_explore")
+                )
+                next_page += 1
+
+            html = await pending.pop(page)
+            if not html:
+                break
+
+            with upstream_metrics.parsing("replicate_explore"):
+                new_urls = explore_page_links(html)
+            if not new_urls or new_urls.issubset(model_urls):
+                break
+
+            model_urls.update(new_urls)
+            page += 1
+    finally:
+        # Pages fetched past the end of the catalog are discarded
+        for task in pending.values():
+            task.cancel()
+        await asyncio.gather(*pending.values(), return_exceptions=True)
+
+    logger.info(f"Discovered {len(model_urls)} model URLs across {page} explore pages")
     return list(model_urls)
 
-async def scrape_replicate_models() -> None:
+def replicate_api_url(model_data: Dict[str, Any]) -> str:
+    """Canonical API URL of a Replicate model, used as its response store key."""
+    return f"https://api.replicate.com/v1/models/{model_data.get('owner', '')}/{model_data['name']}"
+
+def normalize_replicate_page(page_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map the output of parse_model_html onto AIModel columns."""
+    owner, name = page_data["replicate_url"].rstrip("/").split("/")[-2:]
+    row = {
+        "id": f"replicate:{owner}/{name}",
+        "name": name,
+        "creator": owner,
+        "source": "replicate",
+        "description": page_data.get("description") or "",
+        "huggingface_url": None,
+        "replicate_url": page_data["replicate_url"],
+        "benchmark_metrics": page_data.get("metrics") or {},
+        "tags": page_data.get("tags", []),
+        "last_updated": parse_timestamp(page_data.get("last_updated")),
+        "model_type": "api",
+        "technical_details": {
+            "license": page_data.get("license"),
+            "hardware_requirements": page_data.get("hardware_requirements") or {},
+            "docker_image": page_data.get("docker_image"),
+        },
+    }
+    if page_data.get("paper_url"):
+        row["papers"] = [{"title": "", "url": page_data["paper_url"], "type": "paper"}]
+    row["category"] = determine_model_category(category_input(row))
+    row["category_version"] = CLASSIFIER_VERSION
+    return row
+
+def normalize_replicate_model(model_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a Replicate API model object onto AIModel columns."""
+    owner = model_data.get("owner", "")
+    name = model_data["name"]
+    latest_version = model_data.get("latest_version") or {}
+    row = {
+        "id": f"replicate:{owner}/{name}",
+        "name": name,
+        "creator": owner,
+        "source": "replicate",
+        "description": model_data.get("description") or "",
+        "huggingface_url": None,
+        "replicate_url": model_data.get("url") or f"https://replicate.com/{owner}/{name}",
+        "tags": [],
+        "last_updated": parse_timestamp(latest_version.get("created_at")),
+        "downloads": model_data.get("run_count", 0),
+        "model_type": "api",
+        "papers": [{"title": "", "url": model_data["paper_url"], "type": "paper"}] if model_data.get("paper_url") else [],
+    }
+    row["category"] = determine_model_category(category_input(row))
+    row["category_version"] = CLASSIFIER_VERSION
+    return row
+
+async def fetch_replicate_page(url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """GET one page of the Replicate models API under the shared retry policy."""
+    headers = {"Authorization": f"Token {REPLICATE_API_TOKEN}"}
+    response = await send_with_retry(
+        lambda: get_client().get(url, params=params, headers=headers),
+        url,
+        authenticated=True,
+        kind="replicate_api",
+    )
+    response.raise_for_status()
+    with upstream_metrics.parsing("replicate_api"):
+        return response.json()
+
+async def _store_replicate_models(models_data: List[Dict[str, Any]]) -> None:
+    await asyncio.gather(*(
+        response_store.aput(
+            replicate_api_url(model_data),
+            json.dumps(model_data).encode(),
+            "replicate_model",
+            "application/json"
+        )
+        for model_data in models_data
+    ))
+
+async def sync_replicate_catalog(mode: str = "auto", resume: bool = True) -> Dict[str, Any]:
+    """
+    Stream the Replicate models API page by page, following ``next`` cursors.
+
+    The next page is prefetched while the current one is upserted off the
+    event loop. After each page is written its ``next`` cursor is
+    checkpointed in sync_state, so a crashed run resumes from the last
+    written page instead of starting over. Models are listed newest version
+    first; in incremental mode the stream stops at the first model not
+    changed since the stored watermark.
+    """
+    loop = asyncio.get_running_loop()
+    plan = plan_sync("replicate", mode)
+    cursor = load_cursor("replicate") if resume else None
+    report: Dict[str, Any] = {"mode": plan.mode, "resumed": bool(cursor), "pages": 0, "models": 0}
+    totals = UpsertReport()
+    high_water = None
+
+    if cursor:
+        logger.info(f"Resuming Replicate sync from {cursor}")
+        next_page = asyncio.create_task(fetch_replicate_page(cursor))
+    else:
+        next_page = asyncio.create_task(fetch_replicate_page(
+            REPLICATE_MODELS_API,
+            {"sort_by": "latest_version_created_at", "sort_direction": "desc"}
+        ))
+
+    try:
+        while next_page is not None:
+            try:
+                page = await next_page
+            except httpx.HTTPStatusError as e:
+                if cursor and report["pages"] == 0 and e.response.status_code < 500:
+                    # Stale cursor from an old run; start over from the first page
+                    logger.warning(f"Replicate cursor rejected ({e.response.status_code}); restarting sync")
+                    save_cursor("replicate", None)
+                    return await sync_replicate_catalog(mode, resume=False)
+                raise
+            report["pages"] += 1
+
+            rows = []
+            reached_watermark = False
+            for model_data in page.get("results", []):
+                row = normalize_replicate_model(model_data)
+                modified = row["last_updated"]
+                if plan.since is not None and modified is not None and modified <= plan.since:
+                    reached_watermark = True
+                    break
+                if modified is not None and (high_water is None or modified > high_water):
+                    high_water = modified
+                rows.append(row)
+
+            cursor = None if reached_watermark else page.get("next")
+            next_page = asyncio.create_task(fetch_replicate_page(cursor)) if cursor else None
+
+            await _store_replicate_models(page.get("results", [])[:len(rows)])
+            if rows:
+                totals.add(await loop.run_in_executor(None, bulk_upsert_models, rows))
+                report["models"] += len(rows)
+            if cursor:
+                await loop.run_in_executor(None, save_cursor, "replicate", cursor)
+    finally:
+        if next_page is not None and not next_page.done():
+            next_page.cancel()
+            await asyncio.gather(next_page, return_exceptions=True)
+
+    report["writes"] = totals.as_dict()
+    record_sync(plan, high_water, {"models": report["models"], "pages": report["pages"], **report["writes"]})
+    logger.info(f"Replicate {plan.mode} sync finished: {report['models']} models over {report['pages']} pages")
+    return report
+
+async def scrape_replicate_models(mode: str = "auto") -> Optional[Dict[str, Any]]:
     """
     Scrape models from Replicate API and store them in the database.
+    Streams every page of the API and resumes an interrupted run.
     """
     if not REPLICATE_API_TOKEN:
         print("Replicate API token not found")
-        return
-
-    headers = {
-        "Authorization": f"Token {REPLICATE_API_TOKEN}"
-    }
+        return None
 
     try:
-        response = requests.get("https://api.replicate.com/v1/models", headers=headers)
-        response.raise_for_status()
-        models_data = response.json().get("results", [])
-
-        db = SessionLocal()
-        try:
-            for model_data in models_data:
-                model = db.query(AIModel).filter(
-                    AIModel.source == "replicate",
-                    AIModel.source_id == model_data["id"]
-                ).first()
-
-                if not model:
-                    model = AIModel(
-                        name=model_data["name"],
-                        description=model_data.get("description", ""),
-                        source="replicate",
-                        source_id=model_data["id"],
-                        creator=model_data.get("owner", ""),
-                        url=f"https://replicate.com/{model_data['owner']}/{model_data['name']}",
-                        created_at=datetime.now(),
-                        updated_at=datetime.now()
-                    )
-                    db.add(model)
-                else:
-                    model.description = model_data.get("description", "")
-                    model.updated_at = datetime.now()
-
-            db.commit()
-        finally:
-            db.close()
-
+        return await sync_replicate_catalog(mode)
     except Exception as e:
         print(f"Error scraping Replicate models: {str(e)}")
+        return None
 
-async def scrape_huggingface_models() -> None:
+async def scrape_huggingface_models(mode: str = "auto") -> None:
     """
     Scrape models from Hugging Face API and store them in the database.
+    Runs the catalog ingestion pipeline, incrementally unless a full sweep is due.
     """
     if not HUGGINGFACE_API_TOKEN:
         print("Hugging Face API token not found")
         return
 
     try:
-        api = HfApi(token=HUGGINGFACE_API_TOKEN)
-        models = api.list_models(limit=100)  # Adjust limit as needed
-
-        db = SessionLocal()
-        try:
-            for model_info in models:
-                model = db.query(AIModel).filter(
-                    AIModel.source == "huggingface",
-                    AIModel.source_id == model_info.modelId
-                ).first()
-
-                if not model:
-                    model = AIModel(
-                        name=model_info.modelId,
-                        description=model_info.description or "",
-                        source="huggingface",
-                        source_id=model_info.modelId,
-                        creator=model_info.author or "",
-                        url=f"https://huggingface.co/{model_info.modelId}",
-                        created_at=datetime.now(),
-                        updated_at=datetime.now()
-                    )
-                    db.add(model)
-                else:
-                    model.description = model_info.description or ""
-                    model.updated_at = datetime.now()
-
-            db.commit()
-        finally:
-            db.close()
-
+        await sync_huggingface_catalog(mode)
     except Exception as e:
         print(f"Error scraping Hugging Face models: {str(e)}")
 
@@ -305,5 +328,6 @@ def scrape_all_models() -> None:
     
     try:
         loop.run_until_complete(scrape_replicate_models())
+        loop.run_until_complete(http_pool.shutdown())
     finally:
         loop.close() 
\ No newline at end of file
@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+import weakref
+from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Optional Redis-compatible store coordinating in-flight work across processes
+SINGLEFLIGHT_REDIS_URL = os.getenv("SINGLEFLIGHT_REDIS_URL")
+SINGLEFLIGHT_LOCK_TTL = float(os.getenv("SINGLEFLIGHT_LOCK_TTL", "60"))
+SINGLEFLIGHT_WAIT_TIMEOUT = float(os.getenv("SINGLEFLIGHT_WAIT_TIMEOUT", "30"))
+SINGLEFLIGHT_POLL_INTERVAL = 0.1
+
+# Deletes the lock only if this process still owns it
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+@dataclass
+class SingleFlightStats:
+    calls: int = 0
+    leaders: int = 0  # Calls that actually ran the work
+    coalesced: int = 0  # Calls that shared an in-flight call in this process
+    remote_waits: int = 0  # Calls that waited for another process holding the lock
+    remote_hits: int = 0  # Remote waits answered from the other process's result
+    lock_errors: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["coalesced_ratio"] = round(self.coalesced / self.calls, 3) if self.calls else 0.0
+        return data
+
+class _LoopState:
+    def __init__(self):
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.redis: Any = None
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one execution.
+
+    Within a process, callers arriving while a call for their key is in
+    flight await its result instead of running the work again. With a
+    Redis URL, the leader also holds a short-lived lock so leaders in other
+    processes wait for it and then read its result through ``after_wait``
+    rather than repeating the work.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        redis_url: Optional[str] = SINGLEFLIGHT_REDIS_URL,
+        lock_ttl: float = SINGLEFLIGHT_LOCK_TTL,
+        wait_timeout: float = SINGLEFLIGHT_WAIT_TIMEOUT,
+    ):
+        self.name = name
+        self.redis_url = redis_url
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.stats = SingleFlightStats()
+        self._states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        if loop not in self._states:
+            self._states[loop] = _LoopState()
+        return self._states[loop]
+
+    def _redis(self, state: _LoopState) -> Any:
+        if not self.redis_url:
+            return None
+        if state.redis is None:
+            try:
+                import redis.asyncio as redis_asyncio
+            except ImportError:  # Optional dependency, coalescing stays per process
+                logger.warning("redis is not installed; single-flight locks are per process only")
+                self.redis_url = None
+                return None
+            state.redis = redis_asyncio.from_url(self.redis_url)
+        return state.redis
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        after_wait: Optional[Callable[[], Awaitable[Any]]] = None,
+    ) -> Any:
+        """
+        Run ``fn`` once for all concurrent callers of ``key`` and return its result.
+        ``after_wait`` is tried first when another process did the work; if it
+        returns None, ``fn`` runs after all. When the caller running ``fn`` is
+        cancelled, the callers waiting on it elect a new one instead of
+        failing with it.
+        """
+        self.stats.calls += 1
+        state = self._state()
+        while key in state.inflight:
+            inflight = state.inflight[key]
+            self.stats.coalesced += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The leader was cancelled (e.g. its client went away), not this
+                # caller: join the next call in flight or lead a new one
+                self.stats.coalesced -= 1
+
+        future = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting; mark the outcome as retrieved either way
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        state.inflight[key] = future
+        self.stats.leaders += 1
+        try:
+            result = await self._lead(state, key, fn, after_wait)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            state.inflight.pop(key, None)
+
+    async def _lead(
+        self,
+        state: _LoopState,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        after_wait: Optional[Callable[[], Awaitable[Any]]],
+    ) -> Any:
+        redis = self._redis(state)
+        if redis is None:
+            return await fn()
+
+        lock_key = f"singleflight:{self.name}:{key}"
+        token = uuid.uuid4().hex
+        try:
+            acquired = await redis.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000))
+        except Exception as e:
+            # The lock is an optimisation; never fail the request because of it
+            self.stats.lock_errors += 1
+            logger.warning(f"Single-flight lock unavailable for {lock_key}: {e}")
+            return await fn()
+
+        if acquired:
+            try:
+                return await fn()
+            finally:
+                try:
+                    await redis.eval(_RELEASE_SCRIPT, 1, lock_key, token)
+                except Exception as e:
+                    self.stats.lock_errors += 1
+                    logger.warning(f"Could not release single-flight lock {lock_key}: {e}")
+
+        self.stats.remote_waits += 1
+        deadline = time.monotonic() + self.wait_timeout
+        try:
+            while time.monotonic() < deadline and await redis.exists(lock_key):
+                await asyncio.sleep(SINGLEFLIGHT_POLL_INTERVAL)
+        except Exception as e:
+            self.stats.lock_errors += 1
+            logger.warning(f"Lost single-flight lock store while waiting on {lock_key}: {e}")
+        if after_wait is not None:
+            result = await after_wait()
+            if result is not None:
+                self.stats.remote_hits += 1
+                return result
+        return await fn()
@@ -0,0 +1,131 @@
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import func
+
+from models.database import SessionLocal
+from models.models import AIModel, SyncState
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# How often an incremental source falls back to a full reconciliation sweep
+FULL_SYNC_INTERVAL_HOURS = float(os.getenv("FULL_SYNC_INTERVAL_HOURS", "168"))
+
+SYNC_MODES = ("auto", "incremental", "full")
+
+@dataclass
+class SyncPlan:
+    """What a catalog run should fetch: everything, or only changes after ``since``."""
+    source: str
+    mode: str  # 'full' or 'incremental'
+    since: Optional[datetime] = None
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse an upstream ISO-8601 timestamp into a naive UTC datetime."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        logger.warning(f"Unparseable upstream timestamp: {value}")
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def _naive(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def plan_sync(source: str, mode: str = "auto") -> SyncPlan:
+    """
+    Decide between an incremental and a full run for ``source``.
+
+    In 'auto' mode a full sweep runs when none has been recorded or the last
+    one is older than FULL_SYNC_INTERVAL_HOURS; otherwise only models changed
+    after the stored watermark are fetched. Without a stored watermark the
+    newest ``AIModel.last_updated`` of the source is used.
+    """
+    if mode not in SYNC_MODES:
+        raise ValueError(f"Unknown sync mode: {mode}")
+
+    db = SessionLocal()
+    try:
+        state = db.query(SyncState).filter(SyncState.source == source).first()
+        watermark = _naive(state.watermark) if state else None
+        if watermark is None:
+            watermark = _naive(
+                db.query(func.max(AIModel.last_updated)).filter(AIModel.source == source).scalar()
+            )
+        last_full = _naive(state.last_full_sync_at) if state else None
+    finally:
+        db.close()
+
+    if mode == "auto":
+        full_due = last_full is None or (
+            datetime.utcnow() - last_full >= timedelta(hours=FULL_SYNC_INTERVAL_HOURS)
+        )
+        mode = "full" if full_due or watermark is None else "incremental"
+    elif mode == "incremental" and watermark is None:
+        logger.info(f"No watermark recorded for {source}; running a full sync")
+        mode = "full"
+
+    plan = SyncPlan(source=source, mode=mode, since=watermark if mode == "incremental" else None)
+    logger.info(f"Planned {plan.mode} sync for {source}" + (f" since {plan.since}" if plan.since else ""))
+    return plan
+
+def record_sync(plan: SyncPlan, watermark: Optional[datetime], stats: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Persist the outcome of a successful run. The watermark only moves forward,
+    so a run that saw no changes keeps the previous one.
+    """
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        state = db.query(SyncState).filter(SyncState.source == plan.source).first()
+        if state is None:
+            state = SyncState(source=plan.source)
+            db.add(state)
+        current = _naive(state.watermark)
+        if watermark is not None and (current is None or watermark > current):
+            state.watermark = watermark
+        if plan.mode == "full":
+            state.last_full_sync_at = now
+        state.last_sync_at = now
+        state.cursor = None  # The run finished, nothing left to resume
+        state.stats = {"mode": plan.mode, **(stats or {})}
+        db.commit()
+    finally:
+        db.close()
+
+def load_cursor(source: str) -> Optional[str]:
+    """Pagination cursor left by an unfinished run of ``source``, if any."""
+    db = SessionLocal()
+    try:
+        state = db.query(SyncState).filter(SyncState.source == source).first()
+        return state.cursor if state else None
+    finally:
+        db.close()
+
+def save_cursor(source: str, cursor: Optional[str]) -> None:
+    """
+    Checkpoint the position of a running sync. Call only once everything
+    before ``cursor`` has been written, so a crashed run can resume from it.
+    """
+    db = SessionLocal()
+    try:
+        state = db.query(SyncState).filter(SyncState.source == source).first()
+        if state is None:
+            state = SyncState(source=source)
+            db.add(state)
+        state.cursor = cursor
+        db.commit()
+    finally:
+        db.close()
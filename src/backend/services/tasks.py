@@ -1,5 +1,11 @@
-from celery import Celery
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Dict, List, Optional
+from celery import Celery, chord
 from celery.schedules import crontab
+from celery.signals import worker_process_init, worker_process_shutdown
+from celery.worker.control import inspect_command
 from .email import (
     send_newsletter_email,
     send_subscription_confirmation_email,
@@ -7,6 +13,23 @@ from .email import (
     send_welcome_email
 )
 from .model_scraper import scrape_specific_model, scrape_models
+from .http_client import http_pool
+from .http_cache import revalidation_cache
+from .metrics import collect_stats
+from .reparse import reparse_from_store
+from .classifier import reclassify_catalog
+from .sync_state import plan_sync
+from .refresh_scheduler import REFRESH_TICK_SECONDS, refresh_due_models
+from .crawl_shards import (
+    CRAWL_SHARDS,
+    CRAWL_SHARD_MAX_RETRIES,
+    failed_shard_report,
+    finish_sharded_sync,
+    shard_retry_delay,
+    sync_huggingface_shard
+)
+
+logger = logging.getLogger(__name__)
 
 # Create Celery instance
 celery = Celery(
@@ -24,6 +47,41 @@ celery.conf.update(
     enable_utc=True,
 )
 
+# Event loop owned by this worker process. Async scrapers run on it so the
+# shared HTTP client pool keeps its connections alive between tasks.
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _get_worker_loop() -> asyncio.AbstractEventLoop:
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.is_closed():
+        _worker_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_worker_loop)
+    return _worker_loop
+
+def run_async(coro: Awaitable[Any]) -> Any:
+    """Run a coroutine to completion on the worker's event loop."""
+    return _get_worker_loop().run_until_complete(coro)
+
+@worker_process_init.connect
+def init_worker_process(**kwargs) -> None:
+    """Open the shared HTTP client pool when a worker process boots."""
+    run_async(http_pool.startup())
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs) -> None:
+    """Close pooled connections and the worker loop on process exit."""
+    global _worker_loop
+    if _worker_loop is not None and not _worker_loop.is_closed():
+        _worker_loop.run_until_complete(revalidation_cache.flush())
+        _worker_loop.run_until_complete(http_pool.shutdown())
+        _worker_loop.close()
+    _worker_loop = None
+
+@inspect_command()
+def scraper_stats(state, **kwargs):
+    """Expose in-process service stats via `celery -A worker inspect scraper_stats`."""
+    return collect_stats()
+
 @celery.task
 async def send_newsletter_task(subject: str, content: str) -> None:
     """Send newsletter to all subscribers."""
@@ -45,21 +103,90 @@ async def send_welcome_email_task(user_email: str) -> None:
     send_welcome_email(user_email)
 
 @celery.task
-async def scrape_specific_model_task(model_id: str) -> None:
+def scrape_specific_model_task(model_id: str) -> None:
     """Scrape a specific model."""
-    await scrape_specific_model(model_id)
+    run_async(scrape_specific_model(model_id))
+
+@celery.task
+def scrape_models_task(mode: str = "auto") -> None:
+    """Scrape all models, incrementally unless a full sweep is due."""
+    run_async(scrape_models(mode))
+
+@celery.task
+def reparse_models_task(kinds: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Rebuild catalog rows from the response store, without network access."""
+    return run_async(reparse_from_store(kinds))
 
 @celery.task
-async def scrape_models_task() -> None:
-    """Scrape all models."""
-    await scrape_models()
+def reclassify_models_task(force: bool = False) -> Dict[str, Any]:
+    """Recompute categories of models classified by an older classifier version."""
+    return reclassify_catalog(force=force)
+
+@celery.task(bind=True, max_retries=CRAWL_SHARD_MAX_RETRIES)
+def crawl_shard_task(self, index: int, shards: int, since: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Crawl one id-hash shard of the Hugging Face catalog, publishing progress
+    as task state. A failing or incomplete shard is retried on its own.
+    """
+    def progress(report: Dict[str, Any]) -> None:
+        self.update_state(state="PROGRESS", meta={
+            "shard": index,
+            "shards": shards,
+            "models": report["stages"]["upsert"]["items_out"],
+            "elapsed_seconds": report["elapsed_seconds"],
+        })
+
+    try:
+        report = run_async(sync_huggingface_shard(
+            index, shards, datetime.fromisoformat(since) if since else None, progress=progress
+        ))
+    except Exception as e:
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=shard_retry_delay(self.request.retries))
+        logger.error(f"Crawl shard {index}/{shards} failed after {self.request.retries} retries: {e}")
+        # Still report, so the aggregation runs and records what the other shards did
+        return failed_shard_report(index, shards, e)
+
+    if not report["complete"] and self.request.retries < self.max_retries:
+        raise self.retry(countdown=shard_retry_delay(self.request.retries))
+    return report
+
+@celery.task
+def finish_crawl_task(reports: List[Dict[str, Any]], mode: str, since: Optional[str] = None) -> Dict[str, Any]:
+    """Aggregate shard reports and record the sync once every shard is done."""
+    return finish_sharded_sync(reports, mode, since)
+
+@celery.task
+def crawl_catalog_task(mode: str = "auto", shards: int = CRAWL_SHARDS) -> str:
+    """
+    Plan a catalog sync and fan it out as a chord of shard crawls, so it
+    spreads over every available worker. Returns the chord result id.
+    """
+    plan = plan_sync("huggingface", mode)
+    since = plan.since.isoformat() if plan.since else None
+    result = chord(
+        crawl_shard_task.s(index, shards, since) for index in range(shards)
+    )(finish_crawl_task.s(plan.mode, since))
+    return result.id
+
+@celery.task
+def refresh_due_models_task() -> Dict[str, Any]:
+    """Refresh the models whose popularity-weighted refresh time has come."""
+    return run_async(refresh_due_models())
 
 # Periodic tasks configuration
 @celery.on_after_configure.connect
 def setup_periodic_tasks(sender, **kwargs):
-    # Run model updates daily at 5 AM
+    # Run model updates daily at 5 AM, sharded across workers
     sender.add_periodic_task(
         crontab(hour=5, minute=0),
-        scrape_models_task.s(),
+        crawl_catalog_task.s(),
         name='update-ai-models-daily'
-    ) 
\ No newline at end of file
+    ) 
+
+    # Feed due models to the scraper at a steady rate, one tick a minute
+    sender.add_periodic_task(
+        REFRESH_TICK_SECONDS,
+        refresh_due_models_task.s(),
+        name='refresh-due-models'
+    )
@@ -0,0 +1,93 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from services.metrics import Histogram, register_stats
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the parse time buckets
+PARSE_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+class EndpointStats:
+    """Outbound call and parse statistics for one kind of upstream endpoint."""
+
+    def __init__(self):
+        self.calls = 0
+        self.transport_errors = 0  # Calls that never got a response
+        self.statuses: Dict[str, int] = {}
+        self.retries = 0
+        self.bytes_received = 0
+        self.latency = Histogram()
+        self.parse = Histogram(PARSE_BUCKETS)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "transport_errors": self.transport_errors,
+            "statuses": dict(self.statuses),
+            "retries": self.retries,
+            "bytes_received": self.bytes_received,
+            "latency_seconds": self.latency.snapshot(),
+            "parse_seconds": self.parse.snapshot(),
+        }
+
+class UpstreamMetrics:
+    """
+    In-process aggregation of every outbound scraper call, keyed by endpoint
+    kind (e.g. "hf_model", "hf_papers", "replicate_page"). Latency covers
+    the whole call including retries and backoff.
+    """
+
+    def __init__(self):
+        self._endpoints: Dict[str, EndpointStats] = {}
+
+    def endpoint(self, kind: str) -> EndpointStats:
+        if kind not in self._endpoints:
+            self._endpoints[kind] = EndpointStats()
+        return self._endpoints[kind]
+
+    def record_call(
+        self,
+        kind: str,
+        status_code: Optional[int],
+        seconds: float,
+        bytes_received: int = 0,
+        retries: int = 0,
+    ) -> None:
+        """Record one call; ``status_code`` is None when it failed without a response."""
+        stats = self.endpoint(kind)
+        stats.calls += 1
+        if status_code is None:
+            stats.transport_errors += 1
+        else:
+            key = str(status_code)
+            stats.statuses[key] = stats.statuses.get(key, 0) + 1
+        stats.retries += retries
+        stats.bytes_received += bytes_received
+        stats.latency.observe(seconds)
+
+    @contextmanager
+    def parsing(self, kind: str) -> Iterator[None]:
+        """Time the parsing of a response of ``kind``."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.endpoint(kind).parse.observe(time.perf_counter() - started)
+
+    def reset(self) -> None:
+        self._endpoints.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        endpoints = {kind: stats.snapshot() for kind, stats in self._endpoints.items()}
+        total = sum(stats.latency.sum + stats.parse.sum for stats in self._endpoints.values())
+        for kind, stats in self._endpoints.items():
+            # Share of all scraper time spent waiting on and parsing this endpoint
+            spent = stats.latency.sum + stats.parse.sum
+            endpoints[kind]["share_of_time"] = round(spent / total, 3) if total else 0.0
+        return endpoints
+
+upstream_metrics = UpstreamMetrics()
+register_stats("upstream_endpoints", upstream_metrics.snapshot)
@@ -1,50 +1,68 @@
+import asyncio
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
 
+from ..models import models  # Registers every table on Base.metadata
 from ..models.database import Base, get_db
 from ..main import app
 
-# Create in-memory SQLite database for testing
-SQLALCHEMY_DATABASE_URL = "sqlite://"
-
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+@pytest.fixture(scope="function")
+def database_path(tmp_path):
+    """
+    A fresh SQLite file per test, shared by the sync fixtures and the async API sessions.
+    """
+    return tmp_path / "test.db"
 
 @pytest.fixture(scope="function")
-def db():
+def db(database_path):
     """
     Create a fresh database for each test.
     """
+    engine = create_engine(f"sqlite:///{database_path}", connect_args={"check_same_thread": False})
     Base.metadata.create_all(bind=engine)
-    db = TestingSessionLocal()
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
     try:
         yield db
     finally:
         db.close()
         Base.metadata.drop_all(bind=engine)
+        engine.dispose()
 
 @pytest.fixture(scope="function")
-def client(db):
+def session_factory(database_path):
+    """
+    Session factory on the test database with every table created, for
+    services that take a ``session_factory``.
+    """
+    engine = create_engine(f"sqlite:///{database_path}")
+    Base.metadata.create_all(bind=engine)
+    try:
+        yield sessionmaker(bind=engine)
+    finally:
+        engine.dispose()
+
+@pytest.fixture(scope="function")
+def client(db, database_path):
     """
     Create a test client using the test database.
     """
-    def override_get_db():
-        try:
-            yield db
-        finally:
-            db.close()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}")
+    TestingAsyncSession = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_db():
+        async with TestingAsyncSession() as session:
+            yield session
 
     app.dependency_overrides[get_db] = override_get_db
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
+    # The client's event loop is gone; close the pooled connections on a fresh one
+    asyncio.run(engine.dispose())
 
 @pytest.fixture(scope="function")
 def test_user(client, db):
@@ -87,4 +105,4 @@ def superuser_token(client, test_superuser):
         "password": "admin123"
     })
     assert response.status_code == 200
-    return response.json()["access_token"] 
\ No newline at end of file
+    return response.json()["access_token"]
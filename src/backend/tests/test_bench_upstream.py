@@ -0,0 +1,35 @@
+import httpx
+import pytest
+
+from ..benchmarks.upstream import StandInTransport, UpstreamConfig, UpstreamStandIn
+
+@pytest.mark.asyncio
+async def test_stand_in_replays_fixtures_for_the_real_hosts():
+    upstream = UpstreamStandIn(UpstreamConfig(models=3, latency=0, jitter=0)).start()
+    try:
+        async with httpx.AsyncClient(transport=StandInTransport(upstream.port)) as client:
+            listing = await client.get("https://huggingface.co/api/models", params={"limit": 2})
+            assert [entry["id"] for entry in listing.json()] == ["bench-org-0/model-0", "bench-org-1/model-1"]
+            assert listing.links["next"]["url"].startswith("https://huggingface.co/api/models?cursor=2")
+            assert str(listing.url).startswith("https://huggingface.co/")
+
+            detail = await client.get("https://huggingface.co/api/models/bench-org-2/model-2")
+            assert detail.json()["modelId"] == "bench-org-2/model-2"
+            assert (await client.get("https://huggingface.co/api/models/bench-org-3/model-3")).status_code == 404
+
+            explore = await client.get("https://replicate.com/explore", params={"page": 1})
+            assert "/replicate-model-0" in explore.text
+    finally:
+        upstream.stop()
+    assert upstream.stats.requests == 4
+
+@pytest.mark.asyncio
+async def test_stand_in_injects_errors():
+    upstream = UpstreamStandIn(UpstreamConfig(latency=0, jitter=0, error_rate=0.5, throttle_rate=0.5)).start()
+    try:
+        async with httpx.AsyncClient(transport=StandInTransport(upstream.port)) as client:
+            statuses = {(await client.get("https://huggingface.co/api/models")).status_code for _ in range(20)}
+    finally:
+        upstream.stop()
+    assert statuses == {429, 503}
+    assert upstream.stats.injected_errors + upstream.stats.injected_throttles == 20
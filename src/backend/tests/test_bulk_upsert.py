@@ -0,0 +1,129 @@
+import json
+import os
+from datetime import datetime, timezone
+
+from ..models.models import AIModel
+from ..services.bulk_upsert import bulk_upsert_models, content_hash, stored_content_hash
+from ..services.classifier import CLASSIFIER_VERSION, category_input, reclassify_catalog
+from ..services.model_scraper import determine_model_category, normalize_huggingface_model
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "fixtures", "huggingface", "model.json")
+
+def _row(i, **overrides):
+    row = {
+        "id": f"org/model-{i}",
+        "name": f"model-{i}",
+        "source": "huggingface",
+        "tags": ["llm"],
+        "config": {"layers": i},
+        "last_updated": datetime(2024, 1, 1),
+        "created_at": None,
+        "updated_at": None,
+    }
+    row.update(overrides)
+    return row
+
+def test_inserts_updates_and_skips_unchanged_rows_in_chunks(session_factory):
+    first = bulk_upsert_models([_row(i) for i in range(5)], chunk_size=2, session_factory=session_factory)
+    assert (first.inserted, first.updated, first.skipped, first.chunks) == (5, 0, 0, 3)
+
+    rows = [_row(i) for i in range(5)] + [_row(5)]
+    rows[1] = _row(1, tags=["llm", "chat"])
+    second = bulk_upsert_models(rows, chunk_size=4, session_factory=session_factory)
+    assert (second.inserted, second.updated, second.skipped) == (1, 1, 4)
+
+    db = session_factory()
+    try:
+        stored = {model.id: model for model in db.query(AIModel).all()}
+        assert len(stored) == 6
+        assert stored["org/model-1"].tags == ["llm", "chat"]
+        assert stored["org/model-1"].updated_at is not None
+        assert stored["org/model-2"].updated_at is None
+        assert stored["org/model-0"].downloads == 0  # Column default applied on insert
+        assert stored["org/model-0"].created_at is not None
+    finally:
+        db.close()
+
+def test_rows_with_different_columns_and_duplicate_ids(session_factory):
+    rows = [
+        _row(0),
+        {"id": "replicate:owner/name", "name": "name", "source": "replicate", "downloads": 7},
+        _row(0, name="renamed"),
+    ]
+    report = bulk_upsert_models(rows, session_factory=session_factory)
+    assert (report.inserted, report.updated, report.skipped) == (2, 0, 0)
+
+    db = session_factory()
+    try:
+        assert db.query(AIModel).filter(AIModel.id == "org/model-0").one().name == "renamed"
+        assert db.query(AIModel).filter(AIModel.id == "replicate:owner/name").one().downloads == 7
+    finally:
+        db.close()
+
+def test_matching_content_hash_only_writes_bookkeeping(session_factory):
+    bulk_upsert_models([_row(0)], session_factory=session_factory)
+
+    scraped_at = datetime(2024, 2, 1)
+    report = bulk_upsert_models([_row(0, last_scraped_at=scraped_at)], session_factory=session_factory)
+    assert (report.inserted, report.updated, report.skipped) == (0, 0, 1)
+    # Bookkeeping-only rows never touch the content
+    report = bulk_upsert_models([{"id": "org/model-0", "unchanged_refreshes": 3}], session_factory=session_factory)
+    assert report.skipped == 1
+    # ... and never insert a stub row for an id that is not stored
+    report = bulk_upsert_models([{"id": "org/missing", "last_scraped_at": scraped_at}], session_factory=session_factory)
+    assert (report.inserted, report.skipped) == (0, 1)
+
+    db = session_factory()
+    try:
+        model = db.query(AIModel).filter(AIModel.id == "org/model-0").one()
+        assert model.last_scraped_at == scraped_at
+        assert model.unchanged_refreshes == 3
+        assert model.updated_at is None
+        scraped = {key: value for key, value in _row(0).items() if key not in ("created_at", "updated_at")}
+        assert model.content_hash == content_hash(scraped)
+        assert db.query(AIModel).filter(AIModel.id == "org/missing").first() is None
+    finally:
+        db.close()
+
+def test_content_hash_is_canonical():
+    assert content_hash({"id": "a", "tags": ["x"], "config": {"b": 1, "a": 2}}) == \
+        content_hash({"config": {"a": 2, "b": 1}, "tags": ["x"], "id": "b", "last_scraped_at": datetime(2024, 1, 1)})
+    assert content_hash({"last_updated": datetime(2024, 1, 1, tzinfo=timezone.utc)}) == \
+        content_hash({"last_updated": datetime(2024, 1, 1)})
+    assert content_hash({"tags": ["x"]}) != content_hash({"tags": ["y"]})
+
+def _scraped_fixture():
+    with open(FIXTURE) as f:
+        row = normalize_huggingface_model(json.load(f))
+    row["category"] = determine_model_category(category_input(row))
+    row["category_version"] = CLASSIFIER_VERSION
+    return row
+
+def test_stored_hash_matches_the_write_path_after_reclassification(session_factory):
+    bulk_upsert_models([_scraped_fixture()], session_factory=session_factory)
+    db = session_factory()
+    try:
+        model = db.get(AIModel, _scraped_fixture()["id"])
+        assert model.content_hash == stored_content_hash(model)
+    finally:
+        db.close()
+
+    reclassify_catalog(force=True, session_factory=session_factory)
+    report = bulk_upsert_models([_scraped_fixture()], session_factory=session_factory)
+    assert (report.inserted, report.updated, report.skipped) == (0, 0, 1)
+
+def test_partial_rows_hash_the_content_they_leave_in_place(session_factory):
+    bulk_upsert_models([_row(0, papers=[{"id": "2401.00001"}])], session_factory=session_factory)
+    # A list sync row carries no papers; the stored ones are kept
+    report = bulk_upsert_models([_row(0)], session_factory=session_factory)
+    assert report.skipped == 1
+    report = bulk_upsert_models([_row(0, likes=5)], session_factory=session_factory)
+    assert report.updated == 1
+
+    db = session_factory()
+    try:
+        model = db.get(AIModel, "org/model-0")
+        assert model.papers == [{"id": "2401.00001"}]
+        assert model.content_hash == stored_content_hash(model)
+    finally:
+        db.close()
@@ -0,0 +1,81 @@
+import random
+from unittest.mock import patch
+
+import pytest
+
+from ..models.models import AIModel
+from ..services import classifier as classifier_module
+from ..services.bulk_upsert import stored_content_hash
+from ..services.classifier import MODEL_CATEGORIES, CompiledClassifier, category_input, reclassify_catalog
+
+def _scan(model_data):
+    # Reference behaviour: first category with any keyword in the combined text
+    text = " ".join([
+        model_data["description"].lower(),
+        " ".join(model_data["tags"]).lower(),
+        model_data["pipeline_tag"].lower(),
+        model_data["name"].lower(),
+    ])
+    for category, keywords in MODEL_CATEGORIES.items():
+        if any(keyword in text for keyword in keywords):
+            return category
+    return "other"
+
+def _backends():
+    backends = [CompiledClassifier()]
+    with patch.object(classifier_module, "ahocorasick", None):
+        backends.append(CompiledClassifier())
+    return backends
+
+def _random_models(count):
+    rng = random.Random(3)
+    vocabulary = [keyword for keywords in MODEL_CATEGORIES.values() for keyword in keywords]
+    vocabulary += ["bert", "organization", "Text2Text", "pytorch", "audio", "speech", "a", "-", "image"]
+    return [
+        category_input({
+            "description": "".join(rng.choice(vocabulary) for _ in range(rng.randint(0, 4))),
+            "tags": rng.sample(vocabulary, rng.randint(0, 3)),
+            "pipeline_tag": rng.choice(["", "fill-mask", "text-generation"]),
+            "name": f"org/model-{i}",
+        })
+        for i in range(500)
+    ]
+
+@pytest.mark.parametrize("model_classifier", _backends(), ids=lambda c: c.backend)
+def test_batch_matches_sequential_keyword_scan(model_classifier):
+    models = _random_models(500) + [
+        category_input({"description": "Made by an organization"}),  # 'gan' inside a word
+        category_input({"tags": ["audio-generation"]}),  # Keyword listed under two categories
+        category_input({"name": "tts-speech-to-text"}),
+        category_input({}),
+    ]
+    assert model_classifier.classify_batch(models) == [_scan(model) for model in models]
+    assert model_classifier.classify(models[-3]) == "text-to-speech"
+
+def test_reclassify_only_touches_older_versions(session_factory):
+    db = session_factory()
+    db.add_all([
+        AIModel(id="a/old", name="a/old", tags=["llm"], category="other", category_version=None),
+        AIModel(id="b/stale", name="b/stale", pipeline_tag="text-to-image", category="other", category_version=1),
+        AIModel(id="c/current", name="c/current", tags=["llm"], category="manual", category_version=2),
+    ])
+    db.commit()
+    db.close()
+
+    report = reclassify_catalog(chunk_size=1, session_factory=session_factory, model_classifier=CompiledClassifier(version=2))
+    assert (report["scanned"], report["changed"], report["chunks"]) == (2, 2, 2)
+
+    db = session_factory()
+    models = db.query(AIModel).all()
+    stored = {model.id: (model.category, model.category_version) for model in models}
+    hashes = {model.id: model.content_hash for model in models}
+    # Rewritten rows carry the hash of their new content
+    assert hashes["a/old"] == stored_content_hash(db.get(AIModel, "a/old"))
+    assert hashes["b/stale"] == stored_content_hash(db.get(AIModel, "b/stale"))
+    assert hashes["c/current"] is None
+    db.close()
+    assert stored == {
+        "a/old": ("text-generation", 2),
+        "b/stale": ("image-generation", 2),
+        "c/current": ("manual", 2),
+    }
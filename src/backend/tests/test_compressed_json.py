@@ -0,0 +1,86 @@
+import json
+
+from sqlalchemy import JSON, Column, String, create_engine, select, text
+from sqlalchemy.orm import declarative_base, deferred, sessionmaker, undefer_group
+
+from ..models import types
+from ..models.models import AIModel, DETAIL_GROUP
+from ..models.types import (
+    CompressedJSON,
+    LazyJSON,
+    compression_stats,
+    decode_json,
+    encode_json,
+    json_type,
+    lazy_json,
+)
+
+SIBLINGS = [{"rfilename": f"model-{i:05d}-of-00040.safetensors"} for i in range(40)]
+
+def test_large_values_are_compressed_and_small_ones_kept_plain():
+    stored = encode_json(SIBLINGS)
+    assert len(stored) * 5 < len(json.dumps(SIBLINGS))
+    assert decode_json(stored) == SIBLINGS
+
+    assert encode_json({"layers": 2}) == b'{"layers":2}'
+    assert encode_json(None) is None
+
+def test_reads_plain_json_written_before_compression():
+    assert decode_json('{"a": [1, 2]}') == {"a": [1, 2]}
+    assert decode_json(b"null") is None
+
+def test_compressed_columns_round_trip_through_the_database(session_factory):
+    db = session_factory()
+    db.add(AIModel(id="org/model", name="model", siblings=SIBLINGS, config={"model_type": "llama"}))
+    db.commit()
+    db.expunge_all()
+
+    model = db.query(AIModel).options(undefer_group(DETAIL_GROUP)).one()
+    assert model.siblings == SIBLINGS
+    assert model.config == {"model_type": "llama"}
+    db.close()
+
+def test_compression_is_opt_in_per_column(monkeypatch):
+    monkeypatch.setattr(types, "COMPRESSED_JSON_COLUMNS", frozenset())
+    assert isinstance(json_type("siblings"), JSON)
+    monkeypatch.setattr(types, "COMPRESSED_JSON_COLUMNS", frozenset({"siblings"}))
+    assert isinstance(json_type("siblings"), CompressedJSON)
+    assert isinstance(json_type("config"), JSON)
+
+def test_compressed_values_decode_on_first_access(tmp_path):
+    Blobs = declarative_base()
+
+    class Blob(Blobs):
+        __tablename__ = "blobs"
+        id = Column(String, primary_key=True)
+        _config = deferred(Column("config", CompressedJSON), group="detail")
+        config = lazy_json("_config")
+        _siblings = deferred(Column("siblings", CompressedJSON), group="detail")
+        siblings = lazy_json("_siblings")
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'blobs.db'}")
+    Blobs.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(Blob(id="a", config={"model_type": "llama"}, siblings=SIBLINGS))
+    db.commit()
+    db.expunge_all()
+
+    raw = db.execute(text("SELECT siblings FROM blobs")).scalar()
+    assert isinstance(raw, bytes) and raw[:1] == b"x"
+
+    blob = db.query(Blob).options(undefer_group("detail")).one()
+    decodes = compression_stats.decodes
+    assert blob.config == {"model_type": "llama"}
+    assert blob.config["model_type"] == "llama"
+    assert compression_stats.decodes == decodes + 1  # siblings stays compressed
+    assert not db.is_modified(blob)
+
+    # Selected directly, the value is decoded when first used
+    siblings = db.execute(select(Blob.siblings)).scalar()
+    assert isinstance(siblings, LazyJSON) and siblings[0] == SIBLINGS[0] and len(siblings) == 40
+
+    blob.siblings = SIBLINGS[:1]
+    db.commit()
+    db.expunge_all()
+    assert db.query(Blob).options(undefer_group("detail")).one().siblings == SIBLINGS[:1]
+    db.close()
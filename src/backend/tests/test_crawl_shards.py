@@ -0,0 +1,91 @@
+from datetime import datetime
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from ..services import model_scraper
+from ..services.crawl_shards import merge_shard_reports
+from ..services.model_scraper import shard_of
+
+def test_every_model_lands_in_exactly_one_stable_shard():
+    ids = [f"org/model-{i}" for i in range(1000)]
+    shards = [shard_of(model_id, 8) for model_id in ids]
+
+    assert set(shards) == set(range(8))
+    # Roughly balanced: no shard holds more than twice its fair share
+    assert max(shards.count(index) for index in range(8)) < 2 * len(ids) / 8
+    assert shard_of("org/model-1", 8) == shards[1]
+
+@pytest.mark.asyncio
+async def test_sharded_listing_partitions_catalog_and_shares_high_water():
+    listing = [
+        {"id": f"org/model-{i}", "lastModified": f"2024-03-{28 - i:02d}T00:00:00.000Z"}
+        for i in range(20)
+    ]
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, json=listing)))
+
+    seen = []
+    with patch.object(model_scraper, "get_client", lambda: client):
+        for index in range(3):
+            source = model_scraper.HuggingFaceCatalogSource(shard=(index, 3))
+            seen.extend([entry["id"] async for entry in source.list_models()])
+            assert source.high_water == datetime(2024, 3, 28)
+
+    assert sorted(seen) == sorted(entry["id"] for entry in listing)
+
+def test_merge_shard_reports():
+    def report(shard, models, elapsed, high_water, complete=True):
+        return {
+            "shard": shard,
+            "complete": complete,
+            "elapsed_seconds": elapsed,
+            "unchanged": 1,
+            "high_water": high_water,
+            "stages": {"upsert": {"items_in": models, "items_out": models, "errors": 0}},
+            "writes": {"inserted": models, "updated": 0},
+        }
+
+    merged = merge_shard_reports([
+        report(0, 30, 10.0, "2024-03-01T00:00:00"),
+        report(1, 10, 5.0, "2024-03-02T00:00:00"),
+        {"shard": 2, "complete": False, "error": "boom"},
+    ])
+
+    assert merged["models"] == 40
+    assert merged["writes"] == {"inserted": 40, "updated": 0}
+    assert merged["elapsed_seconds"] == 10.0
+    assert merged["models_per_sec"] == 4.0
+    assert merged["high_water"] == "2024-03-02T00:00:00"
+    assert merged["failed_shards"] == [2]
+    assert not merged["complete"]
+
+@pytest.mark.asyncio
+async def test_shard_with_failed_fetches_is_incomplete():
+    from unittest.mock import AsyncMock
+    from ..services import crawl_shards
+
+    report = {
+        "stages": {name: {"items_in": 4, "items_out": 4, "errors": 0} for name in ("list", "fetch", "normalize", "classify", "upsert")},
+        "writes": {},
+    }
+    report["stages"]["fetch"]["errors"] = 1
+    # Same class as the limits crawl_shards resolved, whichever import path loaded it
+    limits = type(crawl_shards.upstream_limits)(redis_url=None)
+    split_during_run = []
+
+    async def run_ingestion(source, progress=None):
+        split_during_run.append(limits.processes)
+        return report
+
+    with patch.object(crawl_shards, "run_ingestion", run_ingestion), \
+            patch.object(crawl_shards.revalidation_cache, "flush", AsyncMock()), \
+            patch.object(crawl_shards, "upstream_limits", limits), \
+            patch.object(crawl_shards, "CRAWL_WORKERS", 4):
+        result = await crawl_shards.sync_huggingface_shard(0, 8)
+
+    assert result["complete"] is False
+    assert merge_shard_reports([result])["failed_shards"] == [0]
+    # Four shard workers share the budget while the shard runs; the process gets it back afterwards
+    assert split_during_run == [4]
+    assert limits.processes == 1
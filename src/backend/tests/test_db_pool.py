@@ -0,0 +1,80 @@
+import sqlite3
+import time
+
+import pytest
+from sqlalchemy import create_engine, exc
+
+from ..services import db_pool
+from ..services.db_pool import engine_options, pool_sizing, pool_snapshot, track_engine
+
+def test_pool_sizing_splits_connection_budget_across_processes():
+    assert pool_sizing(5, 10, max_connections=0, processes=4) == (5, 10)
+    assert pool_sizing(5, 10, max_connections=40, processes=4, engines=1) == (5, 5)
+    assert pool_sizing(5, 10, max_connections=8, processes=4, engines=1) == (2, 0)
+    assert pool_sizing(5, 10, max_connections=2, processes=4, engines=1) == (1, 0)
+
+def test_pool_sizing_splits_each_process_share_across_its_engines():
+    # Sync and async engine of every API process
+    assert pool_sizing(5, 10, max_connections=40, processes=4, engines=2) == (5, 0)
+    assert pool_sizing(5, 10, max_connections=16, processes=4, engines=2) == (2, 0)
+
+def test_engine_options_follow_the_dialect():
+    postgres = engine_options("postgresql://user:secret@db/app")
+    assert "connect_args" not in postgres
+    assert postgres["pool_pre_ping"] is True
+    assert postgres["pool_recycle"] == db_pool.DB_POOL_RECYCLE
+
+    sqlite = engine_options("sqlite:///./app.db")
+    assert sqlite["connect_args"] == {"check_same_thread": False}
+    assert "pool_pre_ping" not in sqlite
+    assert engine_options("sqlite://") == {"connect_args": {"check_same_thread": False}}
+
+    assert engine_options("postgresql+asyncpg://db/app", asynchronous=True)["poolclass"].__name__ == (
+        "InstrumentedAsyncAdaptedQueuePool"
+    )
+
+def test_pool_reports_overflow_and_timeouts(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_pool, "DB_POOL_TIMEOUT", 0.01)
+    options = engine_options(f"sqlite:///{tmp_path / 'pool.db'}")
+    options.update(pool_size=1, max_overflow=1)
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", **options)
+    track_engine("test", engine)
+    try:
+        first, second = engine.connect(), engine.connect()
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+        stats = pool_snapshot()["test"]
+        assert stats["in_use"] == 2
+        assert stats["overflow"] == 1
+        assert stats["overflows"] == 1
+        assert stats["timeouts"] == 1
+        assert stats["checkouts"] == 3
+        assert stats["checkout_wait"]["max"] >= 0.01
+        # Opening the two connections is reported apart from the wait for a slot
+        assert stats["connects"] == 2
+        assert stats["connect_time"]["count"] == 2
+
+        first.close()
+        second.close()
+        assert pool_snapshot()["test"]["in_use"] == 0
+    finally:
+        track_engine("test", None)
+        engine.dispose()
+    assert "test" not in pool_snapshot()
+
+def test_checkout_wait_leaves_out_opening_the_connection(tmp_path):
+    path = tmp_path / "slow.db"
+
+    def slow_connect():
+        time.sleep(0.05)
+        return sqlite3.connect(path, check_same_thread=False)
+
+    engine = create_engine(f"sqlite:///{path}", creator=slow_connect, **engine_options(f"sqlite:///{path}"))
+    try:
+        engine.connect().close()
+        stats = engine.pool.stats.as_dict()
+        assert stats["connect_time"]["max"] >= 0.05
+        assert stats["checkout_wait"]["max"] < 0.05
+    finally:
+        engine.dispose()
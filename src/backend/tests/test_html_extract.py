@@ -0,0 +1,66 @@
+import glob
+import os
+import pytest
+
+from ..services.html_extract import extract_replicate_page
+
+FIXTURES = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "benchmarks", "fixtures", "replicate", "*.html")))
+
+PAGE = """
+<html><body>
+  <h1> owner/model </h1>
+  <div class="tags"><a>text-to-image</a> <a>popular</a></div>
+  <div class="stats extra">
+    <div class="stat"><div class="label">Runs</div><div class="value">1.2M</div></div>
+    <div class="stat"><div class="label">Orphan</div></div>
+  </div>
+  <div class="markdown"><p>Fast<!-- note --> model</p>
+    <script>var hidden = 1;</script>
+    <p>&amp; friends</p></div>
+  <div id="versions">
+    <div class="version" id="version-abc"><div class="version-name">v1</div><time datetime="2024-01-01">now</time></div>
+    <div class="version" id="version-def"></div>
+  </div>
+  <div class="links"><a href="https://github.com/o/m">code</a><a href="https://arxiv.org/abs/1">paper</a></div>
+  <pre class="docker">  docker run r8.im/owner/model  </pre>
+</body></html>
+"""
+
+def _without_timestamp(data):
+    return {key: value for key, value in data.items() if key != "created_at"}
+
+def test_extracts_sections_in_a_single_pass():
+    data = extract_replicate_page(PAGE, "https://replicate.com/owner/model", parser="html.parser")
+
+    assert data["name"] == "owner/model"
+    assert data["creator"] == "owner"
+    assert data["category"] == "text-to-image"
+    assert data["tags"] == ["text-to-image", "popular"]
+    assert data["metrics"] == {"runs": "1.2M"}
+    assert data["description"] == "Fast model\n\n& friends"
+    assert data["versions"] == [
+        {"id": "abc", "name": "v1", "created_at": "2024-01-01"},
+        {"id": "def", "name": "", "created_at": None},
+    ]
+    assert data["github_url"] == "https://github.com/o/m"
+    assert data["paper_url"] == "https://arxiv.org/abs/1"
+    assert data["docker_image"] == "docker run r8.im/owner/model"
+    assert data["is_featured"] is False
+    assert data["examples"] == [] and data["hardware_requirements"] == {}
+
+@pytest.mark.parametrize("path", FIXTURES)
+def test_lxml_backend_matches_html_parser(path):
+    pytest.importorskip("lxml")
+    with open(path, encoding="utf-8") as f:
+        html = f.read()
+    url = "https://replicate.com/owner/model"
+
+    expected = _without_timestamp(extract_replicate_page(html, url, parser="html.parser"))
+    assert _without_timestamp(extract_replicate_page(html, url, parser="lxml")) == expected
+    assert expected["versions"] and expected["examples"] and expected["hardware_requirements"]
+
+def test_lxml_backend_matches_html_parser_on_edge_cases():
+    pytest.importorskip("lxml")
+    url = "https://replicate.com/owner/model"
+    assert _without_timestamp(extract_replicate_page(PAGE, url, parser="lxml")) == \
+        _without_timestamp(extract_replicate_page(PAGE, url, parser="html.parser"))
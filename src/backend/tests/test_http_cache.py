@@ -0,0 +1,76 @@
+import httpx
+import pytest
+from unittest.mock import patch
+
+from ..services.http_cache import RevalidationCache, cache_key
+
+def _upstream(etag):
+    def handler(request):
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304)
+        return httpx.Response(200, text="x" * 100, headers={"ETag": etag})
+    return handler
+
+@pytest.mark.asyncio
+async def test_conditional_fetch_counts_hits_and_304s():
+    cache = RevalidationCache()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(_upstream('"v1"')))
+    with patch.object(cache, "_load", return_value=None), patch.object(cache, "_write") as write:
+        first = await cache.get(client, "https://huggingface.co/api/models/org/model")
+        second = await cache.get(client, "https://huggingface.co/api/models/org/model")
+        await cache.flush()
+
+    assert first.status_code == 200
+    assert second.status_code == 304
+    assert cache.stats.misses == 1
+    assert cache.stats.hits == 1
+    assert cache.stats.not_modified == 1
+    assert cache.stats.bytes_saved == 100
+    write.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_unconditional_fetch_ignores_stored_validators():
+    cache = RevalidationCache()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(_upstream('"v1"')))
+    stored = {"etag": '"v1"', "last_modified": None, "content_length": 100}
+    with patch.object(cache, "_load", return_value=stored), patch.object(cache, "_write"):
+        response = await cache.get(client, "https://huggingface.co/org/model/papers", conditional=False)
+
+    assert response.status_code == 200
+    assert cache.stats.not_modified == 0
+
+@pytest.mark.asyncio
+async def test_held_validators_are_kept_only_once_committed():
+    cache = RevalidationCache()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(_upstream('"v1"')))
+    url = "https://huggingface.co/api/models/org/model"
+    with patch.object(cache, "_load", return_value=None), patch.object(cache, "_write") as write:
+        await cache.get(client, url, hold=True)
+        await cache.flush()
+        write.assert_not_called()
+
+        # Not committed yet: the next fetch is still a full one
+        assert (await cache.get(client, url, hold=True)).status_code == 200
+        cache.commit([cache_key(url)])
+        assert (await cache.get(client, url)).status_code == 304
+        await cache.flush()
+
+    write.assert_called_once()
+    assert list(write.call_args.args[0]) == [url]
+
+@pytest.mark.asyncio
+async def test_holding_block_drops_validators_on_error():
+    cache = RevalidationCache()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(_upstream('"v1"')))
+    url = "https://huggingface.co/api/models/org/model"
+    with patch.object(cache, "_load", return_value=None), patch.object(cache, "_write"):
+        with pytest.raises(RuntimeError):
+            async with cache.holding():
+                await cache.get(client, url)
+                raise RuntimeError("write failed")
+
+        async with cache.holding() as held:
+            # Nothing was kept by the failed block
+            assert (await cache.get(client, url)).status_code == 200
+        assert held == {url}
+        assert (await cache.get(client, url)).status_code == 304
@@ -0,0 +1,68 @@
+import asyncio
+
+import httpx
+import pytest
+
+from ..services.http_client import HTTPClientPool
+
+@pytest.mark.asyncio
+async def test_pool_reuses_client_within_loop():
+    pool = HTTPClientPool()
+    async with pool.lifespan() as client:
+        assert pool.get_client() is client
+        assert not client.is_closed
+    assert client.is_closed
+
+@pytest.mark.asyncio
+async def test_pool_snapshot_reports_connection_stats():
+    pool = HTTPClientPool()
+    snapshot = pool.snapshot()
+    for key in ("connections_opened", "connections_reused", "connection_wait_seconds"):
+        assert snapshot[key] == 0
+
+def _pooled_mock_transport(client):
+    """
+    Swap the network transport for one emitting the httpcore trace events of
+    a pool holding a single keep-alive connection.
+    """
+    connected = []
+
+    async def handler(request):
+        trace = request.extensions["trace"]
+        if not connected:
+            await trace("connection.connect_tcp.started", {})
+            await trace("connection.connect_tcp.complete", {})
+            connected.append(True)
+        await trace("http11.send_request_headers.started", {})
+        return httpx.Response(200, json={"ok": True})
+
+    client._transport._transport = httpx.MockTransport(handler)
+
+@pytest.mark.asyncio
+async def test_pool_counts_opened_and_reused_connections():
+    pool = HTTPClientPool()
+    async with pool.lifespan() as client:
+        _pooled_mock_transport(client)
+        for _ in range(3):
+            response = await client.get("https://huggingface.co/api/models")
+            await response.aclose()
+
+    snapshot = pool.snapshot()
+    assert snapshot["requests"] == 3
+    assert snapshot["connections_opened"] == 1
+    assert snapshot["connections_reused"] == 2
+
+def test_pool_closes_client_of_previous_loop():
+    pool = HTTPClientPool()
+
+    async def current_client():
+        client = pool.get_client()
+        await asyncio.sleep(0)  # Let the stale client close
+        return client
+
+    first = asyncio.run(current_client())
+    second = asyncio.run(current_client())
+    assert second is not first
+    assert first.is_closed
+    assert not second.is_closed
+    asyncio.run(pool.shutdown())
@@ -0,0 +1,120 @@
+import pytest
+
+from ..services.ingestion import ingestion_complete, run_ingestion
+
+class FakeSource:
+    name = "fake"
+
+    def __init__(self, count):
+        self.count = count
+
+    async def list_models(self):
+        for i in range(self.count):
+            yield {"id": f"org/model-{i}"}
+
+    async def fetch_detail(self, entry):
+        if entry["id"].endswith("-3"):
+            return None  # Gone upstream
+        if entry["id"].endswith("-4"):
+            raise RuntimeError("upstream error")
+        return {"id": entry["id"], "tags": ["llm"]}
+
+    def normalize(self, payload):
+        return {"id": payload["id"], "name": payload["id"], "tags": payload["tags"]}
+
+    def classify(self, row):
+        return "text-generation"
+
+@pytest.mark.asyncio
+async def test_pipeline_streams_all_stages_in_batches():
+    batches = []
+    report = await run_ingestion(FakeSource(25), write_batch=batches.append, batch_size=10, queue_size=2)
+
+    written = [row for batch in batches for row in batch]
+    assert len(written) == 23
+    assert all(len(batch) <= 10 for batch in batches)
+    assert all(row["category"] == "text-generation" for row in written)
+
+    stages = report["stages"]
+    assert list(stages) == ["list", "fetch", "normalize", "classify", "upsert"]
+    assert stages["list"]["items_out"] == 25
+    assert stages["fetch"]["errors"] == 1
+    assert stages["upsert"]["items_out"] == 23
+    assert all("models_per_sec" in stats for stats in stages.values())
+    # A failed fetch leaves the run incomplete, like a failed write would
+    assert not ingestion_complete(report)
+
+@pytest.mark.asyncio
+async def test_pipeline_without_errors_is_complete():
+    report = await run_ingestion(FakeSource(3), write_batch=lambda rows: None)
+    assert ingestion_complete(report)
+
+@pytest.mark.asyncio
+async def test_pipeline_survives_failing_writer():
+    def failing_writer(rows):
+        raise RuntimeError("database is locked")
+
+    report = await run_ingestion(FakeSource(5), write_batch=failing_writer, batch_size=2)
+    assert report["stages"]["upsert"]["errors"] == 3
+
+@pytest.mark.asyncio
+async def test_pipeline_reports_written_and_failed_batches_to_source():
+    class TrackingSource(FakeSource):
+        def __init__(self, count):
+            super().__init__(count)
+            self.written_ids, self.failed_ids = [], []
+
+        def written(self, rows):
+            self.written_ids += [row["id"] for row in rows]
+
+        def failed(self, rows):
+            self.failed_ids += [row["id"] for row in rows]
+
+    def writer(rows):
+        if any(row["id"].endswith("-1") for row in rows):
+            raise RuntimeError("database is locked")
+
+    source = TrackingSource(3)
+    await run_ingestion(source, write_batch=writer, batch_size=1, fetch_concurrency=1)
+    assert sorted(source.written_ids) == ["org/model-0", "org/model-2"]
+    assert source.failed_ids == ["org/model-1"]
+
+@pytest.mark.asyncio
+async def test_pipeline_reports_progress():
+    import asyncio
+
+    class SlowSource(FakeSource):
+        async def fetch_detail(self, entry):
+            await asyncio.sleep(0.01)
+            return {"id": entry["id"], "tags": []}
+
+    updates = []
+    await run_ingestion(SlowSource(10), write_batch=lambda rows: None, fetch_concurrency=1, progress=updates.append, progress_interval=0.02)
+
+    assert updates
+    assert all("stages" in update for update in updates)
+
+@pytest.mark.asyncio
+async def test_classify_stage_classifies_normalized_rows_in_batches():
+    class BatchSource(FakeSource):
+        classifier_version = 7
+
+        def __init__(self, count):
+            super().__init__(count)
+            self.batches = []
+
+        def classify(self, row):
+            raise AssertionError("rows are classified in batches")
+
+        def classify_batch(self, rows):
+            self.batches.append(len(rows))
+            return ["text-generation"] * len(rows)
+
+    source = BatchSource(40)
+    written = []
+    report = await run_ingestion(source, write_batch=written.extend, batch_size=8)
+
+    assert sum(source.batches) == 38 and max(source.batches) <= 8
+    assert len(source.batches) < 38  # Queued rows share a scan
+    assert all(row["category"] == "text-generation" and row["category_version"] == 7 for row in written)
+    assert report["stages"]["classify"]["items_out"] == 38
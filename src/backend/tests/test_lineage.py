@@ -0,0 +1,73 @@
+from ..models.models import ModelLineage
+from ..services.bulk_upsert import bulk_upsert_models
+from ..services.lineage import edges_from_row, rebuild_lineage, walk_lineage
+
+def _row(model_id, tree=None, base_model=None):
+    row = {"id": model_id, "name": model_id, "source": "huggingface"}
+    if tree is not None:
+        row["model_tree"] = tree
+    if base_model is not None:
+        row["card_data"] = {"base_model": base_model, "base_model_relation": "quantized"}
+    return row
+
+def test_edges_from_tree_and_card():
+    row = _row("org/base", tree={"finetunes": ["org/chat"], "quantizations": [{"id": "org/base-gguf"}]}, base_model="org/root")
+    assert edges_from_row(row) == {
+        ("org/base", "org/chat", "finetune", "tree"),
+        ("org/base", "org/base-gguf", "quantization", "tree"),
+        ("org/root", "org/base", "quantization", "card"),
+    }
+
+def _graph(factory):
+    bulk_upsert_models([
+        _row("a", tree={"finetunes": ["b", "c"], "quantizations": ["a-q"]}),
+        _row("b", tree={"finetunes": ["d"], "quantizations": ["b-q1", "b-q2"]}),
+        _row("c", tree={"finetunes": ["d"]}),
+        _row("d", tree={"merges": ["a"]}),  # A cycle must not loop forever
+    ], session_factory=factory)
+
+def test_descendants_and_ancestors_with_depth_and_relation(session_factory):
+    _graph(session_factory)
+    db = session_factory()
+    try:
+        result = walk_lineage(db, "a", max_depth=2)
+        assert [(item["id"], item["depth"]) for item in result["items"]] == [
+            ("a-q", 1), ("b", 1), ("c", 1), ("b-q1", 2), ("b-q2", 2), ("d", 2),
+        ]
+        assert result["items"][1]["in_catalog"] and not result["items"][0]["in_catalog"]
+
+        quantized = walk_lineage(db, "b", relations=["quantization"], max_depth=5)
+        assert [item["id"] for item in quantized["items"]] == ["b-q1", "b-q2"]
+
+        ancestors = walk_lineage(db, "d", direction="ancestors", max_depth=10)
+        assert [(item["id"], item["depth"]) for item in ancestors["items"]] == [("b", 1), ("c", 1), ("a", 2)]
+    finally:
+        db.close()
+
+def test_keyset_pagination(session_factory):
+    _graph(session_factory)
+    db = session_factory()
+    try:
+        seen, cursor = [], None
+        while True:
+            page = walk_lineage(db, "a", max_depth=3, limit=2, cursor=cursor)
+            seen.extend(item["id"] for item in page["items"])
+            cursor = page["next"]
+            if cursor is None:
+                break
+        assert seen == [item["id"] for item in walk_lineage(db, "a", max_depth=3)["items"]]
+        assert len(seen) == len(set(seen)) == 6
+    finally:
+        db.close()
+
+def test_rescrape_replaces_edges_and_rebuild_matches(session_factory):
+    _graph(session_factory)
+    bulk_upsert_models([_row("b", tree={"finetunes": []})], session_factory=session_factory)
+    db = session_factory()
+    try:
+        assert [item["id"] for item in walk_lineage(db, "b")["items"]] == []
+        edges = db.query(ModelLineage).count()
+    finally:
+        db.close()
+
+    assert rebuild_lineage(session_factory=session_factory)["edges"] == edges
@@ -0,0 +1,99 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from ..services import model_detail
+from ..services.model_detail import freshness_ttl, is_stale
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+def _model(**overrides):
+    model = {
+        "id": "org/model",
+        "source": "huggingface",
+        "last_updated": datetime(2024, 1, 1),
+        "last_scraped_at": NOW - timedelta(minutes=5),
+    }
+    model.update(overrides)
+    return model
+
+def test_freshness_policy():
+    assert not is_stale(_model(), NOW)
+    assert is_stale(_model(last_scraped_at=NOW - timedelta(seconds=model_detail.MODEL_FRESH_TTL)), NOW)
+    # Never scraped on demand, e.g. only seen in a catalog sync
+    assert is_stale(_model(last_scraped_at=None), NOW)
+    # No detail scraper for Replicate rows
+    assert not is_stale(_model(source="replicate", last_scraped_at=None), NOW)
+
+    active = _model(last_updated=NOW - timedelta(days=1))
+    assert freshness_ttl(active, NOW) == model_detail.MODEL_ACTIVE_FRESH_TTL
+    assert freshness_ttl(_model(), NOW) == model_detail.MODEL_FRESH_TTL
+
+@pytest.mark.asyncio
+async def test_stale_rows_are_served_and_refreshed_once(monkeypatch):
+    calls = []
+    release = asyncio.Event()
+
+    async def fake_scrape_and_store(model_id, conditional=False):
+        calls.append((model_id, conditional))
+        await release.wait()
+        return {"status": "success", "model": {"id": model_id}}
+
+    monkeypatch.setattr(model_detail, "scrape_and_store", fake_scrape_and_store)
+    stale = _model(last_scraped_at=None)
+
+    responses = [model_detail.serve_stored(stale) for _ in range(3)]
+    assert all(response == {"status": "success", "model": stale} for response in responses)
+
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(*model_detail._refresh_tasks)
+
+    assert calls == [("org/model", True)]
+    assert "org/model" not in model_detail._refreshing
+
+    # A fresh row never triggers a refresh
+    model_detail.serve_stored(_model(last_scraped_at=datetime.now(timezone.utc)))
+    assert not model_detail._refresh_tasks
+
+@pytest.mark.asyncio
+async def test_conditional_scrape_of_never_scraped_row_is_unconditional(monkeypatch):
+    scrapes, writes = [], []
+
+    async def fake_scrape(model_id, conditional=False):
+        scrapes.append(conditional)
+        return {"status": "success", "model": {"id": model_id, "papers": [{"title": "x"}]}}
+
+    async def fake_load(model_id):
+        return {"status": "success", "model": {"id": model_id}}
+
+    monkeypatch.setattr(model_detail, "scrape_specific_model", fake_scrape)
+    monkeypatch.setattr(model_detail, "bulk_upsert_models", writes.append)
+    monkeypatch.setattr(model_detail, "_load_stored", fake_load)
+    # Catalog row: stored, but its enrichment was never fetched
+    monkeypatch.setattr(model_detail, "was_scraped", lambda model_id: False)
+
+    await model_detail.scrape_and_store("org/model", conditional=True)
+    assert scrapes == [False]
+    assert writes[0][0]["papers"] == [{"title": "x"}]
+
+@pytest.mark.asyncio
+async def test_unchanged_model_still_stores_changed_enrichment(monkeypatch):
+    writes = []
+
+    async def fake_scrape(model_id, conditional=False):
+        return {"status": "unchanged", "model_id": model_id, "enrichment": {"spaces": ["org/demo"]}}
+
+    async def fake_load(model_id):
+        return {"status": "success", "model": {"id": model_id}}
+
+    monkeypatch.setattr(model_detail, "scrape_specific_model", fake_scrape)
+    monkeypatch.setattr(model_detail, "bulk_upsert_models", writes.append)
+    monkeypatch.setattr(model_detail, "_load_stored", fake_load)
+    monkeypatch.setattr(model_detail, "was_scraped", lambda model_id: True)
+
+    await model_detail.scrape_and_store("org/model", conditional=True)
+    (row,) = writes[0]
+    assert row["spaces"] == ["org/demo"]
+    assert "last_scraped_at" in row and "papers" not in row
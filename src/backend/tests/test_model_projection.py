@@ -0,0 +1,44 @@
+from sqlalchemy import event
+from sqlalchemy.orm import undefer_group
+
+from ..models.models import AIModel, DETAIL_GROUP
+from ..models.schemas import AIModelResponse, AIModelSummary
+
+def _session(session_factory):
+    engine = session_factory.kw["bind"]
+    db = session_factory()
+    db.add_all([
+        AIModel(id=f"org/model-{i}", name=f"model-{i}", source="huggingface", category="other",
+                config={"layers": i}, files=[{"name": "model.safetensors"}], siblings=[{"rfilename": "a"}])
+        for i in range(3)
+    ])
+    db.commit()
+    db.expunge_all()
+    return engine, db
+
+def _count_statements(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+def test_summaries_load_no_detail_columns(session_factory):
+    engine, db = _session(session_factory)
+    statements = _count_statements(engine)
+
+    summaries = [AIModelSummary.model_validate(model) for model in db.query(AIModel).all()]
+
+    assert len(summaries) == 3
+    assert len(statements) == 1  # No per-row lazy loads
+    assert "config" not in statements[0] and "files" not in statements[0]
+    db.close()
+
+def test_detail_group_loads_in_the_same_query(session_factory):
+    engine, db = _session(session_factory)
+    statements = _count_statements(engine)
+
+    model = db.query(AIModel).options(undefer_group(DETAIL_GROUP)).filter(AIModel.id == "org/model-2").one()
+    detail = AIModelResponse.model_validate(model)
+
+    assert detail.config == {"layers": 2}
+    assert len(statements) == 1
+    db.close()
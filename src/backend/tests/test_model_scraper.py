@@ -0,0 +1,108 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+
+from ..services import model_scraper
+
+async def _slow(client, model_id, conditional=False):
+    await asyncio.sleep(1)
+    return [{"title": "late"}]
+
+async def _failing(client, model_id, conditional=False):
+    raise RuntimeError("upstream exploded")
+
+async def _tree(client, model_id, conditional=False):
+    return {"adapters": [], "finetunes": ["a/b"], "merges": [], "quantizations": []}
+
+async def _citation(client, model_id, conditional=False):
+    return "@article{x}"
+
+@pytest.mark.asyncio
+async def test_enrichment_keeps_results_when_one_fetch_fails():
+    fetchers = dict(model_scraper.ENRICHMENT_FETCHERS)
+    fetchers["spaces"] = (_failing, list)
+    fetchers["model_tree"] = (_tree, dict)
+    fetchers["citation"] = (_citation, lambda: None)
+    with patch.dict(model_scraper.ENRICHMENT_FETCHERS, fetchers):
+        results = await model_scraper.fetch_model_enrichment(None, "org/model", deadline=0.5)
+
+    assert results["spaces"] == []
+    assert results["model_tree"]["finetunes"] == ["a/b"]
+    assert results["citation"] == "@article{x}"
+
+@pytest.mark.asyncio
+async def test_enrichment_respects_total_deadline():
+    fetchers = {name: (_slow, default) for name, (_, default) in model_scraper.ENRICHMENT_FETCHERS.items()}
+    fetchers["citation"] = (_citation, lambda: None)
+    with patch.dict(model_scraper.ENRICHMENT_FETCHERS, fetchers), \
+            patch.object(model_scraper, "ENRICHMENT_HOST_CONCURRENCY", len(fetchers)):
+        started = asyncio.get_running_loop().time()
+        results = await model_scraper.fetch_model_enrichment(None, "org/model", deadline=0.1)
+        elapsed = asyncio.get_running_loop().time() - started
+
+    assert elapsed < 0.5
+    assert results["papers"] == []
+    assert results["model_tree"] == {}
+    assert results["citation"] == "@article{x}"
+
+@pytest.mark.asyncio
+async def test_enrichment_per_fetch_timeout():
+    fetchers = dict(model_scraper.ENRICHMENT_FETCHERS)
+    fetchers["papers"] = (_slow, list)
+    for name in ("spaces", "model_tree", "technical_details", "downloads"):
+        fetchers[name] = (_tree, dict)
+    fetchers["citation"] = (_citation, lambda: None)
+    with patch.dict(model_scraper.ENRICHMENT_FETCHERS, fetchers), \
+            patch.object(model_scraper, "ENRICHMENT_FETCH_TIMEOUT", 0.05):
+        results = await model_scraper.fetch_model_enrichment(None, "org/model", deadline=5)
+
+    assert results["papers"] == []
+    assert results["spaces"]["finetunes"] == ["a/b"]
+
+@pytest.mark.asyncio
+async def test_catalog_listing_stops_at_watermark():
+    import httpx
+    from datetime import datetime
+
+    listing = [
+        {"id": "org/new", "lastModified": "2024-03-01T00:00:00.000Z"},
+        {"id": "org/changed", "lastModified": "2024-02-01T00:00:00.000Z"},
+        {"id": "org/old", "lastModified": "2024-01-01T00:00:00.000Z"},
+    ]
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, json=listing)))
+    source = model_scraper.HuggingFaceCatalogSource(since=datetime(2024, 1, 15))
+    with patch.object(model_scraper, "get_client", lambda: client):
+        entries = [entry async for entry in source.list_models()]
+
+    assert [entry["id"] for entry in entries] == ["org/new", "org/changed"]
+    assert source.high_water == datetime(2024, 3, 1)
+
+@pytest.mark.asyncio
+async def test_catalog_sync_keeps_watermark_when_a_fetch_failed():
+    from unittest.mock import AsyncMock, MagicMock
+    from ..services.sync_state import SyncPlan
+
+    report = {
+        "stages": {name: {"items_in": 2, "items_out": 2, "errors": 0} for name in ("list", "fetch", "normalize", "classify", "upsert")},
+        "writes": {"inserted": 1},
+    }
+    report["stages"]["fetch"]["errors"] = 1
+    record_sync = MagicMock()
+    with patch.object(model_scraper, "plan_sync", lambda name, mode: SyncPlan(name, "incremental", None)), \
+            patch.object(model_scraper, "run_ingestion", AsyncMock(return_value=report)), \
+            patch.object(model_scraper.revalidation_cache, "flush", AsyncMock()), \
+            patch.object(model_scraper, "record_sync", record_sync):
+        await model_scraper.sync_huggingface_catalog()
+    record_sync.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_conditional_enrichment_keeps_stored_values_of_failed_fetches():
+    fetchers = dict(model_scraper.ENRICHMENT_FETCHERS)
+    fetchers["spaces"] = (_failing, list)
+    fetchers["model_tree"] = (_tree, dict)
+    fetchers["citation"] = (_citation, lambda: None)
+    with patch.dict(model_scraper.ENRICHMENT_FETCHERS, {name: fetchers[name] for name in ("spaces", "model_tree", "citation")}, clear=True):
+        results = await model_scraper.fetch_model_enrichment(None, "org/model", deadline=0.5, conditional=True)
+
+    assert "spaces" not in results
+    assert results["model_tree"]["finetunes"] == ["a/b"]
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from ..services import model_detail
+from ..services.negative_cache import NegativeCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = NegativeCache("test", ttl=60, redis_url=None, clock=clock)
+
+    await cache.add("typo/model")
+    assert await cache.contains("typo/model")
+
+    clock.now = 61
+    assert not await cache.contains("typo/model")
+    assert cache.stats.expirations == 1
+    assert cache.snapshot()["size"] == 0
+
+@pytest.mark.asyncio
+async def test_memory_cap_evicts_least_recently_used():
+    cache = NegativeCache("test", ttl=60, max_entries=2, redis_url=None)
+
+    await cache.add("a")
+    await cache.add("b")
+    assert await cache.contains("a")  # "b" is now the oldest
+    await cache.add("c")
+
+    assert await cache.contains("a")
+    assert not await cache.contains("b")
+    assert await cache.contains("c")
+    assert cache.stats.evictions == 1
+    assert await cache.clear() == 2
+
+class FakeSharedStore:
+    """Minimal stand-in for the Redis commands the negative cache uses."""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, px=None):
+        self.values[key] = value
+
+    async def pttl(self, key):
+        return 60000 if key in self.values else -2
+
+    async def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, 0)) + 1).encode()
+        return int(self.values[key])
+
+    async def delete(self, *keys):
+        return sum(self.values.pop(key, None) is not None for key in keys)
+
+    async def scan_iter(self, match):
+        for key in list(self.values):
+            if key.startswith(match.rstrip("*")):
+                yield key
+
+@pytest.mark.asyncio
+async def test_clear_in_one_process_reaches_the_others():
+    store = FakeSharedStore()
+    workers = [NegativeCache("test", redis_url="redis://unused") for _ in range(2)]
+    for worker in workers:
+        worker._clients[asyncio.get_running_loop()] = store
+
+    await workers[0].add("typo/model")
+    await workers[0].add("bot/probe")
+    assert await workers[1].contains("typo/model")  # Learned from the shared store
+    assert await workers[1].contains("bot/probe")
+
+    await workers[0].clear()
+    assert not await workers[1].contains("typo/model")
+    assert not await workers[1].contains("bot/probe")
+
+    await workers[1].add("bot/probe")
+    assert await workers[0].contains("bot/probe")
+    await workers[0].discard("bot/probe")
+    assert not await workers[1].contains("bot/probe")
+
+@pytest.mark.asyncio
+async def test_fetch_model_skips_upstream_for_known_missing_ids(monkeypatch):
+    calls = []
+
+    async def fake_scrape(model_id, conditional=False):
+        calls.append(model_id)
+        return {"status": "error", "message": "Model not found", "status_code": 404}
+
+    cache = NegativeCache("test", redis_url=None)
+    monkeypatch.setattr(model_detail, "scrape_specific_model", fake_scrape)
+    monkeypatch.setattr(model_detail, "missing_models", cache)
+
+    first = await model_detail.fetch_model("nobody/nothing")
+    second = await model_detail.fetch_model("nobody/nothing")
+
+    assert calls == ["nobody/nothing"]
+    assert first["status_code"] == second["status_code"] == 404
+    assert cache.stats.hits == 1
+
+@pytest.mark.asyncio
+async def test_upstream_errors_are_not_cached(monkeypatch):
+    async def fake_scrape(model_id, conditional=False):
+        return {"status": "error", "message": "Upstream error 503", "status_code": 502}
+
+    cache = NegativeCache("test", redis_url=None)
+    monkeypatch.setattr(model_detail, "scrape_specific_model", fake_scrape)
+    monkeypatch.setattr(model_detail, "missing_models", cache)
+
+    await model_detail.fetch_model("org/flaky")
+    assert not await cache.contains("org/flaky")
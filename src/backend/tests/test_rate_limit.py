@@ -0,0 +1,208 @@
+import httpx
+import pytest
+from unittest.mock import patch
+
+from ..services import rate_limit, scraper
+from ..services.rate_limit import (
+    AdaptiveTokenBucket, RetryPolicy, SharedTokenBucket, UpstreamLimits, parse_retry_after, send_with_retry,
+)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_parse_retry_after_accepts_seconds_and_http_dates():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:30 GMT", now=1445412500.0) == 10.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+def test_bucket_speeds_up_when_healthy_and_backs_off_when_throttled():
+    bucket = AdaptiveTokenBucket(rate=1.0, max_rate=1.3, min_rate=0.2, increase=0.1, clock=FakeClock())
+    for _ in range(5):
+        bucket.observe(200)
+    assert bucket.rate == pytest.approx(1.3)
+
+    bucket.observe(503)
+    bucket.observe(429)
+    assert bucket.rate == pytest.approx(0.325)
+    for _ in range(5):
+        bucket.observe(429)
+    assert bucket.rate == 0.2
+    assert bucket.stats.throttled == 7
+
+def test_retry_after_pauses_the_bucket():
+    clock = FakeClock()
+    bucket = AdaptiveTokenBucket(rate=10.0, max_rate=10.0, burst=5, clock=clock)
+    bucket.observe(429, retry_after="30")
+
+    assert bucket._delay() == pytest.approx(30.0)
+    clock.now = 31.0
+    assert bucket._delay() == 0.0
+
+def _fast_limits():
+    return UpstreamLimits(budgets={}, default=(1000.0, 1000.0))
+
+FAST_RETRIES = RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=1.0)
+
+def _scripted(*responses):
+    calls = []
+
+    async def send():
+        response = responses[len(calls)]
+        calls.append(response)
+        if isinstance(response, Exception):
+            raise response
+        return response
+    return send, calls
+
+@pytest.mark.asyncio
+async def test_send_with_retry_obeys_retry_after_then_succeeds():
+    limits = _fast_limits()
+    send, calls = _scripted(
+        httpx.Response(429, headers={"Retry-After": "0.05"}),
+        httpx.Response(200, text="ok"),
+    )
+    response = await send_with_retry(send, "https://huggingface.co/api/models", policy=FAST_RETRIES, limits=limits)
+
+    bucket = limits.bucket("huggingface.co")
+    assert response.status_code == 200 and len(calls) == 2
+    assert bucket.stats.retry_after_pauses == 1
+    assert bucket.stats.retries == 1
+    assert bucket.stats.wait_seconds >= 0.04
+
+@pytest.mark.asyncio
+async def test_send_with_retry_gives_up_on_long_retry_after_and_exhaustion():
+    limits = _fast_limits()
+    send, calls = _scripted(httpx.Response(429, headers={"Retry-After": "3600"}))
+    response = await send_with_retry(send, "https://replicate.com/explore", policy=FAST_RETRIES, limits=limits)
+    assert response.status_code == 429 and len(calls) == 1
+
+    send, calls = _scripted(httpx.ConnectError("boom"), httpx.Response(502), httpx.Response(503))
+    response = await send_with_retry(send, "https://example.com/x", policy=FAST_RETRIES, limits=limits)
+    assert response.status_code == 503 and len(calls) == 3
+    assert limits.bucket("example.com").stats.exhausted == 1
+
+@pytest.mark.asyncio
+async def test_send_with_retry_does_not_retry_client_errors():
+    send, calls = _scripted(httpx.Response(404))
+    response = await send_with_retry(send, "https://huggingface.co/api/models/x", policy=FAST_RETRIES, limits=_fast_limits())
+    assert response.status_code == 404 and len(calls) == 1
+
+def test_authenticated_and_anonymous_traffic_have_separate_budgets():
+    limits = UpstreamLimits(budgets={("huggingface.co", False): (1.0, 2.0), ("huggingface.co", True): (5.0, 20.0)})
+    anonymous = limits.bucket("huggingface.co")
+    authenticated = limits.bucket("huggingface.co", authenticated=True)
+
+    anonymous.observe(429)
+    assert anonymous is not authenticated
+    assert (anonymous.rate, authenticated.rate) == (0.5, 5.0)
+    assert set(limits.snapshot()) == {"huggingface.co:anon", "huggingface.co:auth"}
+
+def _explore_pages(last_page):
+    def handler(request):
+        page = int(request.url.params["page"])
+        links = "".join(f'<a href="/owner/model-{page}-{i}">m</a>' for i in range(3))
+        if page > last_page:
+            # Past the end the explore page repeats its first page
+            links = '<a href="/owner/model-1-0">m</a>'
+        return httpx.Response(200, text=f"<html><body>{links}<a href='/explore'>x</a></body></html>")
+    return handler
+
+class FakeBudgetStore:
+    """Stands in for Redis: answers the acquire script from a queue and records observations."""
+
+    def __init__(self, delays, rate="4.0"):
+        self.delays = list(delays)
+        self.rate = rate
+        self.observed = []
+
+    async def eval(self, script, numkeys, key, *args):
+        if script == rate_limit._ACQUIRE_SCRIPT:
+            return [str(self.delays.pop(0)), self.rate]
+        self.observed.append((key, args[0]))
+        return "1.0"
+
+class BrokenBudgetStore:
+    async def eval(self, *args):
+        raise ConnectionError("store down")
+
+def _shared_bucket(store):
+    import asyncio
+
+    bucket = SharedTokenBucket("ratelimit:test:anon", "redis://unused", rate=2, max_rate=5, burst=1)
+    bucket._clients[asyncio.get_running_loop()] = store
+    return bucket
+
+@pytest.mark.asyncio
+async def test_shared_bucket_waits_on_the_shared_budget():
+    import asyncio
+
+    store = FakeBudgetStore([0.01, 0])
+    bucket = _shared_bucket(store)
+    await bucket.acquire()
+    assert bucket.stats.wait_seconds == pytest.approx(0.01)
+    assert bucket.rate == 4.0  # Adopted from the store
+
+    bucket.observe(429)
+    await asyncio.sleep(0)
+    assert store.observed == [("ratelimit:test:anon", "1")]
+    assert bucket.rate == 1.0
+
+@pytest.mark.asyncio
+async def test_shared_bucket_falls_back_to_local_budget():
+    bucket = _shared_bucket(BrokenBudgetStore())
+    await bucket.acquire()
+    assert bucket.stats.acquired == 1
+    assert bucket.stats.shared_errors == 1
+
+def test_limits_share_buckets_when_a_store_is_configured():
+    limits = UpstreamLimits(budgets={("huggingface.co", True): (5, 20)}, redis_url="redis://unused")
+    bucket = limits.bucket("huggingface.co", True)
+    assert isinstance(bucket, SharedTokenBucket)
+    assert bucket.key == "ratelimit:huggingface.co:auth"
+    assert (bucket.rate, bucket.max_rate) == (5, 20)
+    assert not isinstance(UpstreamLimits(redis_url=None).bucket("huggingface.co"), SharedTokenBucket)
+
+def test_limits_split_across_processes_unless_shared():
+    limits = UpstreamLimits(budgets={("huggingface.co", True): (8, 20)}, redis_url=None)
+    before = limits.bucket("huggingface.co", True)
+    limits.split_across(4)
+    assert (before.rate, before.max_rate) == (2, 5)
+    assert limits.bucket("huggingface.co", False).rate == limits.default[0] / 4
+
+    shared = UpstreamLimits(budgets={("huggingface.co", True): (8, 20)}, redis_url="redis://unused")
+    shared.split_across(4)
+    assert shared.bucket("huggingface.co", True).rate == 8
+
+def test_split_scope_restores_the_full_budgets():
+    limits = UpstreamLimits(budgets={("huggingface.co", True): (8, 20)}, redis_url=None)
+    bucket = limits.bucket("huggingface.co", True)
+    with limits.split(4):
+        with limits.split(4):
+            assert (bucket.rate, bucket.max_rate) == (2, 5)
+        assert limits.processes == 4  # Still inside the outer scope
+        created = limits.bucket("replicate.com", False)
+    assert (bucket.rate, bucket.max_rate) == (8, 20)
+    assert limits.processes == 1
+    assert created.rate == limits.budgets.get(("replicate.com", False), limits.default)[0]
+
+@pytest.mark.asyncio
+async def test_get_model_urls_fetches_a_window_and_stops_on_repeated_page():
+    requested = []
+    handler = _explore_pages(last_page=5)
+
+    def recording(request):
+        requested.append(int(request.url.params["page"]))
+        return handler(request)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(recording))
+    with patch.object(rate_limit, "upstream_limits", _fast_limits()):
+        urls = await scraper.get_model_urls(client, window=3)
+
+    assert len(urls) == 15
+    assert "https://replicate.com/owner/model-5-2" in urls
+    assert max(requested) <= 6 + 3
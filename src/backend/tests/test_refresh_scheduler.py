@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import Select
+from sqlalchemy.dialects import postgresql
+
+from ..models.models import AIModel
+from ..services import refresh_scheduler
+from ..services.refresh_scheduler import (
+    age_distribution,
+    claim_due_models,
+    queue_depth,
+    refresh_interval,
+    schedule_next,
+)
+
+def test_popular_and_changing_models_refresh_sooner():
+    dead = refresh_interval({"downloads": 3, "likes": 0})
+    hot = refresh_interval({"downloads": 2_000_000, "likes": 5000, "discussion_count": 300})
+    quiet_hot = refresh_interval({"downloads": 2_000_000, "likes": 5000, "discussion_count": 300, "unchanged_refreshes": 4})
+
+    assert hot < quiet_hot < dead
+    assert dead <= timedelta(seconds=refresh_scheduler.REFRESH_MAX_INTERVAL)
+    assert hot >= timedelta(seconds=refresh_scheduler.REFRESH_MIN_INTERVAL)
+
+def test_claims_due_models_and_schedules_next(session_factory):
+    now = datetime.now(timezone.utc)
+    db = session_factory()
+    db.add_all([
+        AIModel(id="org/never", source="huggingface"),
+        AIModel(id="org/due", source="huggingface", next_refresh_at=now - timedelta(hours=1), likes=10),
+        AIModel(id="org/later", source="huggingface", next_refresh_at=now + timedelta(days=1)),
+        AIModel(id="replicate/model", source="replicate"),
+    ])
+    db.commit()
+    db.close()
+
+    assert queue_depth(session_factory=session_factory) == 2
+    claimed = claim_due_models(limit=10, session_factory=session_factory)
+    assert [model["id"] for model in claimed] == ["org/due", "org/never"]
+    # Leased, so the next tick does not pick them again
+    assert claim_due_models(limit=10, session_factory=session_factory) == []
+
+    schedule_next("org/due", changed=False, session_factory=session_factory)
+    schedule_next("org/due", changed=False, session_factory=session_factory)
+    db = session_factory()
+    model = db.get(AIModel, "org/due")
+    assert model.unchanged_refreshes == 2
+    assert model.updated_at is None  # Scheduling is not a content change
+    assert model.next_refresh_at.replace(tzinfo=timezone.utc) > now + timedelta(seconds=refresh_scheduler.REFRESH_MIN_INTERVAL)
+    db.close()
+
+def test_unscheduled_backlog_does_not_starve_overdue_models(session_factory):
+    now = datetime.now(timezone.utc)
+    db = session_factory()
+    db.add_all([AIModel(id=f"org/new-{i}", source="huggingface", likes=i) for i in range(10)])
+    db.add_all([
+        AIModel(id=f"org/hot-{i}", source="huggingface", next_refresh_at=now - timedelta(minutes=i))
+        for i in range(2)
+    ])
+    db.commit()
+    db.close()
+
+    claimed = [model["id"] for model in claim_due_models(limit=4, session_factory=session_factory)]
+    # Most overdue and most popular new models first, taking turns
+    assert claimed == ["org/hot-1", "org/new-9", "org/hot-0", "org/new-8"]
+    claimed = [model["id"] for model in claim_due_models(limit=4, session_factory=session_factory)]
+    assert claimed == ["org/new-7", "org/new-6", "org/new-5", "org/new-4"]
+
+    statements = []
+
+    class Recording:
+        def __init__(self):
+            self.db = session_factory()
+
+        def execute(self, statement, *args):
+            if isinstance(statement, Select):
+                statements.append(str(statement.compile(dialect=postgresql.dialect())))
+            return self.db.execute(statement, *args)
+
+        def __getattr__(self, name):
+            return getattr(self.db, name)
+
+    claim_due_models(limit=4, session_factory=Recording)
+    assert statements and all(statement.endswith("FOR UPDATE SKIP LOCKED") for statement in statements)
+
+def test_age_distribution(session_factory):
+    now = datetime.now(timezone.utc)
+    db = session_factory()
+    db.add_all([
+        AIModel(id="a", source="huggingface", last_scraped_at=now - timedelta(minutes=5)),
+        AIModel(id="b", source="huggingface", last_scraped_at=now - timedelta(days=3)),
+        AIModel(id="c", source="huggingface", last_scraped_at=now - timedelta(days=90)),
+        AIModel(id="d", source="huggingface"),
+    ])
+    db.commit()
+    db.close()
+
+    assert age_distribution(session_factory=session_factory) == {
+        "1h": 1, "6h": 0, "1d": 0, "7d": 1, "30d": 0, "older": 1, "never": 1,
+    }
+
+@pytest.mark.asyncio
+async def test_tick_refreshes_claimed_models_and_records_change(monkeypatch):
+    stored = datetime(2024, 1, 1)
+    claimed = [
+        {"id": "org/changed", "last_updated": stored, "unchanged_refreshes": 0},
+        {"id": "org/same", "last_updated": stored, "unchanged_refreshes": 0},
+        {"id": "org/broken", "last_updated": stored, "unchanged_refreshes": 0},
+    ]
+    outcomes = {}
+
+    async def fake_revalidate(model_id):
+        if model_id == "org/broken":
+            return {"status": "error", "message": "Upstream error 503", "status_code": 502}
+        last_updated = datetime(2024, 2, 1) if model_id == "org/changed" else stored
+        return {"status": "success", "model": {"id": model_id, "last_updated": last_updated}}
+
+    monkeypatch.setattr(refresh_scheduler, "claim_due_models", lambda limit: claimed)
+    monkeypatch.setattr(refresh_scheduler, "revalidate_model", fake_revalidate)
+    monkeypatch.setattr(refresh_scheduler, "schedule_next", lambda model_id, changed: outcomes.update({model_id: changed}))
+
+    report = await refresh_scheduler.refresh_due_models(tick_seconds=0.03)
+
+    assert report["claimed"] == 3
+    assert outcomes == {"org/changed": True, "org/same": False, "org/broken": None}
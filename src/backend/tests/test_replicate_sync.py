@@ -0,0 +1,91 @@
+import sys
+
+import httpx
+import pytest
+from unittest.mock import patch
+
+from ..services import scraper
+from ..services.bulk_upsert import UpsertReport
+from ..services.rate_limit import UpstreamLimits
+
+# Patch the modules scraper actually resolved: under the package test layout
+# ``..services.x`` and the ``services.x`` imported by the code are distinct objects
+sync_state = sys.modules[scraper.load_cursor.__module__]
+rate_limit = sys.modules[scraper.send_with_retry.__module__]
+
+API = "https://api.replicate.com/v1/models"
+
+def _page(number, total=3):
+    results = [
+        {
+            "owner": "owner",
+            "name": f"model-{number}-{i}",
+            "latest_version": {"created_at": f"2024-0{4 - number}-1{i}T00:00:00Z"},
+        }
+        for i in range(2)
+    ]
+    return {"results": results, "next": f"{API}?cursor=c{number + 1}" if number < total else None}
+
+def _handler(requested):
+    def handler(request):
+        cursor = request.url.params.get("cursor")
+        requested.append(cursor)
+        number = int(cursor[1:]) if cursor else 1
+        return httpx.Response(200, json=_page(number))
+    return handler
+
+@pytest.fixture
+def replicate_env(session_factory):
+    requested = []
+    client = httpx.AsyncClient(transport=httpx.MockTransport(_handler(requested)))
+    with patch.object(sync_state, "SessionLocal", session_factory), \
+            patch.object(scraper, "get_client", lambda: client), \
+            patch.object(rate_limit, "upstream_limits", UpstreamLimits(budgets={}, default=(1000.0, 1000.0))), \
+            patch.object(scraper.response_store, "enabled", False):
+        yield requested
+
+@pytest.mark.asyncio
+async def test_follows_next_cursors_across_all_pages(replicate_env):
+    written = []
+
+    def write(rows):
+        written.extend(row["id"] for row in rows)
+        return UpsertReport(inserted=len(rows), chunks=1)
+
+    with patch.object(scraper, "bulk_upsert_models", write):
+        report = await scraper.sync_replicate_catalog("full")
+
+    assert report["pages"] == 3 and report["models"] == 6
+    assert report["writes"]["inserted"] == 6
+    assert written[0] == "replicate:owner/model-1-0" and written[-1] == "replicate:owner/model-3-1"
+    assert sync_state.load_cursor("replicate") is None
+
+@pytest.mark.asyncio
+async def test_crashed_run_resumes_from_last_written_page(replicate_env):
+    calls = []
+
+    def crash_on_second_page(rows):
+        calls.append(rows)
+        if len(calls) == 2:
+            raise RuntimeError("database went away")
+        return UpsertReport(inserted=len(rows), chunks=1)
+
+    with patch.object(scraper, "bulk_upsert_models", crash_on_second_page):
+        with pytest.raises(RuntimeError):
+            await scraper.sync_replicate_catalog("full")
+    assert sync_state.load_cursor("replicate") == f"{API}?cursor=c2"
+
+    replicate_env.clear()
+    written = []
+
+    def write(rows):
+        written.extend(row["id"] for row in rows)
+        return UpsertReport(inserted=len(rows), chunks=1)
+
+    with patch.object(scraper, "bulk_upsert_models", write):
+        report = await scraper.sync_replicate_catalog("full")
+
+    assert report["resumed"] is True
+    assert replicate_env == ["c2", "c3"]
+    assert written == [f"replicate:owner/model-{n}-{i}" for n in (2, 3) for i in range(2)]
+    assert sync_state.load_cursor("replicate") is None
@@ -0,0 +1,76 @@
+import json
+import os
+
+import pytest
+
+from ..services.response_store import ResponseStore
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "fixtures", "replicate")
+
+def test_put_get_roundtrip_is_compressed_and_deduplicated(tmp_path):
+    store = ResponseStore(root=str(tmp_path), enabled=True)
+    body = b'{"modelId": "org/model", "tags": ["llm"]}' * 50
+
+    first = store.put("https://huggingface.co/api/models/org/model", body, "huggingface_model")
+    second = store.put("https://huggingface.co/api/models/org/copy", body, "huggingface_model")
+
+    assert first == second
+    assert store.stats.dedup_hits == 1
+    assert store.stats.stored_bytes < store.stats.raw_bytes
+    assert store.get("https://huggingface.co/api/models/org/model") == body
+    assert store.get("https://huggingface.co/api/models/org/unknown") is None
+
+def test_iter_entries_filters_by_kind(tmp_path):
+    store = ResponseStore(root=str(tmp_path), enabled=True)
+    store.put("https://huggingface.co/api/models/org/model", b"{}", "huggingface_model")
+    store.put("https://replicate.com/owner/model", b"<html></html>", "replicate_page")
+
+    entries = list(store.iter_entries(kind="replicate_page"))
+    assert [entry["url"] for entry in entries] == ["https://replicate.com/owner/model"]
+
+def test_expired_entries_are_not_served(tmp_path):
+    store = ResponseStore(root=str(tmp_path), ttl_hours=0, enabled=True)
+    store.put("https://replicate.com/owner/model", b"<html></html>", "replicate_page")
+
+    assert store.get("https://replicate.com/owner/model") is None
+    assert list(store.iter_entries()) == []
+
+def test_sweep_evicts_least_recently_used_over_budget(tmp_path):
+    store = ResponseStore(root=str(tmp_path), max_bytes=10 ** 6, enabled=True)
+    for i in range(10):
+        store.put(f"https://replicate.com/owner/model-{i}", os.urandom(2000), "replicate_page")
+
+    store.max_bytes = 5000
+    result = store.sweep()
+
+    assert result["stored_bytes"] <= 5000
+    assert store.stats.evicted_objects > 0
+
+@pytest.mark.asyncio
+async def test_reparse_merges_replicate_api_and_page_rows_in_a_fixed_order(tmp_path):
+    from ..services.reparse import StoredResponseSource
+
+    with open(os.path.join(FIXTURES, "meta__llama-2-70b-chat.html"), "rb") as f:
+        html = f.read()
+    api = {"owner": "meta", "name": "llama-2-70b-chat", "description": "From the API", "run_count": 42}
+
+    rows = []
+    for order in (("replicate_model", "replicate_page"), ("replicate_page", "replicate_model")):
+        store = ResponseStore(root=str(tmp_path / "-".join(order)), enabled=True)
+        for kind in order:
+            if kind == "replicate_model":
+                store.put("https://api.replicate.com/v1/models/meta/llama-2-70b-chat", json.dumps(api).encode(), kind)
+            else:
+                store.put("https://replicate.com/meta/llama-2-70b-chat", html, kind)
+
+        source = StoredResponseSource(store=store)
+        items = [item async for item in source.list_models()]
+        assert len(items) == 1
+        rows.append(source.normalize(await source.fetch_detail(items[0])))
+
+    assert rows[0] == rows[1]
+    row = rows[0]
+    assert row["id"] == "replicate:meta/llama-2-70b-chat"
+    # API fields win; the page fills what the API object lacks
+    assert row["description"] == "From the API" and row["downloads"] == 42
+    assert row["tags"] and row["technical_details"]
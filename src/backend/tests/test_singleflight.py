@@ -0,0 +1,108 @@
+import asyncio
+import pytest
+
+from ..services.singleflight import SingleFlight
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test", redis_url=None)
+    runs = []
+
+    async def scrape():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return {"status": "success"}
+
+    results = await asyncio.gather(*(flight.do("org/viral", scrape) for _ in range(10)))
+
+    assert len(runs) == 1
+    assert all(result == {"status": "success"} for result in results)
+    assert (flight.stats.calls, flight.stats.leaders, flight.stats.coalesced) == (10, 1, 9)
+
+    # Once the call finished, the next miss runs again
+    await flight.do("org/viral", scrape)
+    assert len(runs) == 2
+
+@pytest.mark.asyncio
+async def test_failure_is_shared_with_waiters():
+    flight = SingleFlight("test", redis_url=None)
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream exploded")
+
+    results = await asyncio.gather(*(flight.do("org/model", failing) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_hands_the_call_to_a_waiter():
+    flight = SingleFlight("test", redis_url=None)
+    runs = []
+
+    async def scrape():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return "scraped"
+
+    leader = asyncio.create_task(flight.do("org/model", scrape))
+    await asyncio.sleep(0)
+    followers = [asyncio.create_task(flight.do("org/model", scrape)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    leader.cancel()  # Its client went away
+
+    assert await asyncio.gather(*followers) == ["scraped"] * 3
+    assert leader.cancelled()
+    assert len(runs) == 2  # One follower took over; the others shared its call
+    assert flight.stats.leaders == 2
+
+class FakeLockStore:
+    """Minimal stand-in for the Redis commands the lock uses."""
+
+    def __init__(self):
+        self.values = {}
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    async def exists(self, key):
+        return int(key in self.values)
+
+    async def eval(self, script, numkeys, key, token):
+        if self.values.get(key) == token:
+            del self.values[key]
+            return 1
+        return 0
+
+@pytest.mark.asyncio
+async def test_waits_for_lock_held_by_another_process():
+    store = FakeLockStore()
+    store.values["singleflight:test:org/model"] = "other-process"
+    flight = SingleFlight("test", redis_url="redis://unused")
+    flight._state().redis = store
+    runs = []
+
+    async def scrape():
+        runs.append(1)
+        return "scraped"
+
+    async def release_later():
+        await asyncio.sleep(0.15)
+        del store.values["singleflight:test:org/model"]
+
+    async def stored():
+        return "stored by other process"
+
+    release = asyncio.create_task(release_later())
+    result = await flight.do("org/model", scrape, after_wait=stored)
+    await release
+
+    assert result == "stored by other process"
+    assert runs == []
+    assert (flight.stats.remote_waits, flight.stats.remote_hits) == (1, 1)
+
+    # Uncontended: this process takes the lock, runs the work and releases it
+    assert await flight.do("org/model", scrape) == "scraped"
+    assert store.values == {}
@@ -0,0 +1,50 @@
+import httpx
+import pytest
+
+from ..services import rate_limit
+from ..services.metrics import Histogram
+from ..services.rate_limit import RetryPolicy, UpstreamLimits, send_with_retry
+from ..services.upstream_metrics import UpstreamMetrics
+
+def test_histogram_quantiles_use_bucket_upper_bounds():
+    histogram = Histogram(bounds=(0.1, 1.0))
+    for value in (0.05, 0.05, 0.05, 0.5, 3.0):
+        histogram.observe(value)
+
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.8) == 1.0
+    assert histogram.quantile(0.99) == 3.0
+    assert histogram.snapshot()["buckets"] == {"le_0.1": 3, "le_1": 1, "le_inf": 1}
+
+def test_share_of_time_splits_latency_and_parse_between_endpoints():
+    metrics = UpstreamMetrics()
+    metrics.record_call("hf_model", 200, 3.0, bytes_received=100)
+    metrics.record_call("hf_papers", 404, 1.0)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["hf_model"]["share_of_time"] == 0.75
+    assert snapshot["hf_papers"]["statuses"] == {"404": 1}
+    assert snapshot["hf_model"]["bytes_received"] == 100
+
+@pytest.mark.asyncio
+async def test_send_with_retry_records_one_call_with_its_retries():
+    # The instance send_with_retry records into, whichever way the package was imported
+    metrics = rate_limit.upstream_metrics
+    metrics.reset()
+    responses = [httpx.Response(503), httpx.Response(200, content=b"hello")]
+
+    async def send():
+        return responses.pop(0)
+
+    response = await send_with_retry(
+        send, "https://huggingface.co/api/models/a/b",
+        policy=RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=1.0),
+        limits=UpstreamLimits(budgets={}, default=(1000.0, 1000.0)),
+        kind="hf_model",
+    )
+
+    assert response.status_code == 200
+    stats = metrics.snapshot()["hf_model"]
+    assert stats["calls"] == 1
+    assert stats["retries"] == 1
+    assert stats["statuses"] == {"200": 1}